@@ -0,0 +1,106 @@
+from typing import Dict
+
+# Deterministic judge announcements per language (LanguageDetector codes).
+# Placeholders: {title}, {round}, {next_round}.
+ANNOUNCEMENTS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "opening": (
+            "Welcome, parties. I am the AI Judge presiding over \"{title}\".\n"
+            "This tribunal will proceed in 3 rounds. In each round the Plaintiff and the Defendant "
+            "submit statements in turn and may upload supporting files.\n\n"
+            "This is Round 1, and it is now the Plaintiff's turn to submit their statement."
+        ),
+        "defendant_turn": (
+            "The Plaintiff has submitted their statement for Round {round}.\n"
+            "It is now the Defendant's turn to submit their statement for Round {round}."
+        ),
+        "plaintiff_turn": (
+            "The Defendant has submitted their statement for Round {round}. Round {round} is now complete.\n"
+            "It is now the Plaintiff's turn to submit their statement for Round {next_round}."
+        ),
+        "concluded": (
+            "Round 3 of Defendant is finished.\n"
+            "The court session is now concluded. The final verdict has been issued in the Verdict section."
+        ),
+        "deliberating": (
+            "Round 3 of Defendant is finished.\n"
+            "The court session is now concluded. The verdict is being prepared and will appear in the Verdict section shortly."
+        ),
+    },
+    "my": {
+        "opening": (
+            "တရားလိုနှင့် တရားခံတို့ကို ကြိုဆိုပါသည်။ ကျွန်ုပ်သည် \"{title}\" အမှုကို စီရင်မည့် AI တရားသူကြီး ဖြစ်ပါသည်။\n"
+            "ဤခုံရုံးကို အဆင့် ၃ ဆင့်ဖြင့် ဆောင်ရွက်မည်ဖြစ်ပြီး အဆင့်တိုင်းတွင် တရားလိုနှင့် တရားခံတို့သည် "
+            "အလှည့်ကျ ထွက်ဆိုချက်များ တင်သွင်းနိုင်ပြီး ထောက်ခံစာရွက်စာတမ်းများကိုလည်း တင်နိုင်ပါသည်။\n\n"
+            "ယခုသည် အဆင့် ၁ ဖြစ်ပြီး တရားလို၏ ထွက်ဆိုချက် တင်သွင်းရမည့် အလှည့်ဖြစ်ပါသည်။"
+        ),
+        "defendant_turn": (
+            "တရားလိုသည် အဆင့် {round} အတွက် ထွက်ဆိုချက်ကို တင်သွင်းပြီးပါပြီ။\n"
+            "ယခု တရားခံ၏ အဆင့် {round} ထွက်ဆိုချက် တင်သွင်းရမည့် အလှည့်ဖြစ်ပါသည်။"
+        ),
+        "plaintiff_turn": (
+            "တရားခံသည် အဆင့် {round} အတွက် ထွက်ဆိုချက်ကို တင်သွင်းပြီးပါပြီ။ အဆင့် {round} ပြီးဆုံးပါပြီ။\n"
+            "ယခု တရားလို၏ အဆင့် {next_round} ထွက်ဆိုချက် တင်သွင်းရမည့် အလှည့်ဖြစ်ပါသည်။"
+        ),
+        "concluded": (
+            "တရားခံ၏ အဆင့် ၃ ပြီးဆုံးပါပြီ။\n"
+            "ခုံရုံးအစည်းအဝေး ပြီးဆုံးပါပြီ။ နောက်ဆုံးစီရင်ချက်ကို စီရင်ချက်ကဏ္ဍတွင် ထုတ်ပြန်ထားပါသည်။"
+        ),
+        "deliberating": (
+            "တရားခံ၏ အဆင့် ၃ ပြီးဆုံးပါပြီ။\n"
+            "ခုံရုံးအစည်းအဝေး ပြီးဆုံးပါပြီ။ စီရင်ချက်ကို ပြင်ဆင်နေပြီး မကြာမီ စီရင်ချက်ကဏ္ဍတွင် ဖော်ပြပါမည်။"
+        ),
+    },
+    "zh": {
+        "opening": (
+            "欢迎各方当事人。我是审理“{title}”一案的AI法官。\n"
+            "本庭审将分三轮进行，每一轮原告和被告依次提交陈述，并可上传支持文件。\n\n"
+            "现在是第1轮，请原告提交陈述。"
+        ),
+        "defendant_turn": (
+            "原告已提交第{round}轮陈述。\n"
+            "现在轮到被告提交第{round}轮陈述。"
+        ),
+        "plaintiff_turn": (
+            "被告已提交第{round}轮陈述，第{round}轮到此结束。\n"
+            "现在轮到原告提交第{next_round}轮陈述。"
+        ),
+        "concluded": (
+            "被告的第3轮陈述已结束。\n"
+            "本次庭审到此结束。最终判决已在判决栏中公布。"
+        ),
+        "deliberating": (
+            "被告的第3轮陈述已结束。\n"
+            "本次庭审到此结束。判决正在拟定中，稍后将在判决栏中公布。"
+        ),
+    },
+    "ja": {
+        "opening": (
+            "当事者の皆さん、ようこそ。私は「{title}」事件を担当するAI裁判官です。\n"
+            "本審理は3ラウンドで行われ、各ラウンドで原告と被告が順番に陳述を提出し、証拠書類をアップロードすることができます。\n\n"
+            "現在は第1ラウンドです。原告は陳述を提出してください。"
+        ),
+        "defendant_turn": (
+            "原告が第{round}ラウンドの陳述を提出しました。\n"
+            "次は被告が第{round}ラウンドの陳述を提出する番です。"
+        ),
+        "plaintiff_turn": (
+            "被告が第{round}ラウンドの陳述を提出しました。第{round}ラウンドは終了です。\n"
+            "次は原告が第{next_round}ラウンドの陳述を提出する番です。"
+        ),
+        "concluded": (
+            "被告の第3ラウンドが終了しました。\n"
+            "本審理はこれで閉廷します。最終判決は判決セクションに掲載されました。"
+        ),
+        "deliberating": (
+            "被告の第3ラウンドが終了しました。\n"
+            "本審理はこれで閉廷します。判決を作成中です。まもなく判決セクションに掲載されます。"
+        ),
+    },
+}
+
+
+def render_announcement(key: str, lang_code: str, **fields) -> str:
+    """Render a judge announcement in `lang_code`, falling back to English."""
+    templates = ANNOUNCEMENTS.get(lang_code) or ANNOUNCEMENTS["en"]
+    return templates.get(key, ANNOUNCEMENTS["en"][key]).format(**fields)
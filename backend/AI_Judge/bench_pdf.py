@@ -0,0 +1,109 @@
+"""
+Verdict PDF rendering benchmark.
+
+Renders the same sample verdict N times in this process, building the
+stylesheet per verdict (the old path) or reusing the cached per-language
+VerdictTemplate. The two variants alternate for --repeat rounds so drift in
+machine load hits both, and the median and spread of each are printed:
+
+    python -m backend.AI_Judge.bench_pdf --count 50 --repeat 7 --lang en
+
+Finding: caching buys nothing measurable (0.91x-0.95x median, within noise);
+layout dominates. The template is kept only because shared read-only styles
+are harmless; flowables are rebuilt per document.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .pdf_renderer import VerdictTemplate, register_fonts, render_verdict, template_for
+
+SAMPLE_VERDICT = """CASE TITLE:
+Ko Aung v. Daw Hla - Theft of a motorcycle
+
+SCENARIO:
+The defendant took the plaintiff's motorcycle from outside a tea shop in Yangon and sold it
+two days later. The buyer identified the defendant and the plaintiff produced the registration book.
+
+APPLICABLE LAW:
+Penal Code Section 378 (Theft); Section 379 (Punishment for theft); Section 411 (Dishonestly receiving stolen property)
+
+COURT'S REASONING:
+Section 379 (Punishment for theft):
+The motorcycle was moved out of the plaintiff's possession without consent and with dishonest
+intention. The sale two days later confirms the intention to cause wrongful loss.
+
+Section 411 (Dishonestly receiving stolen property):
+There is no evidence the buyer knew the property was stolen, so the section does not apply to the buyer.
+
+DECISION:
+The defendant is found guilty of theft under Section 379.
+
+TOTAL IMPRISONMENT:
+3 years
+
+SENTENCE:
+Imprisonment for three years and a fine of 300,000 kyats, payable to the plaintiff as compensation.
+"""
+
+
+def _spec(out_dir: str, lang_code: str, i: int) -> dict:
+    return {
+        "verdict_text": SAMPLE_VERDICT,
+        "case_id": f"bench-case-{i:08d}",
+        "pdf_path": os.path.join(out_dir, f"verdict_bench_{i}.pdf"),
+        "lang_code": lang_code,
+        "plaintiff_name": "Ko Aung",
+        "defendant_name": "Daw Hla",
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+def run(count: int, lang_code: str, cached: bool, out_dir: str) -> float:
+    """Render `count` verdicts; returns verdicts per second."""
+    start = time.perf_counter()
+    for i in range(count):
+        template = template_for(lang_code) if cached else VerdictTemplate(lang_code)
+        render_verdict(_spec(out_dir, lang_code, i), template)
+    return count / (time.perf_counter() - start)
+
+
+def _summary(label: str, rates: List[float]) -> str:
+    median = statistics.median(rates)
+    return (
+        f"[PDF BENCH] {label} median {median:.1f} verdicts/s ({1000 / median:.1f} ms each), "
+        f"range {min(rates):.1f}-{max(rates):.1f}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark verdict PDF rendering with and without the cached template.")
+    parser.add_argument("--count", type=int, default=50, help="verdicts rendered per run")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds; each round runs both variants, alternating which goes first")
+    parser.add_argument("--lang", default="en", help="verdict language code")
+    parser.add_argument("--out-dir", default=None, help="where to write the PDFs (default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    register_fonts()
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = args.out_dir or tmp
+        # One untimed render so imports and font loading don't count against the first run.
+        render_verdict(_spec(out_dir, args.lang, 0), VerdictTemplate(args.lang))
+        rates: Dict[bool, List[float]] = {False: [], True: []}
+        for i in range(max(1, args.repeat)):
+            for cached in ((False, True) if i % 2 == 0 else (True, False)):
+                rates[cached].append(run(args.count, args.lang, cached=cached, out_dir=out_dir))
+
+    speedups = [after / before for before, after in zip(rates[False], rates[True])]
+    print(f"[PDF BENCH] {args.count} verdicts x {len(speedups)} rounds, lang={args.lang}")
+    print(_summary("per-verdict template:", rates[False]))
+    print(_summary("cached template:     ", rates[True]))
+    print(f"[PDF BENCH] speedup median {statistics.median(speedups):.2f}x, range {min(speedups):.2f}-{max(speedups):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
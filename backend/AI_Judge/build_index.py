@@ -0,0 +1,129 @@
+"""
+Offline builder for the legal KB vector indexes.
+
+Shards the flattened KB across a process pool (one encoder per worker), encodes
+with length-sorted batches, and atomically swaps the FAISS index + metadata into
+place so it can run ahead of a deploy without blocking a serving worker:
+
+    python -m backend.AI_Judge.build_index --workers 4 --batch-size 64
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from .kb_loader import DEFAULT_KB_PATH, load_kb, flatten_sections, flatten_sections_en
+from .rag import VectorIndexer, encode_sorted
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Per-process encoder, created once by the pool initializer.
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(max(1, threads))
+    except Exception:
+        pass
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    return encode_sorted(_worker_model, texts, batch_size=batch_size)
+
+
+def encode_parallel(texts: List[str], model_name: str, workers: int, batch_size: int) -> np.ndarray:
+    """
+    Encode `texts` across `workers` processes. Documents are sorted by length and
+    dealt into contiguous shards so each shard pads to similar lengths; rows are
+    returned in the original order.
+    """
+    if workers <= 1:
+        _init_worker(model_name, os.cpu_count() or 1)
+        return _encode_shard(texts, batch_size)
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    shard_size = max(batch_size, -(-len(order) // (workers * 4)))  # a few shards per worker for balance
+    shards = [order[i:i + shard_size] for i in range(0, len(order), shard_size)]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(model_name, threads)
+    ) as pool:
+        futures = [pool.submit(_encode_shard, [texts[i] for i in shard], batch_size) for shard in shards]
+        parts = [f.result() for f in futures]
+
+    out = np.empty((len(texts), parts[0].shape[1]), dtype=np.float32)
+    for shard, emb in zip(shards, parts):
+        out[np.asarray(shard)] = emb
+    return out
+
+
+def build(
+    target: str,
+    kb_path: str = DEFAULT_KB_PATH,
+    index_dir: str = ".rag_cache",
+    model_name: str = DEFAULT_MODEL,
+    workers: int = 0,
+    batch_size: int = 64,
+    use_faiss: Optional[bool] = None,
+) -> None:
+    kb = load_kb(kb_path)
+    if target == "sections":
+        texts, metas = flatten_sections(kb)
+        index_name = "kb_sections"
+    else:
+        texts, metas = flatten_sections_en(kb)
+        index_name = "kb_index"
+    if not texts:
+        print(f"[BUILD] {index_name}: KB appears empty; nothing to build.")
+        return
+
+    workers = workers or min(4, os.cpu_count() or 1)
+    print(f"[BUILD] {index_name}: encoding {len(texts)} documents with {workers} worker(s), batch_size={batch_size}")
+    start = time.perf_counter()
+    emb = encode_parallel(texts, model_name, workers, batch_size)
+    elapsed = time.perf_counter() - start
+
+    indexer = VectorIndexer(model_name=model_name, index_dir=index_dir, index_name=index_name, use_faiss=use_faiss)
+    indexer.save(emb, metas)
+    print(
+        f"[BUILD] {index_name}: {len(texts)} docs in {elapsed:.1f}s "
+        f"({len(texts) / max(elapsed, 1e-9):.1f} docs/s) -> {os.path.abspath(index_dir)}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the legal KB vector indexes offline.")
+    parser.add_argument("--target", choices=["sections", "verdict", "all"], default="all",
+                        help="sections = multilingual kb_sections (LegalKnowledgeBase), verdict = English kb_index (VerdictBuilder)")
+    parser.add_argument("--kb", default=DEFAULT_KB_PATH, help="path to the KB JSON")
+    parser.add_argument("--index-dir", default=".rag_cache", help="output directory (the serving CWD's .rag_cache)")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=0, help="encoder processes (default: min(4, cpu_count))")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--numpy", action="store_true", help="write the numpy fallback instead of FAISS")
+    args = parser.parse_args(argv)
+
+    targets = ["sections", "verdict"] if args.target == "all" else [args.target]
+    for target in targets:
+        build(
+            target,
+            kb_path=args.kb,
+            index_dir=args.index_dir,
+            model_name=args.model,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            use_faiss=False if args.numpy else None,
+        )
+
+
+if __name__ == "__main__":
+    main()
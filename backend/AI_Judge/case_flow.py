@@ -1,18 +1,33 @@
 import uuid
 import json
 import os
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from fastapi import UploadFile
 from .language_tools import LanguageDetector
 from .llm_handler import LLMHandler
 from .verdict_builder import VerdictBuilder
-import PyPDF2
+import asyncio
 import re
-from .rag import VectorIndexer
+from .rag import VectorIndexer, RunningRelevance
+from .case_store import CaseStore
+from .extraction import ExhibitExtractor
+from .exhibit_cache import ExhibitCache
+from .kb_loader import load_kb, flatten_sections, DEFAULT_KB_PATH
+from .announcements import render_announcement
+from .events import CaseEvents
+from .verdict_jobs import VerdictJobs, record_stage
+from .context_builder import ContextBuilder
+from .term_scanner import default_scanner
 from datetime import datetime
 
-# Resolve KB path relative to this module directory so it works from any CWD
-KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Project_KB_modified.json")
+KB_PATH = DEFAULT_KB_PATH
+
+# How judge turn announcements are produced:
+#   "template" - localized templates only (instant)
+#   "enrich"   - template now, LLM phrasing generated in the background and pushed
+#                to /case_events subscribers when ready
+#   "llm"      - wait for the LLM on every turn (previous behaviour)
+ANNOUNCEMENT_MODE = os.environ.get("AI_JUDGE_ANNOUNCEMENTS", "template")
 
 class LegalKnowledgeBase:
     """
@@ -24,8 +39,7 @@ class LegalKnowledgeBase:
         self.kb_path = kb_path
         self.kb = []
         try:
-            with open(kb_path, "r", encoding="utf-8") as f:
-                self.kb = json.load(f)
+            self.kb = load_kb(kb_path)
             print(f"Successfully loaded Knowledge Base from {kb_path}")
         except FileNotFoundError:
             print(f"Error: Knowledge Base file not found at {kb_path}")
@@ -48,34 +62,7 @@ class LegalKnowledgeBase:
         Flatten chapters→sections into per-language “documents”.
         Each section produces a doc per language we find.
         """
-        docs: List[str] = []
-        metas: List[Dict] = []
-
-        # Known language keys in your LanguageDetector
-        lang_keys = ["en", "my", "zh", "ja"]
-
-        for chapter in (self.kb or []):
-            for section in chapter.get("sections", []):
-                sec_id = section.get("section", "N/A")
-                for lang in lang_keys:
-                    chap_key = f"chapter_title_{lang}"
-                    title_key = f"title_{lang}"
-                    text_key  = f"text_{lang}"
-                    chap = chapter.get(chap_key, "") or ""
-                    title = section.get(title_key, "") or ""
-                    text = section.get(text_key, "") or ""
-
-                    if text.strip() or title.strip():
-                        body = f"{chap}\nSection {sec_id}: {title}\n{text}".strip()
-                        docs.append(body)
-                        metas.append({
-                            "lang": lang,
-                            "section": sec_id,
-                            "chapter_title": chap or "N/A",
-                            "title": title or "N/A",
-                            "text": text or "N/A",
-                        })
-        return docs, metas
+        return flatten_sections(self.kb)
 
     def find_relevant_laws(
         self,
@@ -83,17 +70,38 @@ class LegalKnowledgeBase:
         lang_code: str,
         top_k: int = 12,
         min_score: float = 0.25,
+        chunked: bool = True,
+        aggregate: str = "max",
+        max_windows: int = 16,
     ) -> List[Dict[str, str]]:
         """
         Vector-search the KB using the whole case text. Prefer matches in the detected language,
         but gracefully fall back to English if few results in that language.
+        With `chunked`, long corpora are split into token-bounded windows that are searched
+        together and scored per section (`aggregate` = "max" or "sum"), instead of letting
+        the encoder silently truncate everything past its max sequence length.
         """
         if not self.kb:
             return []
 
         # 1) Search across all languages
-        hits = self.index.search(text_corpus, top_k=top_k * 2)  # get more, filter below
+        if chunked:
+            hits = self.index.search_chunked(
+                text_corpus, top_k=top_k * 2, aggregate=aggregate, max_windows=max_windows
+            )
+        else:
+            hits = self.index.search(text_corpus, top_k=top_k * 2)  # get more, filter below
+
+        return self.rank_hits(hits, lang_code, top_k=top_k, min_score=min_score)
 
+    def rank_hits(
+        self,
+        hits: List[Tuple[int, float]],
+        lang_code: str,
+        top_k: int = 12,
+        min_score: float = 0.25,
+    ) -> List[Dict[str, str]]:
+        """Turn (index, score) hits into law records: detected language first, English fallback."""
         # 2) Prefer detected language; keep a small number of strong fallbacks
         primary, fallback = [], []
         for idx, score in hits:
@@ -133,38 +141,151 @@ class LegalKnowledgeBase:
         print(f"RAG: selected {len(merged)} law sections (lang={lang_code}, min_score={min_score}).")
         return merged
 
+    def score_exhibit(self, sha: str, text: str, cache: Optional[ExhibitCache] = None, top_k: int = 24) -> List[List[Tuple[int, float]]]:
+        """
+        Per-window KB hits for one exhibit. Window embeddings are kept in the
+        exhibit cache, so an exhibit re-used across cases is encoded only once.
+        """
+        cached = cache.get_chunks(sha) if cache else None
+        if cached is None:
+            chunks = self.index.split_windows(text)
+            if not chunks:
+                return []
+            emb = self.index.encode_queries(chunks)
+            if cache:
+                cache.put_chunks(sha, chunks, emb)
+        else:
+            chunks, emb = cached
+            if not chunks:
+                return []
+        return self.index.search_vectors(emb, top_k=top_k)
+
 class CaseFlow:
-    def __init__(self):
-        self.cases: Dict[str, Dict[str, Any]] = {}
+    def __init__(
+        self,
+        kb_handler: Optional[LegalKnowledgeBase] = None,
+        verdict_builder: Optional[VerdictBuilder] = None,
+        llm: Optional[LLMHandler] = None,
+        case_store: Optional[CaseStore] = None,
+        extractor: Optional[ExhibitExtractor] = None,
+        events: Optional[CaseEvents] = None,
+        announcement_mode: str = ANNOUNCEMENT_MODE,
+    ):
+        # Heavy components can be built elsewhere (e.g. warmed up in parallel by the
+        # app lifecycle) and injected; otherwise they are constructed here.
+        # Cases live in SQLite (write-through) so they survive restarts and can be
+        # served by several workers; `self.cases.get()` returns the cached dict.
+        self.cases = case_store or CaseStore()
         self.language_detector = LanguageDetector(kb_path=KB_PATH)
-        self.llm = LLMHandler()
-        self.kb_handler = LegalKnowledgeBase(kb_path=KB_PATH)
-        self.verdict_builder = VerdictBuilder()
-
-    async def _call_llm(self, model_name: str, prompt: str) -> str:
+        self.llm = llm or LLMHandler()
+        self.kb_handler = kb_handler or LegalKnowledgeBase(kb_path=KB_PATH)
+        self.verdict_builder = verdict_builder or VerdictBuilder()
+        self.extractor = extractor or ExhibitExtractor(cache=ExhibitCache())
+        # Token-budgeted case context for the verdict reasoning prompt.
+        self.context_builder = ContextBuilder(self.kb_handler.index, cache=self.extractor.cache)
+        # Per-case KB relevance, accumulated in the background as statements and
+        # exhibits arrive so get_final_verdict() can read the ranking directly.
+        self._relevance: Dict[str, RunningRelevance] = {}
+        self._indexing: Dict[str, List[asyncio.Task]] = {}
+        self.events = events or CaseEvents()
+        self.announcement_mode = announcement_mode
+        self._enrichments: Set[asyncio.Task] = set()
+        # Legal terms in each statement, tagged live per round.
+        self.term_scanner = default_scanner()
+        # Verdicts render in the background so the final submission returns at once.
+        self.verdict_jobs = VerdictJobs(self._run_verdict_job, db_path=self.cases.db_path)
+        self.cases.on_evict.append(self._forget_case)
+
+    def _forget_case(self, case_id: str, reason: str) -> None:
+        """Called when the store drops a case from memory; release our per-case state too."""
+        self.verdict_jobs.forget(case_id)
+        if reason == "ttl":  # idle case: a later verdict falls back to a full corpus search
+            self._relevance.pop(case_id, None)
+            self._indexing.pop(case_id, None)
+
+    async def _call_llm(self, model_name: str, prompt: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         try:
-            return await self.llm.generate_text(model_name, prompt)
+            return await self.llm.generate_text(model_name, prompt, on_token=on_token)
         except Exception as e:
             print(f"LLM call failed: {e}")
             return "Error: Failed to get a response from AI Judge."
 
-    def _extract_file_content(self, files: List[UploadFile]) -> Dict[str, str]:
-        content = {}
-        for file in files:
-            try:
-                file.file.seek(0)
-                if file.filename.endswith(".pdf"):
-                    pdf_reader = PyPDF2.PdfReader(file.file)
-                    text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
-                    content[file.filename] = text
-                elif file.filename.endswith(".txt"):
-                    text = file.file.read().decode('utf-8')
-                    content[file.filename] = text
-            except Exception as e:
-                content[file.filename] = f"[Error reading file: {str(e)}]"
-        return content
-
-    def create_case(
+    async def _announce(
+        self,
+        case_data: Dict[str, Any],
+        key: str,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        **fields,
+    ) -> str:
+        """Judge announcement for a turn transition, in the case's detected language."""
+        if self.announcement_mode == "llm":
+            return await self._call_llm("gemini-1.5-flash-latest", prompt, on_token=on_token)
+        text = render_announcement(key, case_data.get("detected_lang") or "en", **fields)
+        if on_token is not None:
+            on_token(text)
+        return text
+
+    def _schedule_enrichment(self, case_id: str, position: int, prompt: str) -> None:
+        """In "enrich" mode, replace chat_history[position] with LLM phrasing once it is ready."""
+        if self.announcement_mode != "enrich":
+            return
+        task = asyncio.create_task(self._enrich_announcement(case_id, position, prompt))
+        self._enrichments.add(task)
+        task.add_done_callback(self._enrichments.discard)
+
+    async def _enrich_announcement(self, case_id: str, position: int, prompt: str) -> None:
+        text = await self._call_llm("gemini-1.5-flash-latest", prompt)
+        if not text or text.startswith("Error:"):
+            return  # keep the template
+        case_data = self.cases.get(case_id)
+        if not case_data or position >= len(case_data["chat_history"]):
+            return
+        entry = case_data["chat_history"][position]
+        if entry.get("sender") != "judge":
+            return
+        entry["text"] = text
+        self.cases.replace_statement(case_id, position, text)
+        self.events.publish(case_id, {"type": "judge_message", "index": position, "text": text, "enriched": True})
+
+    def _schedule_indexing(self, case_id: str, texts: List[str], exhibits: Dict[str, str]) -> None:
+        """Embed new statements/exhibits off the request path and fold them into the case's table."""
+        tracker = self._relevance.get(case_id)
+        if tracker is None:  # case predates this process; verdict falls back to a full search
+            return
+        task = asyncio.create_task(self._index_incremental(tracker, texts, exhibits))
+        self._indexing.setdefault(case_id, []).append(task)
+
+    async def _index_incremental(self, tracker: RunningRelevance, texts: List[str], exhibits: Dict[str, str]) -> None:
+        """Fold one statement batch (the case opening or a party statement) and its exhibits into `tracker`."""
+        loop = asyncio.get_running_loop()
+        kb, cache = self.kb_handler, self.extractor.cache
+        try:
+            texts = [t for t in texts if t and t.strip()]
+            per_window = await loop.run_in_executor(None, kb.index.search_texts, texts, 24)
+            for sha, text in exhibits.items():
+                if text and not text.startswith("[Error reading file"):
+                    per_window += await loop.run_in_executor(None, kb.score_exhibit, sha, text, cache)
+            tracker.update(per_window, statements=1, exhibits=len(exhibits))
+        except Exception as e:
+            tracker.failed = True
+            print(f"[RAG] incremental indexing failed: {e}")
+
+    async def _extract_file_content(self, files: List[UploadFile]) -> Dict[str, Dict[str, Any]]:
+        """Extract exhibit text on the worker pool; returns {filename: record}."""
+        return await self.extractor.extract_uploads(files)
+
+    def _exhibit_text(self, sha: str) -> str:
+        """Resolve an exhibit hash to its text (disk cache first, then the case store)."""
+        text = self.extractor.cache.get_text(sha) if self.extractor.cache else None
+        if text is None:
+            text = self.cases.get_exhibit_text(sha)
+        return text or ""
+
+    def _exhibits_text(self, refs: Dict[str, str]) -> str:
+        return "\n".join(self._exhibit_text(sha) for sha in refs.values())
+
+    async def create_case(
         self,
         case_title: str,
         scenario: str,
@@ -174,16 +295,19 @@ class CaseFlow:
         defendant_files: List[UploadFile]
     ) -> str:
         case_id = str(uuid.uuid4())
-        plaintiff_content = self._extract_file_content(plaintiff_files)
-        defendant_content = self._extract_file_content(defendant_files)
+        plaintiff_content, defendant_content = await asyncio.gather(
+            self._extract_file_content(plaintiff_files),
+            self._extract_file_content(defendant_files),
+        )
 
-        self.cases[case_id] = {
+        case_data = {
             "case_title": case_title,
             "scenario": scenario,
             "plaintiff_name": plaintiff_name,  # Store plaintiff name
             "defendant_name": defendant_name,  # Store defendant name
-            "initial_plaintiff_files": plaintiff_content,
-            "initial_defendant_files": defendant_content,
+            # filename -> exhibit sha256; text lives once in the exhibit cache/store
+            "initial_plaintiff_files": {name: rec["sha256"] for name, rec in plaintiff_content.items()},
+            "initial_defendant_files": {name: rec["sha256"] for name, rec in defendant_content.items()},
             "plaintiff_round_files": {},
             "defendant_round_files": {},
             "round_statements": {},
@@ -194,10 +318,17 @@ class CaseFlow:
             "final_verdict": None,
             "detected_lang": None,
         }
+        self.cases.create(case_id, case_data, extracted={"plaintiff": plaintiff_content, "defendant": defendant_content})
+        self._relevance[case_id] = RunningRelevance()
+        self._schedule_indexing(
+            case_id,
+            [case_title, scenario],
+            {rec["sha256"]: rec["text"] for recs in (plaintiff_content, defendant_content) for rec in recs.values()},
+        )
         print(f"Case {case_id} created with file content extracted.")
         return case_id
 
-    async def analyze_initial(self, case_id: str) -> str:
+    async def analyze_initial(self, case_id: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         case_data = self.cases.get(case_id)
         if not case_data:
             return "Error: Case not found."
@@ -215,13 +346,28 @@ class CaseFlow:
         This is **Round 1**, and it is now the **Plaintiff's turn** to submit their statement.
         """
 
-        judge_opening = await self._call_llm("gemini-1.5-flash-latest", prompt)
-        case_data["chat_history"].append({"sender": "judge", "text": judge_opening})
+        judge_opening = await self._announce(
+            case_data, "opening", prompt, on_token=on_token, title=case_data["case_title"]
+        )
         case_data["current_speaker"] = "plaintiff"
         case_data["status"] = "in_progress"
+        # Opening twice (a retried or concurrent request) must not reset a session already under way.
+        if not self.cases.save_state(case_id, case_data, expect_status="initial_analysis"):
+            return "The court is already in session."
+        case_data["chat_history"].append({"sender": "judge", "text": judge_opening})
+        self.cases.add_statement(case_id, "judge", judge_opening)
+        self._schedule_enrichment(case_id, len(case_data["chat_history"]) - 1, prompt)
         return judge_opening
 
-    async def handle_message(self, case_id: str, message: str, role: str, files: Optional[List[UploadFile]] = None) -> str:
+    async def handle_message(
+        self,
+        case_id: str,
+        message: str,
+        role: str,
+        files: Optional[List[UploadFile]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Record a party's statement and return the judge's reply (streamed to `on_token` if given)."""
         case_data = self.cases.get(case_id)
         if not case_data:
             return "Error: Case not found."
@@ -234,69 +380,122 @@ class CaseFlow:
         if case_data["current_speaker"] != role:
             return f"It is currently the {case_data['current_speaker']}'s turn."
 
+        # Claim the turn before any slow work: the statement is stored and the
+        # turn handed on in one compare-and-swap, so a duplicate or concurrent
+        # submission (possibly in another worker) is rejected instead of both landing.
+        rnd = case_data["current_round"]
+        next_rnd = rnd + 1
+        if role == "plaintiff":
+            next_turn = ("defendant", rnd, "in_progress")
+        elif rnd < 3:
+            next_turn = ("plaintiff", next_rnd, "in_progress")
+        else:
+            next_turn = (None, rnd, "awaiting_verdict")  # no one can speak now
+        if not self.cases.take_turn(case_id, case_data, role, message, *next_turn):
+            current = self.cases.get(case_id) or case_data
+            return f"It is currently the {current['current_speaker']}'s turn."
+
         # Save chat log
         case_data["chat_history"].append({"sender": role, "text": message})
 
         # Save per-round statement
-        rnd = case_data["current_round"]
-        next_rnd = case_data["current_round"] + 1
         case_data["round_statements"].setdefault(rnd, {"Plaintiff": "", "Defendant": ""})
         case_data["round_statements"][rnd][role] = message
+        tags = self.term_scanner.tags(message)
+        self._round_tags(case_data).setdefault(rnd, {})[role] = tags
+        self.events.publish(case_id, {"type": "round_tags", "round": rnd, "role": role, "tags": tags})
 
         # Save per-round files
         if files:
-            file_content = self._extract_file_content(files)
+            file_content = await self._extract_file_content(files)
+            file_refs = {name: rec["sha256"] for name, rec in file_content.items()}
             round_key = f"round_{rnd}"
             if role == "plaintiff":
-                case_data["plaintiff_round_files"][round_key] = file_content
+                case_data["plaintiff_round_files"][round_key] = file_refs
             else:
-                case_data["defendant_round_files"][round_key] = file_content
+                case_data["defendant_round_files"][round_key] = file_refs
+            self.cases.add_files(case_id, role, round_key, file_content)
+        self._schedule_indexing(
+            case_id,
+            [message],
+            {rec["sha256"]: rec["text"] for rec in file_content.values()} if files else {},
+        )
 
         # Turn-taking logic
+        response_language = self.language_detector.get_language_name(case_data.get("detected_lang") or "en")
+        judge_prompt = None
         if role == "plaintiff":
-            next_speaker = "defendant"
             judge_prompt = f"""
+            Respond entirely in {response_language}.
             The Plaintiff has submitted their statement for Round {rnd}.
                 Round {rnd} for the Plaintiff is now complete.
                 It is now the **Defendant's turn** to submit their statement for Round {rnd}.
 
                 """
 
-            judge_response = await self._call_llm("gemini-1.5-flash-latest", judge_prompt)
+            judge_response = await self._announce(case_data, "defendant_turn", judge_prompt, on_token=on_token, round=rnd)
 
         else:  # defendant
-            if case_data["current_round"] < 3:
-                current_round_number = case_data['current_round']
-                case_data['current_round'] += 1
-                next_speaker = "plaintiff"
+            if rnd < 3:
                 judge_prompt = f"""
+                Respond entirely in {response_language}.
                 The Defendant has submitted their statement for Round {rnd}.
                 Round {rnd} for the Defendant is now complete.
                 It is now the **Plaintiff's turn** to submit their statement for Round {next_rnd}.
 
                 """
 
-                judge_response = await self._call_llm("gemini-1.5-flash-latest", judge_prompt)
-            else:  # defendant in final round
-                case_data["status"] = "awaiting_verdict"
-                final_verdict = await self.get_final_verdict(case_id)
-                case_data["status"] = "verdict_rendered"
-                case_data["final_verdict_message"] = final_verdict  # store separately
-
-                next_speaker = None  # no one can speak now
-
-                # Judge announcement for chat (optional, short)
-                judge_response = (
-                    f"Round 3 of Defendant is finished.\n"
-                    f"The court session is now concluded. The final verdict has been issued in the Verdict section."
+                judge_response = await self._announce(
+                    case_data, "plaintiff_turn", judge_prompt, on_token=on_token, round=rnd, next_round=next_rnd
                 )
+            else:  # defendant in final round
+                # Judge announcement for chat; the verdict itself is rendered by a background job
+                judge_response = render_announcement("deliberating", case_data.get("detected_lang") or "en")
+                if on_token is not None:
+                    on_token(judge_response)
 
 
-        case_data["current_speaker"] = next_speaker
+        # The turn fields were already written by take_turn; writing them again
+        # here could undo a turn the next speaker has taken meanwhile.
         case_data["chat_history"].append({"sender": "judge", "text": judge_response})
+        self.cases.add_statement(case_id, "judge", judge_response)
+        if judge_prompt:
+            self._schedule_enrichment(case_id, len(case_data["chat_history"]) - 1, judge_prompt)
+        if case_data["status"] == "awaiting_verdict":
+            self.verdict_jobs.submit(case_id)
         return judge_response
 
-    async def get_final_verdict(self, case_id: str) -> str:
+    async def _run_verdict_job(self, case_id: str, timings: Dict[str, float]) -> None:
+        """Verdict job body: render the verdict, then close the session if it was waiting on it."""
+        # Reasoning tokens go to /case_events subscribers while the verdict is written.
+        final_verdict = await self.get_final_verdict(
+            case_id, timings, on_token=lambda t: self.events.publish(case_id, {"type": "verdict_token", "text": t})
+        )
+        case_data = self.cases.get(case_id)
+        if not case_data or not case_data.get("final_verdict"):
+            raise RuntimeError(final_verdict)
+        if case_data["status"] == "awaiting_verdict":
+            with record_stage(timings, "persist"):
+                case_data["status"] = "verdict_rendered"
+                case_data["final_verdict_message"] = final_verdict  # store separately
+                # Only the first job to close the session announces it.
+                closed = self.cases.save_state(case_id, case_data, expect_status="awaiting_verdict")
+                if closed:
+                    announcement = render_announcement("concluded", case_data.get("detected_lang") or "en")
+                    case_data["chat_history"].append({"sender": "judge", "text": announcement})
+                    self.cases.add_statement(case_id, "judge", announcement)
+            if closed:
+                self.events.publish(case_id, {
+                    "type": "judge_message", "index": len(case_data["chat_history"]) - 1, "text": announcement,
+                })
+        self.events.publish(case_id, {"type": "verdict_ready", "case_id": case_id, **self.get_case_state(case_id)})
+
+    async def get_final_verdict(
+        self,
+        case_id: str,
+        timings: Optional[Dict[str, float]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
         case_data = self.cases.get(case_id)
         if not case_data:
             return "Error: Case not found."
@@ -305,27 +504,22 @@ class CaseFlow:
 
         lang_code = case_data.get("detected_lang", "en")
 
-        chat_texts = '\n'.join([f"{msg['sender']}: {msg['text']}" for msg in case_data['chat_history']])
-        initial_plaintiff_files = '\n'.join(case_data.get('initial_plaintiff_files', {}).values())
-        initial_defendant_files = '\n'.join(case_data.get('initial_defendant_files', {}).values())
-
-        plaintiff_round_files_text = ""
-        for round_num, files in case_data.get("plaintiff_round_files", {}).items():
-            plaintiff_round_files_text += f"\n--- Plaintiff Files for {round_num} ---\n"
-            plaintiff_round_files_text += "\n".join(files.values())
-
-        defendant_round_files_text = ""
-        for round_num, files in case_data.get("defendant_round_files", {}).items():
-            defendant_round_files_text += f"\n--- Defendant Files for {round_num} ---\n"
-            defendant_round_files_text += "\n".join(files.values())
-
-        full_text_corpus = (
-            f"{case_data['case_title']}\n{case_data['scenario']}\n{chat_texts}\n"
-            f"{initial_plaintiff_files}\n{initial_defendant_files}\n"
-            f"{plaintiff_round_files_text}\n{defendant_round_files_text}"
-        )
-
-        relevant_laws = self.kb_handler.find_relevant_laws(full_text_corpus, lang_code)
+        loop = asyncio.get_running_loop()
+        # Fast path: the case was scored incrementally while the rounds ran.
+        with record_stage(timings, "retrieval"):
+            pending = self._indexing.pop(case_id, [])
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            tracker = self._relevance.pop(case_id, None)
+            # Statements handled by another worker never reach this process's table,
+            # so only trust it when it has seen every input the store recorded.
+            complete = tracker is not None and (tracker.statements, tracker.exhibits) == self._indexing_inputs(case_data)
+            if complete and not tracker.failed and tracker.windows:
+                relevant_laws = self.kb_handler.rank_hits(tracker.ranked(24), lang_code)
+            else:
+                if tracker is not None and not complete:
+                    print(f"[RAG] case {case_id}: incremental table is partial, running the full search")
+                relevant_laws = await loop.run_in_executor(None, self._search_case_corpus, case_data, lang_code)
 
         rounds_struct = {}
         for i in sorted(case_data.get("round_statements", {}).keys()):
@@ -336,6 +530,7 @@ class CaseFlow:
             }
 
         structured_case = {
+            "case_id": case_id,
             "title": case_data["case_title"],
             "scenario": case_data["scenario"],
             "plaintiff_name": case_data["plaintiff_name"],  # Pass plaintiff name
@@ -345,12 +540,82 @@ class CaseFlow:
             "rounds": rounds_struct
         }
         print(">>> VerdictBuilder received case:", structured_case)
-        final_verdict, plaintiff_name, defendant_name, pdf_path = await self.verdict_builder.build_verdict(structured_case)
-        case_data["final_verdict"] = final_verdict
-        case_data["final_verdict_pdf"] = pdf_path
-        case_data["verdict_date"] = datetime.now().isoformat()
+        with record_stage(timings, "context"):
+            exhibits = {sha: self._exhibit_text(sha) for sha in self._case_exhibit_refs(case_data)}
+            structured_case["context"] = await loop.run_in_executor(
+                None, self.context_builder.build, structured_case, exhibits, relevant_laws
+            )
+        final_verdict, plaintiff_name, defendant_name, pdf_path = await self.verdict_builder.build_verdict(
+            structured_case, timings=timings, on_token=on_token
+        )
+        with record_stage(timings, "persist"):
+            case_data["final_verdict"] = final_verdict
+            case_data["final_verdict_pdf"] = pdf_path
+            case_data["verdict_date"] = datetime.now().isoformat()
+            self.cases.save_verdict(case_id, final_verdict, pdf_path, case_data["verdict_date"])
         return final_verdict
 
+    @staticmethod
+    def _indexing_inputs(case_data: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        (statement batches, exhibits) the case has submitted for indexing, counted
+        from its stored state the way _schedule_indexing batches them: the opening
+        (title + scenario + initial exhibits) and one batch per party statement.
+        """
+        initial = set(case_data.get("initial_plaintiff_files", {}).values())
+        initial |= set(case_data.get("initial_defendant_files", {}).values())
+        exhibits = len(initial)
+        for role in ("plaintiff_round_files", "defendant_round_files"):
+            exhibits += sum(len(set(refs.values())) for refs in case_data.get(role, {}).values())
+        statements = 1 + sum(1 for m in case_data.get("chat_history", []) if m.get("sender") in ("plaintiff", "defendant"))
+        return statements, exhibits
+
+    def _case_exhibit_refs(self, case_data: Dict[str, Any]) -> List[str]:
+        """Every exhibit hash cited by the case, initial files first, without duplicates."""
+        refs: List[str] = []
+        buckets = [case_data.get("initial_plaintiff_files", {}), case_data.get("initial_defendant_files", {})]
+        for party in ("plaintiff", "defendant"):
+            buckets.extend(case_data.get(f"{party}_round_files", {}).values())
+        for bucket in buckets:
+            for sha in bucket.values():
+                if sha not in refs:
+                    refs.append(sha)
+        return refs
+
+    def _search_case_corpus(self, case_data: Dict[str, Any], lang_code: str) -> List[Dict[str, str]]:
+        """Slow path: search the KB with the whole case corpus in one go."""
+        chat_texts = '\n'.join([f"{msg['sender']}: {msg['text']}" for msg in case_data['chat_history']])
+        initial_plaintiff_files = self._exhibits_text(case_data.get('initial_plaintiff_files', {}))
+        initial_defendant_files = self._exhibits_text(case_data.get('initial_defendant_files', {}))
+
+        plaintiff_round_files_text = ""
+        for round_num, files in case_data.get("plaintiff_round_files", {}).items():
+            plaintiff_round_files_text += f"\n--- Plaintiff Files for {round_num} ---\n"
+            plaintiff_round_files_text += self._exhibits_text(files)
+
+        defendant_round_files_text = ""
+        for round_num, files in case_data.get("defendant_round_files", {}).items():
+            defendant_round_files_text += f"\n--- Defendant Files for {round_num} ---\n"
+            defendant_round_files_text += self._exhibits_text(files)
+
+        full_text_corpus = (
+            f"{case_data['case_title']}\n{case_data['scenario']}\n{chat_texts}\n"
+            f"{initial_plaintiff_files}\n{initial_defendant_files}\n"
+            f"{plaintiff_round_files_text}\n{defendant_round_files_text}"
+        )
+
+        return self.kb_handler.find_relevant_laws(full_text_corpus, lang_code)
+
+    def _round_tags(self, case_data: Dict[str, Any]) -> Dict[int, Dict[str, Dict[str, List[str]]]]:
+        """{round: {role: {category: labels}}} for the case's statements so far."""
+        tags = case_data.get("round_tags")
+        if tags is None:  # case loaded from the store: tag the saved statements once
+            tags = case_data["round_tags"] = {
+                rnd: {role: self.term_scanner.tags(text) for role, text in statements.items() if text}
+                for rnd, statements in case_data.get("round_statements", {}).items()
+            }
+        return tags
+
     def get_case_state(self, case_id: str) -> dict:
         case_data = self.cases.get(case_id, {})
         return {
@@ -358,4 +623,5 @@ class CaseFlow:
             "current_round": case_data.get("current_round"),
             "status": case_data.get("status"),
             "detected_lang": case_data.get("detected_lang"),
+            "round_tags": self._round_tags(case_data) if case_data else {},
         }
@@ -0,0 +1,514 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exhibit_cache import sha256_hex
+from .metrics import DB_QUERY_SECONDS
+
+# backend/mahawthada.db, shared with the chatbot tables
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mahawthada.db")
+
+# Bounds for the in-process case cache; evicted cases are re-read from SQLite on demand.
+CASE_CACHE_MAX_CASES = int(os.environ.get("AI_JUDGE_CASE_CACHE_MAX_CASES", 256))
+CASE_CACHE_MAX_BYTES = int(os.environ.get("AI_JUDGE_CASE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+CASE_CACHE_TTL_SECONDS = float(os.environ.get("AI_JUDGE_CASE_CACHE_TTL_SECONDS", 3600))
+
+# Statuses after which a case no longer changes; evicted first under pressure.
+_FINISHED_STATUSES = ("verdict_rendered",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    case_title TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    plaintiff_name TEXT,
+    defendant_name TEXT,
+    current_round INTEGER NOT NULL DEFAULT 0,
+    current_speaker TEXT,
+    status TEXT NOT NULL,
+    detected_lang TEXT,
+    final_verdict_message TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    case_id TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    plaintiff TEXT,
+    defendant TEXT,
+    PRIMARY KEY (case_id, round),
+    FOREIGN KEY (case_id) REFERENCES cases (case_id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT NOT NULL,
+    round INTEGER,
+    sender TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (case_id) REFERENCES cases (case_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_statements_case ON statements (case_id, id);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT NOT NULL,
+    party TEXT NOT NULL,
+    round_key TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content TEXT,
+    extract_ms REAL,
+    sha256 TEXT,
+    FOREIGN KEY (case_id) REFERENCES cases (case_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_files_case ON files (case_id, id);
+CREATE TABLE IF NOT EXISTS exhibits (
+    sha256 TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    case_id TEXT PRIMARY KEY,
+    verdict_text TEXT,
+    pdf_path TEXT,
+    verdict_date TEXT,
+    FOREIGN KEY (case_id) REFERENCES cases (case_id) ON DELETE CASCADE
+);
+"""
+
+# Fields of the in-memory case dict that live on the `cases` row.
+_STATE_FIELDS = (
+    "case_title", "scenario", "plaintiff_name", "defendant_name", "current_round",
+    "current_speaker", "status", "detected_lang", "final_verdict_message",
+)
+
+# (table, column, declaration) for columns added to existing databases.
+_ADDED_COLUMNS = (
+    ("files", "extract_ms", "REAL"),
+    ("files", "sha256", "TEXT"),
+)
+
+
+def estimate_bytes(obj: Any) -> int:
+    """Rough deep size of a case dict (strings, containers and scalars)."""
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class CaseStore:
+    """
+    SQLite-backed repository for courtroom cases with an in-process read cache.
+
+    Callers get back the same dict shape CaseFlow always used, mutate it, and
+    write the change through with one of the save/add methods. Every write bumps
+    the row's `version`; a cached case is reused only while its version matches
+    the database, so several uvicorn workers can serve the same case (WAL mode
+    lets readers proceed while one worker writes).
+
+    The cache is bounded by case count, estimated bytes and idle TTL. Since
+    every case is already on disk, eviction only drops the in-memory copy;
+    finished cases go first, then the least recently used. Callbacks in
+    `on_evict` receive (case_id, reason) so owners can drop per-case state.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        max_cases: int = CASE_CACHE_MAX_CASES,
+        max_bytes: int = CASE_CACHE_MAX_BYTES,
+        ttl_seconds: float = CASE_CACHE_TTL_SECONDS,
+    ):
+        self.db_path = db_path
+        self.max_cases = max_cases
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.on_evict: List[Callable[[str, str], None]] = []
+        self._local = threading.local()
+        # case_id -> (version, case dict), least recently used first
+        self._cache: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._atime: Dict[str, float] = {}
+        self._cache_lock = threading.Lock()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+
+    # ---------- connection
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit mode with explicit transactions.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add columns introduced after a table was first created."""
+        for table, column, decl in _ADDED_COLUMNS:
+            existing = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+        # Older rows stored exhibit text inline; move it into `exhibits` by hash.
+        legacy = conn.execute("SELECT id, content FROM files WHERE sha256 IS NULL AND content IS NOT NULL").fetchall()
+        for row in legacy:
+            sha = sha256_hex(row["content"].encode("utf-8"))
+            conn.execute(
+                "INSERT OR IGNORE INTO exhibits (sha256, text, size) VALUES (?, ?, ?)",
+                (sha, row["content"], len(row["content"])),
+            )
+            conn.execute("UPDATE files SET sha256 = ?, content = NULL WHERE id = ?", (sha, row["id"]))
+
+    def _read(self) -> "_Transaction":
+        return _Transaction(self._connection(), "DEFERRED")
+
+    def _write(self) -> "_Transaction":
+        return _Transaction(self._connection(), "IMMEDIATE")
+
+    # ---------- reads
+    def get(self, case_id: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        with self._read() as conn:
+            row = conn.execute("SELECT version FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+            if row is None:
+                return default
+            with self._cache_lock:
+                cached = self._cache.get(case_id)
+                if cached and cached[0] == row["version"]:
+                    self._cache.move_to_end(case_id)
+                    self._atime[case_id] = time.time()
+                    self.cache_hits += 1
+                    return cached[1]
+                self.cache_misses += 1
+            case_data, version = self._load(conn, case_id)
+        self._cache_put(case_id, version, case_data)
+        return case_data
+
+    def __contains__(self, case_id: str) -> bool:
+        return self.get(case_id) is not None
+
+    def _load(self, conn: sqlite3.Connection, case_id: str) -> Tuple[Dict[str, Any], int]:
+        row = conn.execute("SELECT * FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        case_data: Dict[str, Any] = {field: row[field] for field in _STATE_FIELDS}
+        case_data.update({
+            "initial_plaintiff_files": {},
+            "initial_defendant_files": {},
+            "plaintiff_round_files": {},
+            "defendant_round_files": {},
+            "round_statements": {},
+            "chat_history": [],
+            "final_verdict": None,
+        })
+        if case_data["final_verdict_message"] is None:
+            del case_data["final_verdict_message"]
+
+        for r in conn.execute("SELECT * FROM rounds WHERE case_id = ? ORDER BY round", (case_id,)):
+            rd = {"Plaintiff": "", "Defendant": ""}
+            for role in ("plaintiff", "defendant"):
+                if r[role] is not None:
+                    rd[role] = r[role]
+            case_data["round_statements"][r["round"]] = rd
+
+        for s in conn.execute("SELECT sender, text FROM statements WHERE case_id = ? ORDER BY id", (case_id,)):
+            case_data["chat_history"].append({"sender": s["sender"], "text": s["text"]})
+
+        # File buckets hold exhibit hashes; the text is resolved on demand.
+        for f in conn.execute("SELECT party, round_key, filename, sha256 FROM files WHERE case_id = ? ORDER BY id", (case_id,)):
+            if f["round_key"] == "initial":
+                bucket = case_data[f"initial_{f['party']}_files"]
+            else:
+                bucket = case_data[f"{f['party']}_round_files"].setdefault(f["round_key"], {})
+            bucket[f["filename"]] = f["sha256"]
+
+        v = conn.execute("SELECT * FROM verdicts WHERE case_id = ?", (case_id,)).fetchone()
+        if v is not None:
+            case_data["final_verdict"] = v["verdict_text"]
+            case_data["final_verdict_pdf"] = v["pdf_path"]
+            case_data["verdict_date"] = v["verdict_date"]
+        return case_data, row["version"]
+
+    # ---------- writes
+    def create(
+        self,
+        case_id: str,
+        case_data: Dict[str, Any],
+        extracted: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+    ) -> None:
+        """Insert a new case; `extracted` maps party -> ExhibitExtractor records."""
+        extracted = extracted or {}
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT INTO cases (case_id, {', '.join(_STATE_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in _STATE_FIELDS)})",
+                (case_id, *[case_data.get(field) for field in _STATE_FIELDS]),
+            )
+            for party in ("plaintiff", "defendant"):
+                self._insert_files(conn, case_id, party, "initial", extracted.get(party, {}))
+            self._remember(conn, case_id, case_data)
+
+    def save_state(self, case_id: str, case_data: Dict[str, Any], expect_status: Optional[str] = None) -> bool:
+        """
+        Persist the scalar turn/status fields of the case. With `expect_status`
+        the write is a compare-and-swap on the stored status: it returns False,
+        writing nothing and dropping the cached copy the caller mutated, when
+        another request moved the case on first.
+        """
+        guard, params = "", []
+        if expect_status is not None:
+            guard, params = " AND status = ?", [expect_status]
+        with self._write() as conn:
+            updated = conn.execute(
+                f"UPDATE cases SET {', '.join(f'{field} = ?' for field in _STATE_FIELDS)}, "
+                f"version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE case_id = ?{guard}",
+                (*[case_data.get(field) for field in _STATE_FIELDS], case_id, *params),
+            ).rowcount
+            if updated != 1:
+                with self._cache_lock:
+                    self._drop_locked(case_id)
+                return False
+            self._remember(conn, case_id, case_data)
+        return True
+
+    def add_statement(self, case_id: str, sender: str, text: str, rnd: Optional[int] = None) -> None:
+        """Append a chat-history entry; party statements also fill the round row."""
+        with self._write() as conn:
+            self._insert_statement(conn, case_id, sender, text, rnd)
+            self._bump(conn, case_id)
+
+    def take_turn(
+        self,
+        case_id: str,
+        case_data: Dict[str, Any],
+        role: str,
+        text: str,
+        next_speaker: Optional[str],
+        next_round: int,
+        next_status: str,
+    ) -> bool:
+        """
+        Record `role`'s statement for the current round and hand the turn on, as
+        one compare-and-swap on the stored turn: only succeeds while the case is
+        in progress with `role` to speak in `case_data`'s round. Returns False,
+        writing nothing, when another request (in any worker) took the turn first.
+        On success `case_data` carries the new turn fields.
+        """
+        rnd = case_data["current_round"]
+        with self._write() as conn:
+            claimed = conn.execute(
+                "UPDATE cases SET current_speaker = ?, current_round = ?, status = ?, version = version + 1, "
+                "updated_at = CURRENT_TIMESTAMP "
+                "WHERE case_id = ? AND status = 'in_progress' AND current_speaker = ? AND current_round = ?",
+                (next_speaker, next_round, next_status, case_id, role, rnd),
+            ).rowcount
+            if claimed != 1:
+                return False
+            self._insert_statement(conn, case_id, role, text, rnd)
+            case_data.update(current_speaker=next_speaker, current_round=next_round, status=next_status)
+            self._remember(conn, case_id, case_data)
+        return True
+
+    @staticmethod
+    def _insert_statement(conn: sqlite3.Connection, case_id: str, sender: str, text: str, rnd: Optional[int]) -> None:
+        conn.execute(
+            "INSERT INTO statements (case_id, round, sender, text) VALUES (?, ?, ?, ?)",
+            (case_id, rnd, sender, text),
+        )
+        if rnd is not None and sender in ("plaintiff", "defendant"):
+            conn.execute("INSERT OR IGNORE INTO rounds (case_id, round) VALUES (?, ?)", (case_id, rnd))
+            conn.execute(
+                f"UPDATE rounds SET {sender} = ? WHERE case_id = ? AND round = ?",
+                (text, case_id, rnd),
+            )
+
+    def replace_statement(self, case_id: str, position: int, text: str) -> bool:
+        """Rewrite the text of the `position`-th chat-history entry (0-based)."""
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT id FROM statements WHERE case_id = ? ORDER BY id LIMIT 1 OFFSET ?",
+                (case_id, position),
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("UPDATE statements SET text = ? WHERE id = ?", (text, row["id"]))
+            self._bump(conn, case_id)
+        return True
+
+    def add_files(
+        self,
+        case_id: str,
+        party: str,
+        round_key: str,
+        records: Dict[str, Dict[str, Any]],
+    ) -> None:
+        with self._write() as conn:
+            self._insert_files(conn, case_id, party, round_key, records)
+            self._bump(conn, case_id)
+
+    def save_verdict(self, case_id: str, verdict_text: str, pdf_path: Optional[str], verdict_date: str) -> None:
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verdicts (case_id, verdict_text, pdf_path, verdict_date) VALUES (?, ?, ?, ?)",
+                (case_id, verdict_text, pdf_path, verdict_date),
+            )
+            self._bump(conn, case_id)
+
+    def _insert_files(
+        self,
+        conn: sqlite3.Connection,
+        case_id: str,
+        party: str,
+        round_key: str,
+        records: Dict[str, Dict[str, Any]],
+    ) -> None:
+        # Exhibit text is stored once per content hash, however many cases cite it.
+        conn.executemany(
+            "INSERT OR REPLACE INTO exhibits (sha256, text, size) VALUES (?, ?, ?)",
+            [(rec["sha256"], rec["text"], len(rec["text"])) for rec in records.values()],
+        )
+        conn.executemany(
+            "INSERT INTO files (case_id, party, round_key, filename, sha256, extract_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            [(case_id, party, round_key, name, rec["sha256"], rec.get("ms")) for name, rec in records.items()],
+        )
+
+    def get_exhibit_text(self, sha: str) -> Optional[str]:
+        with self._read() as conn:
+            row = conn.execute("SELECT text FROM exhibits WHERE sha256 = ?", (sha,)).fetchone()
+        return row["text"] if row else None
+
+    def _bump(self, conn: sqlite3.Connection, case_id: str) -> None:
+        conn.execute(
+            "UPDATE cases SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE case_id = ?",
+            (case_id,),
+        )
+        with self._cache_lock:
+            cached = self._cache.get(case_id)
+        if cached:
+            self._remember(conn, case_id, cached[1])
+
+    def _remember(self, conn: sqlite3.Connection, case_id: str, case_data: Dict[str, Any]) -> None:
+        # The caller's dict already holds the change it just wrote; keep it as
+        # the cached copy at the new version instead of reloading from disk.
+        version = conn.execute("SELECT version FROM cases WHERE case_id = ?", (case_id,)).fetchone()["version"]
+        self._cache_put(case_id, version, case_data)
+
+    # ---------- cache bounds
+    def _cache_put(self, case_id: str, version: int, case_data: Dict[str, Any]) -> None:
+        size = estimate_bytes(case_data)
+        with self._cache_lock:
+            self._cache[case_id] = (version, case_data)
+            self._cache.move_to_end(case_id)
+            self._sizes[case_id] = size
+            self._atime[case_id] = time.time()
+            evicted = self._evict_locked(keep=case_id)
+        self._notify(evicted)
+
+    def sweep(self) -> int:
+        """Drop idle and over-budget cases from memory; returns how many were evicted."""
+        with self._cache_lock:
+            evicted = self._evict_locked()
+        self._notify(evicted)
+        return len(evicted)
+
+    def _evict_locked(self, keep: Optional[str] = None) -> List[Tuple[str, str]]:
+        evicted: List[Tuple[str, str]] = []
+        now = time.time()
+        for case_id in list(self._cache):
+            if case_id != keep and now - self._atime.get(case_id, now) > self.ttl_seconds:
+                evicted.append((case_id, "ttl"))
+                self._drop_locked(case_id)
+
+        def over_budget() -> bool:
+            return len(self._cache) > self.max_cases or sum(self._sizes.values()) > self.max_bytes
+
+        while over_budget():
+            candidates = [cid for cid in self._cache if cid != keep]
+            if not candidates:
+                break
+            finished = [cid for cid in candidates if self._cache[cid][1].get("status") in _FINISHED_STATUSES]
+            victim = (finished or candidates)[0]
+            evicted.append((victim, "finished" if finished else "lru"))
+            self._drop_locked(victim)
+        self.evictions += len(evicted)
+        return evicted
+
+    def _drop_locked(self, case_id: str) -> None:
+        self._cache.pop(case_id, None)
+        self._sizes.pop(case_id, None)
+        self._atime.pop(case_id, None)
+
+    def _notify(self, evicted: List[Tuple[str, str]]) -> None:
+        for case_id, reason in evicted:
+            for callback in self.on_evict:
+                try:
+                    callback(case_id, reason)
+                except Exception as e:
+                    print(f"[CASE STORE] eviction callback failed for {case_id}: {e}")
+
+    def memory_stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            cached = len(self._cache)
+            estimated = sum(self._sizes.values())
+            finished = sum(1 for v in self._cache.values() if v[1].get("status") in _FINISHED_STATUSES)
+        return {
+            "cached_cases": cached,
+            "finished_cached_cases": finished,
+            "estimated_bytes": estimated,
+            "max_cases": self.max_cases,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of stored cases per status."""
+        with self._read() as conn:
+            return {r["status"]: r["n"] for r in conn.execute("SELECT status, COUNT(*) AS n FROM cases GROUP BY status")}
+
+    def case_ids(self) -> List[str]:
+        with self._read() as conn:
+            return [r["case_id"] for r in conn.execute("SELECT case_id FROM cases ORDER BY created_at")]
+
+
+class _Transaction:
+    """
+    Context manager running a block in one transaction on `conn`. Writers use
+    IMMEDIATE so they take the write lock up front instead of failing mid-way.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, mode: str = "DEFERRED"):
+        self.conn = conn
+        self.mode = mode
+        self._start = 0.0
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._start = time.perf_counter()
+        self.conn.execute(f"BEGIN {self.mode}")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.conn.execute("COMMIT")
+            else:
+                self.conn.execute("ROLLBACK")
+        finally:
+            DB_QUERY_SECONDS.observe(
+                time.perf_counter() - self._start,
+                db="case_store",
+                op="read" if self.mode == "DEFERRED" else "write",
+            )
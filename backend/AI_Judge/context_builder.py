@@ -0,0 +1,179 @@
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .exhibit_cache import ExhibitCache
+from .llm_backends import estimate_tokens
+from .rag import VectorIndexer
+
+# Prompt budget for the verdict reasoning call. gemma3:4b runs with a small
+# Ollama context window by default, and the answer needs room too.
+CONTEXT_BUDGET_TOKENS = int(os.environ.get("AI_JUDGE_CONTEXT_TOKENS", 3000))
+
+# Share of the budget per section; whatever a section leaves unused is handed
+# on to the sections after it, in this order.
+DEFAULT_SHARES: Dict[str, float] = {
+    "scenario": 0.20,
+    "statements": 0.35,
+    "exhibits": 0.30,
+    "statutes": 0.15,
+}
+
+
+def truncate_to_tokens(text: str, budget: int, count: Callable[[str], int] = estimate_tokens) -> str:
+    """Longest prefix of `text` within `budget` tokens, cut at a word boundary where possible."""
+    if count(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:  # binary search on the character length
+        mid = (lo + hi + 1) // 2
+        if count(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    space = cut.rfind(" ")
+    if space > lo * 0.8:
+        cut = cut[:space]
+    cut = cut.rstrip()
+    return cut + " …" if cut else ""
+
+
+class ContextBuilder:
+    """
+    Assembles the case context for the verdict LLM call within a token budget.
+
+    Scenario and statements are trimmed to their share; exhibits contribute only
+    the passages most similar to the case (ranked with the KB `VectorIndexer`
+    encoder, reusing chunk embeddings from the exhibit cache); statutes are the
+    retrieved KB sections in ranked order.
+    """
+
+    def __init__(
+        self,
+        indexer: VectorIndexer,
+        cache: Optional[ExhibitCache] = None,
+        budget_tokens: int = CONTEXT_BUDGET_TOKENS,
+        shares: Optional[Dict[str, float]] = None,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+    ):
+        self.indexer = indexer
+        self.cache = cache
+        self.budget_tokens = budget_tokens
+        self.shares = shares or DEFAULT_SHARES
+        self.count_tokens = count_tokens
+
+    def build(
+        self,
+        case: Dict[str, Any],
+        exhibits: Dict[str, str],
+        statutes: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """
+        `case` is the structured case (title, scenario, rounds), `exhibits` maps
+        sha256 -> text and `statutes` are law records from LegalKnowledgeBase.
+        Returns the rendered "text" plus per-section token counts.
+        """
+        sections: Dict[str, str] = {}
+        used: Dict[str, int] = {}
+        carry = 0
+        for name, share in self.shares.items():
+            budget = int(self.budget_tokens * share) + carry
+            if name == "scenario":
+                text = truncate_to_tokens(f"Case: {case.get('title', '')}\n{case.get('scenario', '')}", budget, self.count_tokens)
+            elif name == "statements":
+                text = self._statements(case.get("rounds", {}), budget)
+            elif name == "exhibits":
+                query = "\n".join([case.get("scenario", ""), sections.get("statements", "")])
+                text = self._exhibit_passages(query, exhibits, budget)
+            else:
+                text = self._statutes(statutes, budget)
+            sections[name] = text
+            used[name] = self.count_tokens(text)
+            carry = max(0, budget - used[name])
+
+        rendered = "\n\n".join(
+            f"{heading}:\n{sections[name]}"
+            for name, heading in (
+                ("scenario", "SCENARIO"),
+                ("statements", "STATEMENTS"),
+                ("exhibits", "EXHIBIT EXCERPTS"),
+                ("statutes", "RELEVANT STATUTES"),
+            )
+            if sections.get(name)
+        )
+        total = self.count_tokens(rendered)
+        print(f"[CONTEXT] {total}/{self.budget_tokens} tokens " + ", ".join(f"{k}={v}" for k, v in used.items()))
+        return {"text": rendered, "sections": sections, "tokens": used, "total_tokens": total}
+
+    # ---------- sections
+    def _statements(self, rounds: Dict[Any, Dict[str, str]], budget: int) -> str:
+        # Give every statement an equal slice, so late rounds are not crowded out.
+        entries: List[str] = []
+        for rnd in sorted(rounds, key=lambda r: int(r)):
+            for party in ("plaintiff", "defendant"):
+                text = (rounds[rnd].get(party) or "").strip()
+                if text and text != "No statement":
+                    entries.append(f"Round {rnd} {party.capitalize()}: {text}")
+        if not entries:
+            return ""
+        per_entry = max(budget // len(entries), 1)
+        return "\n".join(truncate_to_tokens(e, per_entry, self.count_tokens) for e in entries)
+
+    def _exhibit_passages(self, query: str, exhibits: Dict[str, str], budget: int) -> str:
+        if budget <= 0 or not query.strip():
+            return ""
+        passages: List[str] = []
+        embeddings: List[np.ndarray] = []
+        for sha, text in exhibits.items():
+            if not text or text.startswith("[Error reading file"):
+                continue
+            chunks, emb = self._chunks(sha, text)
+            if not chunks:
+                continue
+            passages.extend(chunks)
+            embeddings.append(emb)
+        if not passages:
+            return ""
+        q = self.indexer.encode_queries([query])[0]
+        sims = np.vstack(embeddings) @ q  # rows are normalized: cosine similarity
+        picked: List[Tuple[int, str]] = []
+        spent = 0
+        for i in np.argsort(-sims):
+            cost = self.count_tokens(passages[i])
+            if spent + cost > budget:
+                continue
+            picked.append((int(i), passages[i]))
+            spent += cost
+        picked.sort()  # keep document order so excerpts read naturally
+        return "\n…\n".join(p for _, p in picked)
+
+    def _chunks(self, sha: str, text: str) -> Tuple[List[str], np.ndarray]:
+        cached = self.cache.get_chunks(sha) if self.cache else None
+        if cached is not None:
+            return cached
+        chunks = self.indexer.split_windows(text)
+        if not chunks:
+            return [], np.zeros((0, 1), dtype=np.float32)
+        emb = self.indexer.encode_queries(chunks)
+        if self.cache:
+            self.cache.put_chunks(sha, chunks, emb)
+        return chunks, emb
+
+    def _statutes(self, statutes: List[Dict[str, str]], budget: int) -> str:
+        lines: List[str] = []
+        spent = 0
+        for law in statutes:
+            line = f"Section {law.get('section')} - {law.get('title')}: {law.get('text')}"
+            cost = self.count_tokens(line)
+            if spent + cost > budget:
+                line = truncate_to_tokens(line, budget - spent, self.count_tokens)
+                if line:
+                    lines.append(line)
+                break
+            lines.append(line)
+            spent += cost
+        return "\n".join(lines)
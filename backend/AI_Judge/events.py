@@ -0,0 +1,54 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Set
+
+KEEPALIVE_SECONDS = 15
+
+
+class CaseEvents:
+    """
+    In-process pub/sub of courtroom events per case, delivered to clients as
+    Server-Sent Events. Slow subscribers drop events rather than block the judge.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, case_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.setdefault(case_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, case_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(case_id)
+        if subs is not None:
+            subs.discard(queue)
+            if not subs:
+                del self._subscribers[case_id]
+
+    def publish(self, case_id: str, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(case_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    async def stream(self, case_id: str) -> AsyncIterator[str]:
+        """SSE-formatted event stream for one case, with keep-alive comments."""
+        queue = self.subscribe(case_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            self.unsubscribe(case_id, queue)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    name = event.get("type", "message")
+    return f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+EXHIBIT_CACHE_DIR = os.environ.get("AI_JUDGE_EXHIBIT_CACHE_DIR", ".exhibit_cache")
+EXHIBIT_CACHE_MAX_BYTES = int(os.environ.get("AI_JUDGE_EXHIBIT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExhibitCache:
+    """
+    Content-addressed on-disk cache of extracted exhibit text, keyed by the
+    SHA-256 of the uploaded bytes, plus optional embedding chunks per exhibit.
+
+    Layout: <cache_dir>/<sha[:2]>/<sha>.txt, <sha>.chunks.json, <sha>.chunks.npy.
+    Entries are evicted least-recently-used (by mtime, refreshed on every hit)
+    once the total size exceeds `max_bytes`. Several processes may share the
+    directory; a file evicted by another process simply reads as a miss.
+    """
+
+    def __init__(self, cache_dir: str = EXHIBIT_CACHE_DIR, max_bytes: int = EXHIBIT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # sha -> {file suffix: bytes}, and sha -> last access time
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._atime: Dict[str, float] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan()
+
+    # ---------- paths
+    def _path(self, sha: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, sha[:2], f"{sha}{suffix}")
+
+    def _scan(self) -> None:
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if ".tmp." in entry.name:
+                    continue
+                sha, _, ext = entry.name.partition(".")
+                st = entry.stat()
+                self._sizes.setdefault(sha, {})[f".{ext}"] = st.st_size
+                self._atime[sha] = max(self._atime.get(sha, 0.0), st.st_mtime)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total()
+
+    def _total(self) -> int:
+        return sum(sum(files.values()) for files in self._sizes.values())
+
+    # ---------- text
+    def get_text(self, sha: str) -> Optional[str]:
+        path = self._path(sha, ".txt")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._sizes.pop(sha, None)
+                self._atime.pop(sha, None)
+            return None
+        self._touch(sha, path)
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put_text(self, sha: str, text: str) -> None:
+        self._write(sha, ".txt", text.encode("utf-8"))
+
+    # ---------- embedding chunks
+    def get_chunks(self, sha: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        try:
+            with open(self._path(sha, ".chunks.json"), "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+            emb = np.load(self._path(sha, ".chunks.npy"))
+        except (FileNotFoundError, ValueError):
+            return None
+        self._touch(sha, self._path(sha, ".chunks.npy"))
+        return chunks, emb
+
+    def put_chunks(self, sha: str, chunks: List[str], emb: np.ndarray) -> None:
+        self._write(sha, ".chunks.json", json.dumps(chunks, ensure_ascii=False).encode("utf-8"))
+        buf = self._path(sha, ".chunks.npy")
+        os.makedirs(os.path.dirname(buf), exist_ok=True)
+        tmp = f"{buf}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(emb, dtype=np.float32))
+        size = os.path.getsize(tmp)
+        os.replace(tmp, buf)
+        self._account(sha, ".chunks.npy", size)
+
+    # ---------- internals
+    def _write(self, sha: str, suffix: str, payload: bytes) -> None:
+        path = self._path(sha, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        self._account(sha, suffix, len(payload))
+
+    def _touch(self, sha: str, path: str) -> None:
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            if sha in self._sizes:
+                self._atime[sha] = now
+
+    def _account(self, sha: str, suffix: str, size: int) -> None:
+        with self._lock:
+            self._sizes.setdefault(sha, {})[suffix] = size
+            self._atime[sha] = time.time()
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            total = self._total()
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for sha in sorted(self._atime, key=self._atime.get):
+                if total <= self.max_bytes:
+                    break
+                victims.append(sha)
+                total -= sum(self._sizes.get(sha, {}).values())
+            for sha in victims:
+                self._sizes.pop(sha, None)
+                self._atime.pop(sha, None)
+        for sha in victims:
+            for suffix in (".txt", ".chunks.json", ".chunks.npy"):
+                try:
+                    os.remove(self._path(sha, suffix))
+                except FileNotFoundError:
+                    pass
+        if victims:
+            print(f"[EXHIBIT CACHE] evicted {len(victims)} exhibit(s); {total} bytes cached")
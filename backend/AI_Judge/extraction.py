@@ -0,0 +1,163 @@
+import asyncio
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import PyPDF2
+
+try:
+    from .exhibit_cache import ExhibitCache, sha256_hex
+    from .lifecycle import process_pool_context
+except ImportError:  # imported as a top-level module (legacy scripts)
+    from exhibit_cache import ExhibitCache, sha256_hex
+    from lifecycle import process_pool_context
+
+MAX_FILE_BYTES = int(os.environ.get("AI_JUDGE_MAX_FILE_BYTES", 20 * 1024 * 1024))
+MAX_PDF_PAGES = int(os.environ.get("AI_JUDGE_MAX_PDF_PAGES", 200))
+PAGES_PER_TASK = 8
+
+
+# Worker-local: the reader for the last PDF this process opened, so the chunks
+# of one upload that land on the same worker parse its xref only once.
+_last_reader: Tuple[Optional[str], Optional[PyPDF2.PdfReader]] = (None, None)
+
+
+def _pdf_pages(reader: PyPDF2.PdfReader, start: int, stop: int) -> Tuple[List[str], int]:
+    total = len(reader.pages)
+    return [reader.pages[i].extract_text() or "" for i in range(start, min(stop, total))], total
+
+
+def _extract_pdf_range(path: str, start: int, stop: int) -> Tuple[List[str], int]:
+    """Worker: extract pages [start, stop) of the PDF at `path`; also reports the page count."""
+    global _last_reader
+    if _last_reader[0] != path:
+        _last_reader = (path, PyPDF2.PdfReader(path))
+    return _pdf_pages(_last_reader[1], start, stop)
+
+
+def _spill(data: bytes) -> str:
+    """Write an upload to a temporary file the workers can open by path."""
+    fd, path = tempfile.mkstemp(prefix="exhibit_", suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _decode_text(data: bytes) -> str:
+    return data.decode("utf-8")
+
+
+class ExhibitExtractor:
+    """
+    Extracts text from uploaded exhibits off the event loop.
+
+    PDF pages are extracted in parallel chunks on a worker pool (processes by
+    default, since PyPDF2 is pure Python and holds the GIL). The upload is
+    written to a temporary file once and workers open it by path, rather than
+    each chunk pickling the whole file. Files larger than
+    `max_bytes` are rejected and only the first `max_pages` pages are read.
+    With a `cache`, uploads whose bytes were seen before skip PyPDF2 entirely.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_FILE_BYTES,
+        max_pages: int = MAX_PDF_PAGES,
+        pages_per_task: int = PAGES_PER_TASK,
+        workers: Optional[int] = None,
+        use_processes: bool = True,
+        cache: Optional[ExhibitCache] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.pages_per_task = pages_per_task
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self._pool: Optional[Executor] = None
+        self.cache = cache
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            if self.use_processes:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=process_pool_context())
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ---------- async API (request path)
+    async def extract_uploads(self, files: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract every supported UploadFile concurrently.
+        Returns {filename: {"sha256", "text", "ms", "cached"}}.
+        """
+        jobs = []
+        for file in files or []:
+            if file.filename.lower().endswith((".pdf", ".txt")):
+                jobs.append(self._extract_upload(file))
+        results = await asyncio.gather(*jobs)
+        return {rec["filename"]: rec for rec in results}
+
+    async def _extract_upload(self, file: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        sha, cached = None, False
+        try:
+            await file.seek(0)
+            data = await file.read(self.max_bytes + 1)
+            sha = sha256_hex(data)
+            text = self.cache.get_text(sha) if self.cache else None
+            cached = text is not None
+            if text is None:
+                text = await self.extract_bytes(file.filename, data)
+                if self.cache and not text.startswith("[Error reading file"):
+                    self.cache.put_text(sha, text)
+        except Exception as e:
+            text = f"[Error reading file: {str(e)}]"
+        if sha is None:
+            sha = sha256_hex(text.encode("utf-8"))
+        ms = (time.perf_counter() - start) * 1000
+        print(f"[EXTRACT] {file.filename}: {len(text)} chars in {ms:.0f} ms{' (cached)' if cached else ''}")
+        return {"filename": file.filename, "sha256": sha, "text": text, "ms": ms, "cached": cached}
+
+    async def extract_bytes(self, filename: str, data: bytes) -> str:
+        if len(data) > self.max_bytes:
+            return f"[Error reading file: file exceeds the {self.max_bytes // (1024 * 1024)} MB limit]"
+        if filename.lower().endswith(".txt"):
+            return _decode_text(data)  # cheap; not worth shipping the bytes to a worker
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, _spill, data)
+        try:
+            # First chunk also tells us the page count; the rest fan out in parallel.
+            first, total = await loop.run_in_executor(self.pool, _extract_pdf_range, path, 0, self.pages_per_task)
+            limit = min(total, self.max_pages)
+            ranges = [(s, min(s + self.pages_per_task, limit)) for s in range(self.pages_per_task, limit, self.pages_per_task)]
+            rest = await asyncio.gather(*[
+                loop.run_in_executor(self.pool, _extract_pdf_range, path, s, e) for s, e in ranges
+            ])
+        finally:
+            os.remove(path)
+        pages = first[:limit] + [page for chunk, _ in rest for page in chunk]
+        return self._join_pages(pages, total)
+
+    # ---------- sync API (scripts / LegalAnalyzer)
+    def extract_sync(self, filename: str, data: bytes) -> str:
+        if len(data) > self.max_bytes:
+            return f"[Error reading file: file exceeds the {self.max_bytes // (1024 * 1024)} MB limit]"
+        if filename.lower().endswith(".txt"):
+            return _decode_text(data)
+        pages, total = _pdf_pages(PyPDF2.PdfReader(io.BytesIO(data)), 0, self.max_pages)
+        return self._join_pages(pages, total)
+
+    def _join_pages(self, pages: List[str], total: int) -> str:
+        text = "".join(pages)
+        if total > self.max_pages:
+            text += f"\n[Truncated: only the first {self.max_pages} of {total} pages were extracted]"
+        return text
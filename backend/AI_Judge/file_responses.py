@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+# A URL naming a rendered PDF never changes content: let clients keep it.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# A URL that resolves to "the latest PDF" may change: store, but revalidate by ETag.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+CHUNK_SIZE = 64 * 1024
+ETAG_CACHE_SIZE = int(os.environ.get("AI_JUDGE_ETAG_CACHE_SIZE", "2048"))
+
+# path -> (mtime_ns, size, etag), least recently served first; the hash is
+# recomputed only when the file changes or its entry has been evicted.
+_etags: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_etags_lock = threading.Lock()
+
+
+def file_etag(path: str) -> str:
+    """Strong ETag from the SHA-256 of the file contents, cached by (mtime, size)."""
+    st = os.stat(path)
+    with _etags_lock:
+        cached = _etags.get(path)
+        if cached:
+            _etags.move_to_end(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()}"'
+    with _etags_lock:
+        _etags[path] = (st.st_mtime_ns, st.st_size, etag)
+        _etags.move_to_end(path)
+        while len(_etags) > ETAG_CACHE_SIZE:
+            _etags.popitem(last=False)
+    return etag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == etag:
+            return True
+    return False
+
+
+async def cached_file_response(
+    request: Request,
+    path: str,
+    filename: str,
+    media_type: str = "application/pdf",
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+) -> Response:
+    """
+    Serve a file with a content-hash ETag: 304 when If-None-Match matches,
+    otherwise a FileResponse carrying that ETag, which also answers Range and
+    If-Range requests. The hash is computed off the event loop.
+    """
+    etag = await asyncio.get_running_loop().run_in_executor(None, file_etag, path)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "Content-Disposition"})
+    return FileResponse(path, media_type=media_type, headers=headers)
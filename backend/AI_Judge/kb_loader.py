@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Resolve KB path relative to this module directory so it works from any CWD
+DEFAULT_KB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Project_KB_modified.json")
+
+_KB_CACHE: Dict[str, List[Dict[str, Any]]] = {}
+_KB_LOCK = threading.Lock()
+
+def load_kb(kb_path: str) -> List[Dict[str, Any]]:
+    """
+    Load the chapters/sections KB JSON once per process and share it between
+    LegalKnowledgeBase and VerdictBuilder. Raises FileNotFoundError /
+    json.JSONDecodeError like a plain json.load so callers keep their handling.
+    """
+    key = os.path.abspath(kb_path)
+    with _KB_LOCK:
+        if key not in _KB_CACHE:
+            with open(key, "r", encoding="utf-8") as f:
+                _KB_CACHE[key] = json.load(f)
+        return _KB_CACHE[key]
+
+# Known language keys in LanguageDetector
+KB_LANGS = ["en", "my", "zh", "ja"]
+
+def flatten_sections(kb: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Flatten chapters→sections into per-language “documents”.
+    Each section produces a doc per language we find (the `kb_sections` index).
+    """
+    docs: List[str] = []
+    metas: List[Dict[str, Any]] = []
+
+    for chapter in (kb or []):
+        for section in chapter.get("sections", []):
+            sec_id = section.get("section", "N/A")
+            for lang in KB_LANGS:
+                chap = chapter.get(f"chapter_title_{lang}", "") or ""
+                title = section.get(f"title_{lang}", "") or ""
+                text = section.get(f"text_{lang}", "") or ""
+
+                if text.strip() or title.strip():
+                    body = f"{chap}\nSection {sec_id}: {title}\n{text}".strip()
+                    docs.append(body)
+                    metas.append({
+                        "lang": lang,
+                        "section": sec_id,
+                        "chapter_title": chap or "N/A",
+                        "title": title or "N/A",
+                        "text": text or "N/A",
+                    })
+    return docs, metas
+
+def flatten_sections_en(kb: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """English title + text per section (the VerdictBuilder `kb_index`)."""
+    texts: List[str] = []
+    metadata: List[Dict[str, Any]] = []
+    for chapter in (kb or []):
+        for section in chapter.get("sections", []):
+            sec_id = str(section["section"])
+            texts.append(f"{section.get('title_en','')}. {section.get('text_en','')}".strip())
+            metadata.append({
+                "section": sec_id,
+                "title_en": section.get("title_en", ""),
+                "text_en": section.get("text_en", ""),
+            })
+    return texts, metadata
+
+
+# ---------- penalty table
+# Bump when parse_penalty() changes so persisted tables are rebuilt.
+PENALTY_RULES_VERSION = 1
+PENALTY_CACHE_PATH = os.path.join(".rag_cache", "kb_penalties.json")
+# Term used by sentencing when a statute states no years.
+DEFAULT_MIN_YEARS = 1
+DEFAULT_MAX_YEARS = 10
+
+_PENALTY_CACHE: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_YEARS_RE = re.compile(r"(\d+)\s*year")
+_FINE_RE = re.compile(r"\bfine\b")
+
+
+def penalty_key(section_id: Any, text_en: str) -> str:
+    """
+    Penalty table key. Section numbers repeat across the laws in the KB, so the
+    key also carries a short hash of the English statute text.
+    """
+    digest = hashlib.sha1((text_en or "").encode("utf-8")).hexdigest()[:12]
+    return f"{section_id}#{digest}"
+
+
+def parse_penalty(text_en: str) -> Dict[str, Any]:
+    """
+    Structured penalty of one statute: stated years (None when there are none),
+    whether a fine, life imprisonment or death is mentioned.
+    """
+    statute = (text_en or "").lower()
+    years = [int(x) for x in _YEARS_RE.findall(statute)]
+    return {
+        "min_years": min(years) if years else None,
+        "max_years": max(years) if years else None,
+        "fine": bool(_FINE_RE.search(statute)),
+        "life": "life imprisonment" in statute,
+        "death": "death" in statute,
+    }
+
+
+def build_penalty_table(kb: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """penalty_key -> {section, title_en, min_years, max_years, fine, life, death} for every section."""
+    table: Dict[str, Dict[str, Any]] = {}
+    for chapter in (kb or []):
+        for section in chapter.get("sections", []):
+            sec_id = str(section["section"])
+            text = section.get("text_en", "") or ""
+            table[penalty_key(sec_id, text)] = {
+                "section": sec_id,
+                "title_en": section.get("title_en", ""),
+                **parse_penalty(text),
+            }
+    return table
+
+
+def _kb_signature(kb_path: str) -> str:
+    with open(kb_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return f"{digest}:v{PENALTY_RULES_VERSION}"
+
+
+def load_penalties(
+    kb_path: str = DEFAULT_KB_PATH, cache_path: str = PENALTY_CACHE_PATH, rebuild: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    The KB's penalty table, computed once and persisted next to the vector
+    indexes. The file carries a signature of the KB contents and the parsing
+    rules; a mismatch (KB edited, rules changed) rebuilds it.
+    """
+    key = os.path.abspath(kb_path)
+    with _KB_LOCK:
+        if key in _PENALTY_CACHE and not rebuild:
+            return _PENALTY_CACHE[key]
+    signature = _kb_signature(key)
+    table: Optional[Dict[str, Dict[str, Any]]] = None
+    if not rebuild and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("signature") == signature:
+                table = cached["penalties"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[KB] ignoring unreadable penalty table {cache_path}: {e}")
+    if table is None:
+        table = build_penalty_table(load_kb(key))
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp = f"{cache_path}.tmp.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "kb_path": key, "penalties": table}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, cache_path)
+        print(f"[KB] penalty table for {len(table)} sections written to {cache_path}")
+    with _KB_LOCK:
+        _PENALTY_CACHE[key] = table
+    return table
+
+
+def validate_penalties(kb_path: str = DEFAULT_KB_PATH, cache_path: str = PENALTY_CACHE_PATH) -> List[str]:
+    """Problems with the persisted table: stale signature, records differing from a fresh parse, bad ranges."""
+    problems: List[str] = []
+    if not os.path.exists(cache_path):
+        return [f"{cache_path} does not exist"]
+    with open(cache_path, "r", encoding="utf-8") as f:
+        cached = json.load(f)
+    if cached.get("signature") != _kb_signature(os.path.abspath(kb_path)):
+        problems.append("signature does not match the KB (stale table)")
+    stored = cached.get("penalties", {})
+    fresh = build_penalty_table(load_kb(kb_path))
+    for key in sorted(set(fresh) - set(stored)):
+        problems.append(f"{key}: missing")
+    for key in sorted(set(stored) - set(fresh)):
+        problems.append(f"{key}: not in the KB")
+    for key in sorted(set(stored) & set(fresh)):
+        if stored[key] != fresh[key]:
+            problems.append(f"{key}: differs from the KB ({stored[key]} != {fresh[key]})")
+        rec = stored[key]
+        if rec["min_years"] is not None and rec["min_years"] > rec["max_years"]:
+            problems.append(f"{key}: min_years > max_years")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Inspect the precomputed penalty table:
+
+        python -m backend.AI_Judge.kb_loader --rebuild
+        python -m backend.AI_Judge.kb_loader --validate
+        python -m backend.AI_Judge.kb_loader --section 302
+    """
+    parser = argparse.ArgumentParser(description="Build, validate or inspect the KB penalty table.")
+    parser.add_argument("--kb", default=DEFAULT_KB_PATH, help="path to the KB JSON")
+    parser.add_argument("--cache", default=PENALTY_CACHE_PATH, help="penalty table path (the serving CWD's .rag_cache)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute and rewrite the table")
+    parser.add_argument("--validate", action="store_true", help="compare the persisted table with the KB")
+    parser.add_argument("--section", help="print the records for this section id")
+    args = parser.parse_args(argv)
+
+    if args.validate:
+        problems = validate_penalties(args.kb, args.cache)
+        for problem in problems:
+            print(problem)
+        print(f"[KB] {len(problems)} problem(s) in {args.cache}")
+        raise SystemExit(1 if problems else 0)
+
+    table = load_penalties(args.kb, args.cache, rebuild=args.rebuild)
+    if args.section:
+        for key, rec in table.items():
+            if rec["section"] == args.section:
+                print(key, json.dumps(rec, ensure_ascii=False))
+        return
+    stated = sum(1 for rec in table.values() if rec["max_years"] is not None)
+    print(
+        f"[KB] {len(table)} sections: {stated} with stated years, "
+        f"{sum(rec['fine'] for rec in table.values())} fine, "
+        f"{sum(rec['life'] for rec in table.values())} life, "
+        f"{sum(rec['death'] for rec in table.values())} death"
+    )
+
+
+if __name__ == "__main__":
+    main()
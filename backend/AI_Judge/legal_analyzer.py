@@ -1,10 +1,11 @@
 import json
 from llm_handler import LLMHandler
-import PyPDF2
+from extraction import ExhibitExtractor
 
 class LegalAnalyzer:
     def __init__(self):
         self.llm_handler = LLMHandler()
+        self.extractor = ExhibitExtractor()
         try:
             with open("laws.json", "r") as f:
                 self.knowledge_base = json.load(f)
@@ -26,16 +27,11 @@ class LegalAnalyzer:
         content = []
         for file in files:
             try:
-                if hasattr(file, 'file'):
-                    if file.filename.endswith(".pdf"):
-                        pdf_reader = PyPDF2.PdfReader(file.file)
-                        text = "".join(
-                            page.extract_text() or "" for page in pdf_reader.pages
-                        )
-                        content.append(f"{file.filename}: {text}")
-                    elif file.filename.endswith(".txt"):
-                        text = file.file.read().decode('utf-8')
-                        content.append(f"{file.filename}: {text}")
+                if hasattr(file, 'file') and file.filename.lower().endswith((".pdf", ".txt")):
+                    file.file.seek(0)
+                    data = file.file.read(self.extractor.max_bytes + 1)
+                    text = self.extractor.extract_sync(file.filename, data)
+                    content.append(f"{file.filename}: {text}")
             except Exception as e:
                 content.append(f"{file.filename}: [Error reading file: {str(e)}]")
         return content
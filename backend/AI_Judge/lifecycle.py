@@ -0,0 +1,108 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def process_pool_context() -> BaseContext:
+    """
+    Start method for worker process pools. Forking a server that holds event
+    loops, threads and open connections copies them into the child; forkserver
+    (spawn where it is unavailable, e.g. Windows) starts from a clean process.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class LazyComponent:
+    """
+    A heavy object (KB, embedding model, LLM client...) built on first use.
+    Construction happens at most once, even when several threads ask for it.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._ready = False
+        self.init_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> Any:
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                print(f"[LIFECYCLE] initializing {self.name}...")
+                start = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self.error = str(e)
+                    print(f"[LIFECYCLE] {self.name} failed after {time.perf_counter() - start:.2f}s: {e}")
+                    raise
+                self.init_seconds = time.perf_counter() - start
+                self.error = None
+                self._ready = True
+                print(f"[LIFECYCLE] {self.name} ready in {self.init_seconds:.2f}s")
+        return self._value
+
+
+class Lifecycle:
+    """
+    Registry of lazily initialized components with readiness reporting and
+    parallel warm-up. Factories may call `get()` for their own dependencies.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, LazyComponent] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._components[name] = LazyComponent(name, factory)
+
+    def get(self, name: str) -> Any:
+        return self._components[name].get()
+
+    def is_ready(self, name: str) -> bool:
+        comp = self._components.get(name)
+        return bool(comp and comp.ready)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "ready": comp.ready,
+                "init_seconds": round(comp.init_seconds, 3) if comp.init_seconds is not None else None,
+                "error": comp.error,
+            }
+            for name, comp in self._components.items()
+        }
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Initialize components in parallel threads (one per component, so a factory
+        waiting on a dependency never starves the pool). Blocks until all finish.
+        """
+        targets: List[str] = list(names) if names is not None else list(self._components)
+        pending = [n for n in targets if n in self._components and not self._components[n].ready]
+        if pending:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="warmup") as pool:
+                futures = {name: pool.submit(self._components[name].get) for name in pending}
+                for name, fut in futures.items():
+                    try:
+                        fut.result()
+                    except Exception:
+                        pass  # already logged and recorded on the component
+            print(f"[LIFECYCLE] warm-up of {len(pending)} component(s) took {time.perf_counter() - start:.2f}s")
+        return {n: s for n, s in self.status().items() if n in targets}
+
+
+# Process-wide registry shared by the AI Judge app and the chatbot app.
+lifecycle = Lifecycle()
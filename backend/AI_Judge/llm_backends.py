@@ -0,0 +1,533 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+try:
+    from .metrics import (
+        LLM_FIRST_TOKEN_SECONDS, LLM_MODEL_LOAD_SECONDS, LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_TOKENS,
+        LLM_TOKENS_PER_SECOND,
+    )
+    from .ollama_pool import OllamaPool
+except ImportError:  # imported as a top-level module (legacy scripts)
+    from metrics import (
+        LLM_FIRST_TOKEN_SECONDS, LLM_MODEL_LOAD_SECONDS, LLM_REQUEST_SECONDS, LLM_REQUESTS, LLM_TOKENS,
+        LLM_TOKENS_PER_SECOND,
+    )
+    from ollama_pool import OllamaPool
+
+# "ollama" (default), "gemini" or "stub" (canned replies, no network).
+LLM_BACKEND = os.environ.get("AI_JUDGE_LLM_BACKEND", "ollama")
+OLLAMA_MODEL = os.environ.get("AI_JUDGE_OLLAMA_MODEL", "gemma3:4b")
+# Generation can legitimately take minutes; connecting should not.
+LLM_CONNECT_TIMEOUT = float(os.environ.get("AI_JUDGE_LLM_CONNECT_TIMEOUT", 5))
+LLM_READ_TIMEOUT = float(os.environ.get("AI_JUDGE_LLM_READ_TIMEOUT", 300))
+LLM_MAX_CONCURRENCY = int(os.environ.get("AI_JUDGE_LLM_MAX_CONCURRENCY", 4))
+# Sent with every Ollama request so the model stays loaded between cases.
+OLLAMA_KEEP_ALIVE = os.environ.get("AI_JUDGE_OLLAMA_KEEP_ALIVE", "30m")
+# Models loaded on every host at startup (comma-separated; empty disables preloading).
+OLLAMA_PRELOAD_MODELS = [
+    m.strip() for m in os.environ.get("AI_JUDGE_OLLAMA_PRELOAD", OLLAMA_MODEL).split(",") if m.strip()
+]
+# Keep-warm pings while people are using the courtroom: local hours "start-end".
+OLLAMA_PING_SECONDS = float(os.environ.get("AI_JUDGE_OLLAMA_PING_SECONDS", 600))
+OLLAMA_PING_HOURS = os.environ.get("AI_JUDGE_OLLAMA_PING_HOURS", "8-20")
+OLLAMA_PING_TZ = os.environ.get("AI_JUDGE_OLLAMA_PING_TZ", "Asia/Yangon")
+# Load durations below this are a warm model answering, not a load event.
+MODEL_LOAD_THRESHOLD_SECONDS = 0.5
+
+VERTEX_PROJECT = os.environ.get("VERTEX_PROJECT", "tiny-equations-ai-teacher")
+VERTEX_LOCATION = os.environ.get("VERTEX_LOCATION", "global")
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", 8))
+
+Message = Dict[str, str]  # {"role": "system" | "user" | "assistant", "content": ...}
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for the generation model: ~4 characters per token for
+    ASCII, ~1 token per character for Myanmar/CJK scripts.
+    """
+    if not text:
+        return 0
+    non_ascii = len(_NON_ASCII.findall(text))
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+class BackendMetrics:
+    """Request counts, latency and token usage for one backend."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies: Deque[float] = deque(maxlen=256)
+        self.first_token: Deque[float] = deque(maxlen=256)
+        self.model_loads = 0
+        self.model_load_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ok: bool, seconds: float, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+                return
+            self.latencies.append(seconds)
+            self.prompt_tokens += prompt_tokens or 0
+            self.completion_tokens += completion_tokens or 0
+
+    def observe_first_token(self, seconds: float) -> None:
+        with self._lock:
+            self.first_token.append(seconds)
+
+    def observe_model_load(self, seconds: float) -> None:
+        with self._lock:
+            self.model_loads += 1
+            self.model_load_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            first = sorted(self.first_token)
+
+        def pct(values: List[float], p: float) -> Optional[float]:
+            return round(values[min(len(values) - 1, int(p * len(values)))], 3) if values else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50_s": pct(latencies, 0.50),
+            "latency_p95_s": pct(latencies, 0.95),
+            "first_token_p50_s": pct(first, 0.50),
+            "model_loads": self.model_loads,
+            "model_load_seconds": round(self.model_load_seconds, 3),
+        }
+
+
+# Weak: a backend dropped by its owner (e.g. a per-request client) leaves the list.
+_backends: "weakref.WeakSet[LLMBackend]" = weakref.WeakSet()
+_backends_lock = threading.Lock()
+
+
+def backend_stats() -> List[Dict[str, Any]]:
+    """Metrics of every backend created in this process (chatbot and AI Judge alike)."""
+    with _backends_lock:
+        backends = list(_backends)
+    return [b.stats() for b in backends]
+
+
+class LLMBackend(ABC):
+    """
+    One way of reaching a language model. Subclasses implement `generate`,
+    `stream` and `chat`; `options` use Ollama's names (temperature, seed,
+    top_p) and are translated by each backend. Calls are recorded in
+    `self.metrics`.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.metrics = BackendMetrics()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        with _backends_lock:
+            _backends.add(self)
+
+    @abstractmethod
+    async def generate(self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        ...
+
+    @abstractmethod
+    def stream(
+        self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        ...
+
+    @abstractmethod
+    async def chat(
+        self, messages: List[Message], max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        ...
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "model": self.model, **self.metrics.stats()}
+
+    # ---------- helpers for subclasses
+    def limit(self) -> asyncio.Semaphore:
+        """Per-event-loop semaphore bounding concurrent calls to this backend."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @contextmanager
+    def observe(self) -> Iterator[Dict[str, int]]:
+        """
+        Time the block; set "prompt_tokens"/"completion_tokens" (and "load_seconds",
+        time the server spent loading the model) on the yielded dict.
+        """
+        call = {"prompt_tokens": 0, "completion_tokens": 0, "load_seconds": 0.0}
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield call
+            ok = True
+        except GeneratorExit:  # the consumer stopped reading a stream early
+            ok = True
+            raise
+        finally:
+            # Model loading is reported on its own so it does not skew generation latency.
+            seconds = max(time.perf_counter() - start - call["load_seconds"], 0.0)
+            self.metrics.observe(ok, seconds, call["prompt_tokens"], call["completion_tokens"])
+            self._export(ok, seconds, call)
+
+    def _export(self, ok: bool, seconds: float, call: Dict[str, Any]) -> None:
+        labels = {"backend": self.name, "model": self.model}
+        LLM_REQUESTS.inc(outcome="ok" if ok else "error", **labels)
+        if not ok:
+            return
+        if call["load_seconds"]:
+            self.metrics.observe_model_load(call["load_seconds"])
+            LLM_MODEL_LOAD_SECONDS.observe(call["load_seconds"], **labels)
+        LLM_REQUEST_SECONDS.observe(seconds, **labels)
+        LLM_TOKENS.inc(call["prompt_tokens"] or 0, kind="prompt", **labels)
+        LLM_TOKENS.inc(call["completion_tokens"] or 0, kind="completion", **labels)
+        if call["completion_tokens"] and seconds > 0:
+            LLM_TOKENS_PER_SECOND.observe(call["completion_tokens"] / seconds, **labels)
+
+    def _first_token(self, seconds: float) -> None:
+        self.metrics.observe_first_token(seconds)
+        LLM_FIRST_TOKEN_SECONDS.observe(seconds, backend=self.name, model=self.model)
+
+
+def in_hours(hours: str, tz: str = OLLAMA_PING_TZ) -> bool:
+    """True when the local hour in `tz` falls in "start-end" (end exclusive; may wrap midnight)."""
+    try:
+        start, end = (int(h) for h in hours.split("-", 1))
+    except ValueError:
+        return True
+    import pytz
+
+    hour = datetime.now(pytz.timezone(tz)).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+_shared_pool: Optional[OllamaPool] = None
+
+
+def shared_pool() -> OllamaPool:
+    """Process-wide pool over OLLAMA_HOSTS, so every handler sees the same host load."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = OllamaPool(
+            max_concurrency=LLM_MAX_CONCURRENCY,
+            timeout=httpx.Timeout(
+                connect=LLM_CONNECT_TIMEOUT, read=LLM_READ_TIMEOUT, write=30.0, pool=LLM_READ_TIMEOUT
+            ),
+        )
+    return _shared_pool
+
+
+class OllamaBackend(LLMBackend):
+    """Local Ollama through an OllamaPool (per-host connection reuse and concurrency limits)."""
+
+    name = "ollama"
+
+    def __init__(
+        self, model: str = OLLAMA_MODEL, pool: Optional[OllamaPool] = None, keep_alive: Optional[str] = OLLAMA_KEEP_ALIVE
+    ):
+        super().__init__(model)
+        self.pool = pool or shared_pool()
+        self.keep_alive = keep_alive
+
+    def _payload(self, **fields: Any) -> Dict[str, Any]:
+        payload = {"model": self.model, **fields}
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _usage(self, call: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Token counts and model-load time from a final Ollama response (durations are in ns)."""
+        call["prompt_tokens"] = data.get("prompt_eval_count", 0)
+        call["completion_tokens"] = data.get("eval_count", 0)
+        load = (data.get("load_duration") or 0) / 1e9
+        if load >= MODEL_LOAD_THRESHOLD_SECONDS:
+            call["load_seconds"] = load
+            print(f"[OLLAMA] {self.model} was loaded for this request ({load:.2f}s)")
+
+    async def preload(self, models: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load `models` (default OLLAMA_PRELOAD_MODELS) on every host: an empty
+        prompt makes Ollama load the model and keep it for `keep_alive`.
+        Returns model -> host url -> load seconds, or the error message.
+        """
+        report: Dict[str, Dict[str, Any]] = {}
+        for model in models if models is not None else OLLAMA_PRELOAD_MODELS:
+            payload = {"model": model, "prompt": "", "stream": False}
+            if self.keep_alive:
+                payload["keep_alive"] = self.keep_alive
+            report[model] = {}
+            for host, result in await self.pool.post_each("/api/generate", payload):
+                if isinstance(result, Exception):
+                    print(f"[OLLAMA] preload of {model} on {host.url} failed: {result}")
+                    report[model][host.url] = str(result)
+                    continue
+                load = (result.get("load_duration") or 0) / 1e9
+                report[model][host.url] = round(load, 3)
+                if load >= MODEL_LOAD_THRESHOLD_SECONDS:
+                    print(f"[OLLAMA] loaded {model} on {host.url} in {load:.2f}s")
+                    LLM_MODEL_LOAD_SECONDS.observe(load, backend=self.name, model=model)
+                    if model == self.model:
+                        self.metrics.observe_model_load(load)
+        return report
+
+    async def keep_warm(
+        self,
+        models: Optional[List[str]] = None,
+        interval: float = OLLAMA_PING_SECONDS,
+        hours: str = OLLAMA_PING_HOURS,
+        leader: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> None:
+        """
+        Preload now, then re-ping every `interval` seconds inside business `hours`.
+        With `leader`, a round only pings when it returns True, so one of several
+        workers does the pinging. A failed round is logged and the next one still runs.
+        """
+        first = True
+        while True:
+            try:
+                if (leader is None or await leader()) and (first or in_hours(hours)):
+                    await self.preload(models)
+            except Exception as e:
+                print(f"[OLLAMA] keep-warm round failed: {e}")
+            first = False
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _options(max_tokens: Optional[int], options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        opts = dict(options or {})
+        if max_tokens is not None:
+            opts["num_predict"] = max_tokens
+        return opts
+
+    async def generate(self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        payload = self._payload(prompt=prompt, stream=False, options=self._options(max_tokens, options))
+        with self.observe() as call:
+            data = await self.pool.post_json("/api/generate", payload)
+            self._usage(call, data)
+        if "response" in data:   # Ollama returns "response"
+            return data["response"].strip()
+        return str(data)
+
+    async def stream(
+        self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        payload = self._payload(prompt=prompt, stream=True, options=self._options(max_tokens, options))
+        start = time.perf_counter()
+        first = True
+        with self.observe() as call:
+            async for chunk in self.pool.stream("/api/generate", payload):
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                if chunk.get("response"):
+                    if first:
+                        self._first_token(time.perf_counter() - start)
+                        first = False
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    self._usage(call, chunk)
+                    break
+
+    async def chat(
+        self, messages: List[Message], max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = self._payload(messages=messages, stream=False, options=self._options(max_tokens, options))
+        with self.observe() as call:
+            data = await self.pool.post_json("/api/chat", payload)
+            self._usage(call, data)
+        return data.get("message", {}).get("content", "")
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "hosts": self.pool.stats(), "hedged_requests": self.pool.hedged}
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Gemini on Vertex AI through google-genai's async client. `config` holds
+    extra GenerateContentConfig fields (safety settings, thinking config, ...)
+    applied to every request. google-genai is only imported when used.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        model: str = GEMINI_MODEL,
+        project: str = VERTEX_PROJECT,
+        location: str = VERTEX_LOCATION,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(model, max_concurrency)
+        self.project = project
+        self.location = location
+        self.config = dict(config or {})
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from google import genai
+
+                self._client = genai.Client(vertexai=True, project=self.project, location=self.location)
+            return self._client
+
+    def _request(
+        self, messages: List[Message], max_tokens: Optional[int], options: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Any], Any]:
+        from google.genai import types
+
+        system = [m["content"] for m in messages if m["role"] == "system"]
+        contents = [
+            types.Content(
+                role="model" if m["role"] == "assistant" else "user",
+                parts=[types.Part.from_text(text=m["content"])],
+            )
+            for m in messages
+            if m["role"] != "system"
+        ]
+        fields = dict(self.config)
+        for ollama_name, gemini_name in (("temperature", "temperature"), ("top_p", "top_p"), ("seed", "seed")):
+            if options and ollama_name in options:
+                fields[gemini_name] = options[ollama_name]
+        if max_tokens is not None:
+            fields["max_output_tokens"] = max_tokens
+        if system:
+            fields["system_instruction"] = [types.Part.from_text(text=s) for s in system]
+        return contents, types.GenerateContentConfig(**fields)
+
+    @staticmethod
+    def _usage(call: Dict[str, int], response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            call["prompt_tokens"] = usage.prompt_token_count or 0
+            call["completion_tokens"] = usage.candidates_token_count or 0
+
+    async def generate(self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        return await self.chat([{"role": "user", "content": prompt}], max_tokens, options)
+
+    async def chat(
+        self, messages: List[Message], max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        contents, config = self._request(messages, max_tokens, options)
+        async with self.limit():
+            with self.observe() as call:
+                response = await self.client().aio.models.generate_content(
+                    model=self.model, contents=contents, config=config
+                )
+                self._usage(call, response)
+        return response.text or ""
+
+    async def stream(
+        self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        async for piece in self.stream_chat([{"role": "user", "content": prompt}], max_tokens, options):
+            yield piece
+
+    async def stream_chat(
+        self, messages: List[Message], max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        contents, config = self._request(messages, max_tokens, options)
+        start = time.perf_counter()
+        first = True
+        async with self.limit():
+            with self.observe() as call:
+                async for chunk in await self.client().aio.models.generate_content_stream(
+                    model=self.model, contents=contents, config=config
+                ):
+                    self._usage(call, chunk)
+                    if chunk.text:
+                        if first:
+                            self._first_token(time.perf_counter() - start)
+                            first = False
+                        yield chunk.text
+
+
+class StubBackend(LLMBackend):
+    """
+    Canned replies without any model, for development and load tests. `reply`
+    maps the prompt to the answer (default: a short echo); `delay` simulates
+    generation time per call.
+    """
+
+    name = "stub"
+
+    def __init__(self, model: str = "stub", reply: Optional[Callable[[str], str]] = None, delay: float = 0.0):
+        super().__init__(model)
+        self.reply = reply or (lambda prompt: f"[stub reply] {prompt.strip()[-200:]}")
+        self.delay = delay
+
+    async def generate(self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None) -> str:
+        with self.observe() as call:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            text = self.reply(prompt)
+            call["prompt_tokens"] = estimate_tokens(prompt)
+            call["completion_tokens"] = estimate_tokens(text)
+        return text
+
+    async def stream(
+        self, prompt: str, max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        text = await self.generate(prompt, max_tokens, options)
+        for word in re.findall(r"\S+\s*", text):
+            yield word
+
+    async def chat(
+        self, messages: List[Message], max_tokens: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        return await self.generate("\n".join(m["content"] for m in messages), max_tokens, options)
+
+
+_default: Optional[LLMBackend] = None
+_default_lock = threading.Lock()
+
+
+def default_backend() -> LLMBackend:
+    """Process-wide backend selected by AI_JUDGE_LLM_BACKEND."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            if LLM_BACKEND == "stub":
+                _default = StubBackend()
+            elif LLM_BACKEND == "gemini":
+                _default = GeminiBackend()
+            else:
+                _default = OllamaBackend()
+        return _default
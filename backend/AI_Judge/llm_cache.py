@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+LLM_CACHE_ENABLED = os.environ.get("AI_JUDGE_LLM_CACHE", "0") == "1"
+LLM_CACHE_PATH = os.environ.get("AI_JUDGE_LLM_CACHE_PATH", ".llm_cache.sqlite")
+LLM_CACHE_MAX_BYTES = int(os.environ.get("AI_JUDGE_LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at);
+"""
+
+
+class LLMCache:
+    """
+    SQLite cache of LLM responses keyed by (model, prompt, decoding options).
+
+    Only deterministic requests are cached: temperature 0, or an explicit seed.
+    Once the stored responses exceed `max_bytes`, the least recently read
+    entries are dropped until the cache is back under 90% of the limit.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, prompt: str, options: Dict[str, Any]) -> str:
+        blob = json.dumps({"model": model, "prompt": prompt, "options": options}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def cacheable(options: Dict[str, Any]) -> bool:
+        return options.get("temperature") == 0 or options.get("seed") is not None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, size, now, now),
+                )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        with self._conn:
+            for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at").fetchall():
+                if self._bytes <= target:
+                    break
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._bytes -= size
+                removed += 1
+        print(f"[LLM CACHE] evicted {removed} response(s); {self._bytes} bytes cached")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_shared: Optional[LLMCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_llm_cache() -> Optional[LLMCache]:
+    """Process-wide cache when AI_JUDGE_LLM_CACHE=1, else None."""
+    global _shared
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = LLMCache()
+        return _shared
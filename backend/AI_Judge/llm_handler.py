@@ -1,31 +1,145 @@
-import asyncio
-import requests
-import json
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+try:
+    from .llm_backends import LLMBackend, OllamaBackend, default_backend, estimate_tokens
+    from .llm_cache import LLMCache, shared_llm_cache
+    from .ollama_pool import OllamaPool
+except ImportError:  # imported as a top-level module (legacy scripts)
+    from llm_backends import LLMBackend, OllamaBackend, default_backend, estimate_tokens
+    from llm_cache import LLMCache, shared_llm_cache
+    from ollama_pool import OllamaPool
+
+# Decoding options sent with every request. Responses are only cached when
+# they are reproducible, i.e. with a fixed seed or temperature 0.
+LLM_SEED = os.environ.get("AI_JUDGE_LLM_SEED")
+LLM_TEMPERATURE = os.environ.get("AI_JUDGE_LLM_TEMPERATURE")
+
+
+def default_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if LLM_SEED is not None:
+        options["seed"] = int(LLM_SEED)
+    if LLM_TEMPERATURE is not None:
+        options["temperature"] = float(LLM_TEMPERATURE)
+    return options
+
 
 class LLMHandler:
     """
     LLM handler using Ollama local server (gemma3:4b).
     No API key required; runs locally.
+
+    Calls go through an LLMBackend (see llm_backends; AI_JUDGE_LLM_BACKEND picks
+    ollama, gemini or stub). The Ollama backend uses an OllamaPool: keep-alive
+    connections per host, least-outstanding host selection, retries with
+    backoff and optional hedging (OLLAMA_HOSTS lists the servers). Cancelling
+    the awaiting task closes the request, which makes Ollama stop generating for it.
+
+    With a `cache` (AI_JUDGE_LLM_CACHE=1), deterministic requests are answered
+    from the LLM response cache when the same prompt and options were seen before.
     """
 
-    def __init__(self, host: str = "http://127.0.0.1:11434"):
-        self.host = host
-        self.model_name = "gemma3:4b"   # ✅ updated model name
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        hosts: Optional[List[str]] = None,
+        pool: Optional[OllamaPool] = None,
+        cache: Optional[LLMCache] = None,
+        options: Optional[Dict[str, Any]] = None,
+        backend: Optional[LLMBackend] = None,
+    ):
+        if backend is None and (pool is not None or host or hosts):
+            backend = OllamaBackend(pool=pool or OllamaPool(hosts or [host]))
+        self.backend = backend or default_backend()
+        self.cache = cache if cache is not None else shared_llm_cache()
+        self.options = dict(options) if options is not None else default_options()
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model
+
+    @property
+    def pool(self) -> Optional[OllamaPool]:
+        return getattr(self.backend, "pool", None)
+
+    def _request_options(self, max_tokens: int) -> Dict[str, Any]:
+        return {**self.options, "num_predict": max_tokens}
+
+    def _cache_key(self, prompt: str, options: Dict[str, Any]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        if not LLMCache.cacheable(options):
+            self.cache.bypassed += 1
+            return None
+        return LLMCache.key(self.model_name, prompt, options)
 
-    async def generate_text(self, model_name: str, prompt: str, max_tokens: int = 500) -> str:
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    async def preload(self) -> Dict[str, Any]:
+        """Load the configured models now (Ollama backends); others have nothing to load."""
+        preload = getattr(self.backend, "preload", None)
+        return await preload() if preload is not None else {}
+
+    def host_stats(self) -> List[Dict[str, Any]]:
+        return self.pool.stats() if self.pool is not None else []
+
+    async def generate_text(
+        self,
+        model_name: str,
+        prompt: str,
+        max_tokens: int = 500,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Async wrapper to generate text from the configured backend.
+        With `on_token`, the response is streamed and each piece is passed on as it arrives.
+        """
+        if on_token is not None:
+            return await self._collect(self.stream_text(prompt, max_tokens), on_token)
+        return await self._generate(prompt, max_tokens)
+
+    async def stream_text(self, prompt: str, max_tokens: int = 500) -> AsyncIterator[str]:
         """
-        Async wrapper to generate text from Ollama model.
+        Yield response pieces as the backend streams them.
         """
-        return await self._call_ollama(prompt, max_tokens)
+        key = self._cache_key(prompt, self._request_options(max_tokens))
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        async for piece in self.backend.stream(prompt, max_tokens, self.options):
+            parts.append(piece)
+            yield piece
+        if key:
+            self.cache.put(key, self.model_name, "".join(parts).strip())
+
+    @staticmethod
+    async def _collect(pieces: AsyncIterator[str], on_token: Callable[[str], None]) -> str:
+        parts = []
+        async for piece in pieces:
+            parts.append(piece)
+            on_token(piece)
+        return "".join(parts).strip()
 
-    async def analyze_text(self, scenario: str, law_text: str) -> str:
+    async def analyze_text(
+        self,
+        scenario: str,
+        law_text: str,
+        context: Optional[str] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
         Send scenario + law text to LLM and get structured legal analysis.
+        `context` is a pre-budgeted case record (see ContextBuilder) used in place of the bare scenario;
+        `on_token` streams the analysis as it is generated.
         """
         prompt = f"""
-        Given the following scenario:
+        Given the following {"case record" if context else "scenario"}:
 
-        {scenario}
+        {context or scenario}
 
         And the following relevant laws:
 
@@ -37,35 +151,32 @@ class LLMHandler:
         - The likely outcome
         """
 
-        
-        return await self._call_ollama(prompt, max_tokens=1000)
+        print(f"[LLM] analyze_text prompt: ~{estimate_tokens(prompt)} tokens ({len(prompt)} chars)")
+        if on_token is not None:
+            return await self._collect(self.stream_text(prompt, max_tokens=1000), on_token)
+        return await self._generate(prompt, max_tokens=1000)
+
+    async def chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> str:
+        """
+        Chat completion through the backend; returns the assistant message.
+        """
+        return await self.backend.chat(messages, max_tokens, self.options)
 
     async def raw_call(self, prompt: str) -> str:
         """
         Direct LLM call for any text processing task.
         """
-        return await self._call_ollama(prompt, max_tokens=500)
+        return await self._generate(prompt, max_tokens=500)
 
-    async def _call_ollama(self, prompt: str, max_tokens: int = 500) -> str:
+    async def _generate(self, prompt: str, max_tokens: int = 500) -> str:
         """
-        Internal helper: POST request to Ollama local server (/api/generate).
+        Internal helper: one non-streaming completion, answered from the cache when possible.
         """
-        url = f"{self.host}/api/generate"   # ✅ correct endpoint
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "stream": False,         # ✅ disables chunked streaming
-            "num_predict": max_tokens
-        }
-
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.post(url, json=payload, headers=headers))
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error {response.status_code}: {response.text}")
-
-        data = response.json()
-        if "response" in data:   # ✅ Ollama returns "response"
-            return data["response"].strip()
-        return str(data)
+        key = self._cache_key(prompt, self._request_options(max_tokens))
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+        text = await self.backend.generate(prompt, max_tokens, self.options)
+        if key:
+            self.cache.put(key, self.model_name, text)
+        return text
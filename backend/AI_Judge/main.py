@@ -1,11 +1,22 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .case_flow import CaseFlow, LegalKnowledgeBase
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from .case_flow import CaseFlow, LegalKnowledgeBase, KB_PATH
 import uvicorn
-import re
+import io
+import os
+import asyncio
+import threading
 from datetime import datetime
-from typing import List, Optional
-from .verdict_builder import _sanitize_filename
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from .verdict_builder import VerdictBuilder, _sanitize_filename
+from .lifecycle import lifecycle
+from .events import format_sse
+from .llm_backends import OLLAMA_PING_SECONDS, OLLAMA_PRELOAD_MODELS, OllamaBackend, backend_stats, default_backend
+from .metrics import REGISTRY, render_latest
+from .verdict_catalog import VerdictCatalog
+from .worker_lease import WorkerLease
+from .file_responses import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, cached_file_response
 from fastapi import HTTPException
 
 app = FastAPI()
@@ -15,10 +26,156 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # /get_case_history paging and verdict PDF revalidation / partial downloads
+    expose_headers=["X-Total-Count", "ETag", "Content-Range", "Accept-Ranges"],
 )
 
-case_flow = CaseFlow()
+# Heavy components are built on first use (or by /warmup) so importing this
+# module, and answering /healthz, never waits on KB or model loading.
+def _build_knowledge_base() -> LegalKnowledgeBase:
+    kb = LegalKnowledgeBase(kb_path=KB_PATH)
+    kb.index.warm()  # load the query encoder now rather than on the first request
+    return kb
+
+
+def _build_verdict_builder() -> VerdictBuilder:
+    builder = VerdictBuilder(catalog=lifecycle.get("verdict_catalog"))
+    builder.indexer.warm()
+    return builder
+
+
+def _build_verdict_catalog() -> VerdictCatalog:
+    catalog = VerdictCatalog()
+    catalog.ensure_imported(HISTORY_DIR)  # once per database; legacy PDFs predate the catalog
+    return catalog
+
+
+lifecycle.register("knowledge_base", _build_knowledge_base)
+lifecycle.register("verdict_catalog", _build_verdict_catalog)
+lifecycle.register("verdict_builder", _build_verdict_builder)
+lifecycle.register(
+    "case_flow",
+    lambda: CaseFlow(
+        kb_handler=lifecycle.get("knowledge_base"),
+        verdict_builder=lifecycle.get("verdict_builder"),
+    ),
+)
 HISTORY_DIR = "./history"
+# Startup loops (verdict job resume/sweeper, LLM pinger), cancelled on shutdown.
+_background: Set[asyncio.Task] = set()
+_ping_lease: Optional[WorkerLease] = None
+WARMUP_ON_STARTUP = os.environ.get("AI_JUDGE_WARMUP_ON_STARTUP", "1") == "1"
+CASE_SWEEP_SECONDS = 300
+
+
+async def get_case_flow() -> CaseFlow:
+    """Return the CaseFlow, building it off the event loop if it is still cold."""
+    if lifecycle.is_ready("case_flow"):
+        return lifecycle.get("case_flow")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lifecycle.get, "case_flow")
+
+
+async def get_verdict_catalog() -> VerdictCatalog:
+    """Return the catalog, building it (and importing legacy history) off the event loop if cold."""
+    if lifecycle.is_ready("verdict_catalog"):
+        return lifecycle.get("verdict_catalog")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lifecycle.get, "verdict_catalog")
+
+
+def _start_background(job: Awaitable[Any]) -> None:
+    task = asyncio.create_task(job)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+@app.on_event("startup")
+async def warmup_on_startup():
+    # Persisted verdict jobs must be drained after a restart whether or not models are preloaded.
+    _start_background(_resume_verdict_jobs())
+    _start_background(_sweep_idle_cases())
+    # Preload in the background; the worker accepts traffic (and /healthz) immediately.
+    if WARMUP_ON_STARTUP:
+        threading.Thread(target=lifecycle.warmup, name="startup-warmup", daemon=True).start()
+        _start_background(_keep_llm_warm())
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    # Stop the background loops, then release pooled keep-alive connections to Ollama and the PDF workers.
+    for task in list(_background):
+        task.cancel()
+    await asyncio.gather(*_background, return_exceptions=True)
+    if _ping_lease is not None:
+        _ping_lease.release()
+    if lifecycle.is_ready("case_flow"):
+        case_flow = lifecycle.get("case_flow")
+        await case_flow.llm.aclose()
+        await case_flow.verdict_builder.llm.aclose()
+    if lifecycle.is_ready("verdict_builder"):
+        lifecycle.get("verdict_builder").pdf_renderer.shutdown()
+
+
+async def _keep_llm_warm():
+    """
+    Load the Ollama model(s) before the first courtroom or offline chat request,
+    then keep them loaded with pings during business hours.
+    """
+    global _ping_lease
+    backend = default_backend()
+    if not (isinstance(backend, OllamaBackend) and OLLAMA_PRELOAD_MODELS):
+        return
+    loop = asyncio.get_running_loop()
+    # Every uvicorn worker runs this; the lease lets only one of them ping. It
+    # outlives two missed rounds, so a crashed pinger is replaced.
+    _ping_lease = await loop.run_in_executor(None, WorkerLease, "ollama_keep_warm", 2 * OLLAMA_PING_SECONDS + 60)
+
+    async def leader() -> bool:
+        return await loop.run_in_executor(None, _ping_lease.acquire)
+
+    await backend.keep_warm(leader=leader)
+
+
+async def _resume_verdict_jobs():
+    """Restart the verdict workers so jobs persisted by a previous process are picked up."""
+    case_flow = await get_case_flow()
+    case_flow.verdict_jobs.start()
+
+
+async def _sweep_idle_cases():
+    """Expire idle cached cases, which are otherwise only evicted when another case is written."""
+    while True:
+        await asyncio.sleep(CASE_SWEEP_SECONDS)
+        case_flow = _ready_case_flow()
+        if case_flow is None:
+            continue
+        try:
+            case_flow.cases.sweep()
+        except Exception as e:
+            print(f"[CASES] sweep failed: {e}")
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    components = lifecycle.status()
+    ready = all(c["ready"] for c in components.values())
+    return JSONResponse(
+        content={"ready": ready, "components": components},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.post("/warmup")
+async def warmup():
+    loop = asyncio.get_running_loop()
+    components = await loop.run_in_executor(None, lifecycle.warmup)
+    return {"ready": all(c["ready"] for c in components.values()), "components": components}
 
 import pytz
 
@@ -35,6 +192,7 @@ async def start_case(
     plaintiff_files: List[UploadFile] = File(...),
     defendant_files: List[UploadFile] = File(...),
 ):
+    case_flow = await get_case_flow()
     # Enforce file count limits (1–3)
     if not (1 <= len(plaintiff_files) <= 3):
         return {"error": "Plaintiff must upload between 1 and 3 files."}
@@ -44,7 +202,7 @@ async def start_case(
     print(f"Received plaintiff files: {[file.filename for file in plaintiff_files]}")
     print(f"Received defendant files: {[file.filename for file in defendant_files]}")
 
-    case_id = case_flow.create_case(
+    case_id = await case_flow.create_case(
         case_title, scenario, plaintiff_name, defendant_name, plaintiff_files, defendant_files
     )
     initial_analysis = await case_flow.analyze_initial(case_id)
@@ -67,6 +225,7 @@ async def submit_message(
     role: str = Form(...),
     files: Optional[List[UploadFile]] = File(None)   # ✅ optional
 ):
+    case_flow = await get_case_flow()
     # ✅ Enforce file count limits (1–3), if files are uploaded
     if files:
         if not (1 <= len(files) <= 3):
@@ -81,10 +240,228 @@ async def submit_message(
     }
 
 
+# -------------------------------
+# Streaming variants (SSE): judge text is forwarded token by token
+# -------------------------------
+# Strong references to turns still running: the loop only keeps weak ones, and a
+# turn must outlive a client that disconnected from its stream.
+_judge_turns: Set[asyncio.Task] = set()
+
+
+def _stream_judge(
+    run: Callable[[Callable[[str], None]], Awaitable[str]],
+    on_done: Callable[[str], Dict[str, Any]],
+    first: Optional[Dict[str, Any]] = None,
+) -> StreamingResponse:
+    """
+    Run `run(on_token)` in the background and stream its tokens as SSE.
+    The turn always runs to completion, even if the client disconnects,
+    so the case never stops halfway through a transition.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(run(queue.put_nowait))
+    _judge_turns.add(task)
+    task.add_done_callback(_judge_turns.discard)
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def events():
+        if first:
+            yield format_sse(first)
+        while True:
+            token = await queue.get()
+            if token is None:
+                break
+            yield format_sse({"type": "token", "text": token})
+        try:
+            text = task.result()
+        except Exception as e:
+            yield format_sse({"type": "error", "error": str(e)})
+            return
+        yield format_sse({"type": "done", "response": text, **on_done(text)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _buffer_uploads(files: Optional[List[UploadFile]]) -> Optional[List[UploadFile]]:
+    if not files:
+        return files
+    buffered = []
+    for f in files:
+        await f.seek(0)
+        buffered.append(UploadFile(file=io.BytesIO(await f.read()), filename=f.filename))
+    return buffered
+
+
+@app.post("/start_case_stream")
+async def start_case_stream(
+    case_title: str = Form(...),
+    scenario: str = Form(...),
+    plaintiff_name: str = Form(...),
+    defendant_name: str = Form(...),
+    plaintiff_files: List[UploadFile] = File(...),
+    defendant_files: List[UploadFile] = File(...),
+):
+    case_flow = await get_case_flow()
+    if not (1 <= len(plaintiff_files) <= 3):
+        return {"error": "Plaintiff must upload between 1 and 3 files."}
+    if not (1 <= len(defendant_files) <= 3):
+        return {"error": "Defendant must upload between 1 and 3 files."}
+
+    case_id = await case_flow.create_case(
+        case_title, scenario, plaintiff_name, defendant_name, plaintiff_files, defendant_files
+    )
+
+    def on_done(text: str) -> Dict[str, Any]:
+        state = case_flow.get_case_state(case_id)
+        return {"case_id": case_id, "initial_analysis": text, **state, "language": state.get("detected_lang")}
+
+    return _stream_judge(
+        lambda on_token: case_flow.analyze_initial(case_id, on_token=on_token),
+        on_done,
+        first={"type": "case", "case_id": case_id},
+    )
+
+
+@app.post("/submit_message_stream/{case_id}")
+async def submit_message_stream(
+    case_id: str,
+    message: str = Form(...),
+    role: str = Form(...),
+    files: Optional[List[UploadFile]] = File(None),
+):
+    case_flow = await get_case_flow()
+    if files:
+        if not (1 <= len(files) <= 3):
+            return {"error": "You must upload between 1 and 3 files per round."}
+
+    # The request's temp files may be closed once the endpoint returns, before the turn reads them.
+    files = await _buffer_uploads(files)
+
+    def on_done(text: str) -> Dict[str, Any]:
+        state = case_flow.get_case_state(case_id)
+        return {**state, "language": state.get("detected_lang")}
+
+    return _stream_judge(
+        lambda on_token: case_flow.handle_message(case_id, message, role, files, on_token=on_token),
+        on_done,
+    )
+
+
+@app.get("/case_memory")
+async def case_memory():
+    """Cached case count and estimated bytes held by this worker."""
+    case_flow = await get_case_flow()
+    evicted = case_flow.cases.sweep()
+    return {
+        **case_flow.cases.memory_stats(),
+        "swept": evicted,
+        "relevance_trackers": len(case_flow._relevance),
+        "active_verdict_jobs": len(case_flow.verdict_jobs.jobs),
+    }
+
+
+@app.get("/llm_stats")
+async def llm_stats():
+    """
+    Per-backend request/latency/token metrics (chatbot and AI Judge), per-host
+    Ollama load and LLM response cache counters (AI_JUDGE_LLM_CACHE=1).
+    """
+    case_flow = await get_case_flow()
+    cache = case_flow.llm.cache
+    pool = case_flow.llm.pool
+    return {
+        "backends": backend_stats(),
+        "hosts": case_flow.llm.host_stats(),
+        "hedged_requests": pool.hedged if pool is not None else 0,
+        "cache_enabled": cache is not None,
+        "cache": cache.stats() if cache else None,
+    }
+
+
+# -------------------------------
+# Prometheus metrics
+# -------------------------------
+def _ready_case_flow() -> Optional[CaseFlow]:
+    # Scrapes must not trigger (or wait for) the heavy KB/model build.
+    return lifecycle.get("case_flow") if lifecycle.is_ready("case_flow") else None
+
+
+def _cache_lookups():
+    case_flow = _ready_case_flow()
+    if case_flow is None:
+        return []
+    counters = [
+        ("case_store", case_flow.cases.cache_hits, case_flow.cases.cache_misses),
+        ("exhibits", case_flow.extractor.cache.hits, case_flow.extractor.cache.misses),
+    ]
+    if case_flow.llm.cache is not None:
+        counters.append(("llm", case_flow.llm.cache.hits, case_flow.llm.cache.misses))
+    return [
+        ({"cache": name, "result": result}, value)
+        for name, hits, misses in counters
+        for result, value in (("hit", hits), ("miss", misses))
+    ]
+
+
+def _cases_by_status():
+    case_flow = _ready_case_flow()
+    if case_flow is None:
+        return []
+    return [({"status": status}, n) for status, n in case_flow.cases.status_counts().items()]
+
+
+def _verdict_jobs_by_state():
+    case_flow = _ready_case_flow()
+    if case_flow is None:
+        return []
+    states: Dict[str, int] = {}
+    for job in list(case_flow.verdict_jobs.jobs.values()):
+        states[job["status"]] = states.get(job["status"], 0) + 1
+    return [({"state": state}, n) for state, n in states.items()]
+
+
+REGISTRY.collector("cache_lookups_total", "Cache lookups by cache and result.", _cache_lookups, "counter", ["cache", "result"])
+REGISTRY.collector("cases", "Stored courtroom cases by status.", _cases_by_status, "gauge", ["status"])
+REGISTRY.collector(
+    "cached_cases", "Cases held in this worker's memory.",
+    lambda: [({}, c.cases.memory_stats()["cached_cases"])] if (c := _ready_case_flow()) else [],
+)
+REGISTRY.collector("verdict_jobs", "Verdict jobs tracked by this worker.", _verdict_jobs_by_state, "gauge", ["state"])
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition (AI_JUDGE_METRICS=0 turns it off)."""
+    # Collectors may query SQLite (cases by status), so scrape off the event loop.
+    body = await asyncio.get_running_loop().run_in_executor(None, render_latest)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# -------------------------------
+# Live case events (SSE)
+# -------------------------------
+@app.get("/case_events/{case_id}")
+async def case_events(case_id: str):
+    """Server-Sent Events for a case, e.g. LLM-enriched judge announcements."""
+    case_flow = await get_case_flow()
+    if case_flow.cases.get(case_id) is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return StreamingResponse(
+        case_flow.events.stream(case_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # -------------------------------
 # Get verdict
 # -------------------------------
-from fastapi.responses import FileResponse
 import os
 
 """
@@ -102,19 +479,30 @@ async def get_verdict(case_id: str):
     }
 """
 @app.get("/get_verdict/{case_id}")
-async def get_verdict(case_id: str):
+async def get_verdict(case_id: str, request: Request):
+    case_flow = await get_case_flow()
     case_data = case_flow.cases.get(case_id, {})
-    verdict = await case_flow.get_final_verdict(case_id)
-    pdf_path = case_data.get("final_verdict_pdf", None)
-    case_state = case_flow.get_case_state(case_id)
-
+    # An issued PDF is served as is; only a missing one goes to the verdict job.
+    pdf_path, title = case_data.get("final_verdict_pdf"), case_data.get("case_title")
+    if not (pdf_path and os.path.exists(pdf_path)):
+        entry = (await get_verdict_catalog()).latest_for_case(case_id)
+        if entry:
+            pdf_path, title = entry["pdf_path"], entry["case_title"]
     if pdf_path and os.path.exists(pdf_path):
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"verdict_{_sanitize_filename(case_data.get('case_title', 'case'))}_{case_id}.pdf",
-            headers={"Content-Disposition": f"attachment; filename=verdict_{_sanitize_filename(case_data.get('case_title', 'case'))}_{case_id}.pdf"}
+        # A case id can be re-judged into a new PDF, so clients revalidate by ETag.
+        return await cached_file_response(
+            request, pdf_path, f"verdict_{_sanitize_filename(title or 'case')}_{case_id}.pdf",
+            cache_control=REVALIDATE_CACHE_CONTROL,
         )
+
+    if not case_data:
+        return {"error": "Case not found"}
+    verdict = case_data.get("final_verdict")
+    if not verdict:
+        # Rendering runs as a background job; poll /verdict_status/{case_id}.
+        job = case_flow.verdict_jobs.submit(case_id)
+        return JSONResponse(status_code=202, content=case_flow.verdict_jobs.status(case_id) or job)
+    case_state = case_flow.get_case_state(case_id)
     return {
         "error": "PDF not found",
         "verdict": verdict,
@@ -122,19 +510,33 @@ async def get_verdict(case_id: str):
         "language": case_state.get("detected_lang")
     }
 
+
+@app.get("/verdict_status/{case_id}")
+async def verdict_status(case_id: str):
+    case_flow = await get_case_flow()
+    status = case_flow.verdict_jobs.status(case_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="No verdict job for this case")
+    return status
+
 @app.get("/download_verdict_pdf/{case_id}")
-async def download_verdict_pdf(case_id: str):
-    pdf_file = os.path.join(HISTORY_DIR, f"{case_id}.pdf")
+async def download_verdict_pdf(case_id: str, request: Request):
+    # `case_id` is a verdict id from /get_case_history (the PDF file stem) or a courtroom case id.
+    # Only a file stem pins the content; a case id means "its latest verdict".
+    catalog = await get_verdict_catalog()
+    entry, cache_control = catalog.get(case_id), IMMUTABLE_CACHE_CONTROL
+    if entry is None:
+        entry = catalog.latest_for_case(case_id)
+        if entry is not None:
+            cache_control = REVALIDATE_CACHE_CONTROL
+    pdf_file = entry["pdf_path"] if entry else os.path.join(HISTORY_DIR, f"{case_id}.pdf")
     if os.path.exists(pdf_file):
-        return FileResponse(
-            pdf_file,
-            media_type="application/pdf",
-            filename=f"{case_id}.pdf"
-        )
+        return await cached_file_response(request, pdf_file, os.path.basename(pdf_file), cache_control=cache_control)
     raise HTTPException(status_code=404, detail="PDF not found")
 
 @app.get("/get_case_state/{case_id}")
 async def get_case_state(case_id: str):
+    case_flow = await get_case_flow()
     state = case_flow.get_case_state(case_id)
     if not state:
         return {"error": "Case not found"}
@@ -146,47 +548,48 @@ async def get_case_state(case_id: str):
     }
 
 @app.get("/get_case_history")
-async def get_case_history():
+async def get_case_history(
+    limit: int = 100,
+    offset: int = 0,
+    q: Optional[str] = None,
+    lang: Optional[str] = None,
+    case_id: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    sort: str = "verdict_date",
+    order: str = "desc",
+):
+    """
+    One page of issued verdicts from the catalog, newest first by default.
+    The body stays a plain list; X-Total-Count carries the number of matches.
+    """
+    catalog = await get_verdict_catalog()
     try:
-        if not os.path.exists(HISTORY_DIR):
-            return []
-
-        cases = []
-        for file in os.listdir(HISTORY_DIR):
-            if file.endswith(".pdf") and file.startswith("verdict_"):
-                case_data = parse_case_file(file)
-                if case_data:
-                    cases.append(case_data)
-
-        # sort newest first
-        cases.sort(key=lambda c: c["verdict_date"], reverse=True)
-        return cases
+        rows, total = catalog.query(
+            limit=limit, offset=offset, search=q, lang=lang, case_id=case_id,
+            date_from=date_from, date_to=date_to, sort=sort, order=order,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch case history: {e}")
 
-    
-def parse_case_file(filename: str):
-    """
-    Extract case metadata from filename like:
-    verdict_The_State_vs_The_Phoenix_Five_20250910_095446.pdf
-    """
-    match = re.match(r"verdict_(.+)_(\d{8}_\d{6})\.pdf", filename)
-    if not match:
-        return None
-    
-    case_title = match.group(1).replace("_", " ")
-    verdict_date_str = match.group(2)
-    verdict_date = datetime.strptime(verdict_date_str, "%Y%m%d_%H%M%S")
-    verdict_date = MYANMAR_TZ.localize(verdict_date)
-    
-    return {
-        "case_id": filename.replace(".pdf", ""),   # use filename as ID
-        "case_title": case_title,
-        "plaintiff_name": "",   # could extend parsing if needed
-        "defendant_name": "",   # could extend parsing if needed
-        "verdict_date": verdict_date.isoformat(),
-        "pdf_path": os.path.join(HISTORY_DIR, filename)
-    }
+    cases = [
+        {
+            "case_id": row["verdict_id"],  # id for /download_verdict_pdf
+            "case_title": row["case_title"],
+            "plaintiff_name": row["plaintiff_name"],
+            "defendant_name": row["defendant_name"],
+            "verdict_date": MYANMAR_TZ.localize(datetime.fromisoformat(row["verdict_date"])).isoformat(),
+            "pdf_path": row["pdf_path"],
+            "courtroom_case_id": row["case_id"],
+            "language": row["lang"],
+            "sections": row["sections"],
+            "size_bytes": row["size_bytes"],
+        }
+        for row in rows
+    ]
+    return JSONResponse(content=cases, headers={"X-Total-Count": str(total)})
 
 
 if __name__ == "__main__":
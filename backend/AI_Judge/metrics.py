@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Prometheus text-format metrics without the client library. With
+# AI_JUDGE_METRICS=0 every observe()/inc() returns immediately and /metrics is off.
+METRICS_ENABLED = os.environ.get("AI_JUDGE_METRICS", "1") == "1"
+METRICS_PREFIX = "mahawthader_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = METRICS_PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Sample lines, without the HELP/TYPE header."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the block (also when it raises)."""
+        if not METRICS_ENABLED:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines: List[str] = []
+        for key, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _Collected(_Metric):
+    """Values read at scrape time from `fn`, e.g. counters other objects already keep."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        labelnames: Sequence[str],
+        fn: Callable[[], Iterable[Tuple[Dict[str, Any], float]]],
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            samples = list(self.fn())
+        except Exception as e:
+            print(f"[METRICS] collector {self.name} failed: {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, self._key(labels))} {_format_value(value)}"
+            for labels, value in samples
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> Any:
+        with self._lock:
+            # Re-registering (module reloads, several apps) returns the existing metric.
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def collector(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Iterable[Tuple[Dict[str, Any], float]]],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        """Register `fn`, called on every scrape, returning (labels, value) samples."""
+        metric = _Collected(name, help_text, kind, labelnames, fn)
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------- shared metrics (both apps)
+RETRIEVAL_ENCODE_SECONDS = REGISTRY.histogram(
+    "retrieval_encode_seconds", "Query/passage encoding time.", ["index"]
+)
+RETRIEVAL_VECTOR_SEARCH_SECONDS = REGISTRY.histogram(
+    "retrieval_vector_search_seconds", "Vector index search time.", ["index", "engine"]
+)
+RETRIEVAL_KEYWORD_SEARCH_SECONDS = REGISTRY.histogram(
+    "retrieval_keyword_search_seconds", "Keyword search time.", ["index"]
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "LLM call latency (whole response, excluding model load).", ["backend", "model"]
+)
+LLM_MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "llm_model_load_seconds", "Time the server spent loading the model into memory.", ["backend", "model"]
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "llm_first_token_seconds", "Time to the first streamed token.", ["backend", "model"]
+)
+LLM_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "llm_tokens_per_second", "Completion tokens per second of call time.", ["backend", "model"], RATE_BUCKETS
+)
+LLM_REQUESTS = REGISTRY.counter("llm_requests_total", "LLM calls by outcome.", ["backend", "model", "outcome"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens processed.", ["backend", "model", "kind"])
+PDF_RENDER_SECONDS = REGISTRY.histogram("pdf_render_seconds", "Verdict PDF build time.", ["lang"])
+PDF_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "pdf_queue_wait_seconds", "Time a verdict PDF waited for a render slot and worker."
+)
+PDF_RENDER_PENDING = REGISTRY.gauge("pdf_render_pending", "Verdict PDFs queued or rendering.")
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Database statement/transaction time.", ["db", "op"]
+)
+
+
+def render_latest() -> Optional[str]:
+    """Text exposition of every metric, or None when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return None
+    return REGISTRY.render()
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+# Comma-separated Ollama base URLs, e.g. "http://127.0.0.1:11434,http://127.0.0.1:11435".
+OLLAMA_HOSTS = [
+    h.strip()
+    for h in os.environ.get("OLLAMA_HOSTS", os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")).split(",")
+    if h.strip()
+]
+LLM_RETRIES = int(os.environ.get("AI_JUDGE_LLM_RETRIES", 2))
+LLM_RETRY_BACKOFF = float(os.environ.get("AI_JUDGE_LLM_RETRY_BACKOFF", 0.5))
+# Seconds before a slow non-streaming request is duplicated to a second host (0 = off).
+LLM_HEDGE_AFTER = float(os.environ.get("AI_JUDGE_LLM_HEDGE_AFTER", 0))
+HEALTH_CHECK_INTERVAL = float(os.environ.get("AI_JUDGE_LLM_HEALTH_INTERVAL", 15))
+
+
+class OllamaUnavailable(RuntimeError):
+    pass
+
+
+class _RetryableError(RuntimeError):
+    """Transport failure or 5xx: worth trying again, possibly on another host."""
+
+
+class OllamaHost:
+    """One Ollama server: its connection pool, load and latency history."""
+
+    def __init__(self, url: str, max_concurrency: int, timeout: httpx.Timeout):
+        self.url = url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_checked = 0.0
+        self.latencies: Deque[float] = deque(maxlen=256)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> httpx.AsyncClient:
+        # Pools and semaphores are per event loop (scripts using asyncio.run()
+        # get a fresh pair per run).
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        self.session()
+        return self._semaphore
+
+    def record(self, ok: bool, seconds: Optional[float] = None) -> None:
+        self.requests += 1
+        if ok:
+            self.consecutive_failures = 0
+            self.healthy = True
+            if seconds is not None:
+                self.latencies.append(seconds)
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= 2:
+                self.healthy = False
+
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else None
+
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_mean_s": round(self.mean_latency(), 3) if ordered else None,
+            "latency_p50_s": pct(0.50),
+            "latency_p95_s": pct(0.95),
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client, self._semaphore, self._loop = None, None, None
+
+
+class OllamaPool:
+    """
+    Spreads Ollama requests over several hosts.
+
+    Each request goes to the healthy host with the fewest outstanding requests
+    (ties broken by mean latency). Transport errors and 5xx responses are
+    retried on another host with exponential backoff; a host failing twice in
+    a row is marked unhealthy until a health check (GET /api/version) passes.
+    With `hedge_after`, a non-streaming request still running after that many
+    seconds is duplicated to a second host and the first answer wins.
+    """
+
+    def __init__(
+        self,
+        hosts: Optional[Iterable[str]] = None,
+        max_concurrency: int = 4,
+        timeout: Optional[httpx.Timeout] = None,
+        retries: int = LLM_RETRIES,
+        backoff: float = LLM_RETRY_BACKOFF,
+        hedge_after: float = LLM_HEDGE_AFTER,
+        health_interval: float = HEALTH_CHECK_INTERVAL,
+    ):
+        timeout = timeout or httpx.Timeout(connect=5.0, read=300.0, write=30.0, pool=300.0)
+        self.hosts: List[OllamaHost] = [OllamaHost(url, max_concurrency, timeout) for url in (hosts or OLLAMA_HOSTS)]
+        if not self.hosts:
+            raise ValueError("OllamaPool needs at least one host")
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.health_interval = health_interval
+        self.hedged = 0
+
+    # ---------- host selection / health
+    def pick(self, exclude: Iterable[OllamaHost] = ()) -> Optional[OllamaHost]:
+        excluded = set(id(h) for h in exclude)
+        candidates = [h for h in self.hosts if id(h) not in excluded]
+        healthy = [h for h in candidates if h.healthy]
+        pool = healthy or candidates  # all down: still try rather than fail outright
+        if not pool:
+            return None
+        return min(pool, key=lambda h: (h.outstanding, h.mean_latency()))
+
+    async def check_health(self, host: OllamaHost) -> bool:
+        host.last_checked = time.monotonic()
+        try:
+            response = await host.session().get("/api/version", timeout=5.0)
+            host.healthy = response.status_code == 200
+        except httpx.HTTPError:
+            host.healthy = False
+        if host.healthy:
+            host.consecutive_failures = 0
+        return host.healthy
+
+    async def _recheck_unhealthy(self) -> None:
+        now = time.monotonic()
+        due = [h for h in self.hosts if not h.healthy and now - h.last_checked >= self.health_interval]
+        if due:
+            await asyncio.gather(*(self.check_health(h) for h in due))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [h.stats() for h in self.hosts]
+
+    async def post_each(self, path: str, payload: Dict[str, Any]) -> List[Tuple[OllamaHost, Any]]:
+        """
+        POST to every host once (no retries), e.g. to load a model everywhere.
+        Returns (host, decoded body or the exception raised) per host.
+        """
+
+        async def one(host: OllamaHost) -> Tuple[OllamaHost, Any]:
+            try:
+                return host, await self._dispatch(host, path, payload)
+            except Exception as e:
+                return host, e
+
+        return list(await asyncio.gather(*(one(h) for h in self.hosts)))
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(h.aclose() for h in self.hosts))
+
+    # ---------- requests
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST and return the decoded JSON body, retrying (and optionally hedging) across hosts."""
+        await self._recheck_unhealthy()
+        tried: List[OllamaHost] = []
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            host = self.pick(exclude=tried) or self.pick()
+            tried.append(host)
+            try:
+                return await self._hedged(host, path, payload, tried)
+            except _RetryableError as e:
+                last_error = e
+                print(f"[OLLAMA POOL] {host.url}{path} failed (attempt {attempt + 1}): {e}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        raise OllamaUnavailable(f"All Ollama attempts failed: {last_error}")
+
+    def _dispatch(self, host: OllamaHost, path: str, payload: Dict[str, Any]) -> "asyncio.Task[Dict[str, Any]]":
+        # Count the request against the host now, so concurrent callers picking
+        # a host before this task first runs already see it as busy. The done
+        # callback releases it however the task ends, including a cancel that
+        # lands before the coroutine's first step.
+        host.outstanding += 1
+
+        def release(_: "asyncio.Task[Dict[str, Any]]") -> None:
+            host.outstanding -= 1
+
+        task = asyncio.create_task(self._post_once(host, path, payload))
+        task.add_done_callback(release)
+        return task
+
+    async def _hedged(
+        self, host: OllamaHost, path: str, payload: Dict[str, Any], tried: List[OllamaHost]
+    ) -> Dict[str, Any]:
+        tasks = [self._dispatch(host, path, payload)]
+        try:
+            if self.hedge_after and len(self.hosts) > 1:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+                if not done:
+                    backup = self.pick(exclude=tried)
+                    if backup is not None:
+                        tried.append(backup)
+                        self.hedged += 1
+                        print(f"[OLLAMA POOL] hedging {path} to {backup.url} after {self.hedge_after}s on {host.url}")
+                        tasks.append(self._dispatch(backup, path, payload))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing request (or both, if we were cancelled) is abandoned.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _post_once(self, host: OllamaHost, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """One attempt on `host`; _dispatch counts it in `host.outstanding` and releases it."""
+        client = host.session()
+        async with host.semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+            except httpx.HTTPError as e:
+                host.record(False)
+                raise _RetryableError(repr(e)) from e
+            if response.status_code >= 500:
+                host.record(False)
+                raise _RetryableError(f"HTTP {response.status_code}: {response.text}")
+            host.record(True, time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama API error {response.status_code}: {response.text}")
+        return response.json()
+
+    async def stream(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST with streaming and yield decoded NDJSON chunks. Failures before the
+        first chunk are retried on another host; after that they are raised.
+        """
+        await self._recheck_unhealthy()
+        tried: List[OllamaHost] = []
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            host = self.pick(exclude=tried) or self.pick()
+            tried.append(host)
+            started = False
+            client = host.session()
+            host.outstanding += 1
+            try:
+                async with host.semaphore:
+                    start = time.perf_counter()
+                    try:
+                        async with client.stream("POST", path, json=payload) as response:
+                            if response.status_code >= 500:
+                                body = (await response.aread()).decode("utf-8", errors="replace")
+                                raise _RetryableError(f"HTTP {response.status_code}: {body}")
+                            if response.status_code != 200:
+                                body = (await response.aread()).decode("utf-8", errors="replace")
+                                raise RuntimeError(f"Ollama API error {response.status_code}: {body}")
+                            async for line in response.aiter_lines():
+                                if not line.strip():
+                                    continue
+                                started = True
+                                yield json.loads(line)
+                    except httpx.HTTPError as e:
+                        if started:
+                            host.record(False)
+                            raise RuntimeError(f"Ollama stream from {host.url} broke: {e!r}") from e
+                        raise _RetryableError(repr(e)) from e
+                    host.record(True, time.perf_counter() - start)
+                    return
+            except _RetryableError as e:
+                host.record(False)
+                last_error = e
+                print(f"[OLLAMA POOL] {host.url}{path} stream failed (attempt {attempt + 1}): {e}")
+            finally:
+                host.outstanding -= 1
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        raise OllamaUnavailable(f"All Ollama attempts failed: {last_error}")
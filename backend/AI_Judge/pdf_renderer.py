@@ -0,0 +1,552 @@
+import asyncio
+import os
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
+
+from .lifecycle import process_pool_context
+from .metrics import PDF_QUEUE_WAIT_SECONDS, PDF_RENDER_PENDING, PDF_RENDER_SECONDS
+
+# Worker processes rendering verdict PDFs (0 = render on a thread in this process).
+PDF_WORKERS = int(os.environ.get("AI_JUDGE_PDF_WORKERS", 2))
+# Renders admitted at once (running + waiting for a worker); further callers wait their turn.
+PDF_MAX_PENDING = int(os.environ.get("AI_JUDGE_PDF_MAX_PENDING", 8))
+
+COLORS = {
+    'court_navy': colors.HexColor("#1e293b"),
+    'court_navy_light': colors.HexColor("#334155"),
+    'court_gold': colors.HexColor("#3B5169"),
+    'document_bg': colors.HexColor("#fefefe"),
+    'document_border': colors.HexColor("#e2e8f0"),
+    'document_text': colors.HexColor("#1e293b"),
+    'document_muted': colors.HexColor("#A3B5C7"),
+    'section_bg': colors.HexColor("#f8fafc"),
+}
+
+_fonts_registered = False
+
+
+def register_fonts() -> None:
+    """Register available fonts from a package-local `fonts` directory when present.
+    Falls back silently to system defaults if files are missing. Runs once per process."""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    _fonts_registered = True
+    font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+    try:
+        # Arial regular → also map as Helvetica if available for consistency
+        arial_path = os.path.join(font_dir, "Arial.ttf")
+        if os.path.exists(arial_path):
+            pdfmetrics.registerFont(TTFont("Arial", arial_path))
+            pdfmetrics.registerFont(TTFont("Helvetica", arial_path))
+
+        # Arial bold → also map to Helvetica-Bold if present
+        arial_bold_path = os.path.join(font_dir, "Arial-Bold.ttf")
+        if os.path.exists(arial_bold_path):
+            pdfmetrics.registerFont(TTFont("Arial-Bold", arial_bold_path))
+            pdfmetrics.registerFont(TTFont("Helvetica-Bold", arial_bold_path))
+
+        # Emoji / DejaVu fonts – try local, then silently ignore if unavailable
+        noto_emoji_path = os.path.join(font_dir, "NotoEmoji-VariableFont_wght.ttf")
+        if os.path.exists(noto_emoji_path):
+            pdfmetrics.registerFont(TTFont("NotoEmoji", noto_emoji_path))
+        else:
+            try:
+                pdfmetrics.registerFont(TTFont("NotoEmoji", "NotoEmoji-VariableFont_wght.ttf"))
+            except Exception:
+                pass
+
+        dejavu_path = os.path.join(font_dir, "DejaVuSans.ttf")
+        if os.path.exists(dejavu_path):
+            pdfmetrics.registerFont(TTFont("DejaVuSans", dejavu_path))
+        else:
+            try:
+                pdfmetrics.registerFont(TTFont("DejaVuSans", "DejaVuSans.ttf"))
+            except Exception:
+                pass
+
+        # Optional italic
+        arial_italic_path = os.path.join(font_dir, "Arial-Italic.ttf")
+        if os.path.exists(arial_italic_path):
+            pdfmetrics.registerFont(TTFont("ArialItalic", arial_italic_path))
+
+    except Exception as e:
+        print(f"Error registering custom fonts: {e}")
+        print("Using default system fonts.")
+
+
+class VerdictTemplate:
+    """
+    The per-language stylesheet and footer drawing of a verdict PDF, cached
+    once per language per process (see `template_for`). Flowables are built
+    fresh for every document: reportlab records layout state on them during
+    a build, so sharing the court header between documents is unsafe.
+    ParagraphStyles are only read, so they are shared.
+    """
+
+    def __init__(self, lang_code: str = "en"):
+        register_fonts()
+        self.lang_code = lang_code
+        self.styles = _create_elegant_styles(lang_code)
+
+    def footer(self, date_str: str) -> Callable[[Any, Any], None]:
+        """Page callback drawing the rule, the verdict date, the page number and the seal line."""
+
+        def add_elegant_footer(canvas, doc):
+            width = doc.pagesize[0]
+            canvas.saveState()
+            canvas.setStrokeColor(COLORS['court_gold'])
+            canvas.setLineWidth(3)
+            canvas.line(0.75 * inch, 0.75 * inch, width - 0.75 * inch, 0.75 * inch)
+            canvas.setFillColor(COLORS['document_muted'])
+            canvas.setFont("Helvetica", 9)
+            canvas.drawString(0.75 * inch, 0.5 * inch, date_str)
+            canvas.drawRightString(width - 0.75 * inch, 0.5 * inch, f"Page {canvas.getPageNumber()}")
+            canvas.setFont("DejaVuSans", 8)
+            canvas.drawCentredString(width / 2, 0.3 * inch, "⚖️ OFFICIAL COURT DOCUMENT ⚖️")
+            canvas.restoreState()
+
+        return add_elegant_footer
+
+    def elements(self, spec: Dict[str, Any], generated_at: datetime) -> List[Any]:
+        verdict_text = spec["verdict_text"]
+        case_id = spec["case_id"]
+        elements: List[Any] = _create_elegant_court_header(self.styles)
+        elements.append(Spacer(1, 0.5 * inch))
+
+        elements.extend(_create_elegant_case_header(
+            verdict_text, case_id, self.styles,
+            spec.get("plaintiff_name", "Unknown"), spec.get("defendant_name", "Unknown"), generated_at,
+        ))
+        elements.append(Spacer(1, 0.3 * inch))
+
+        sections = _parse_verdict_sections(verdict_text)
+        for section_title, content in sections.items():
+            if content.strip():
+                section_elements = _create_elegant_section(section_title, content, self.styles)
+                # Do NOT force KeepTogether for long sections (allows automatic page breaks)
+                elements.append(KeepTogether(section_elements))
+        return elements
+
+
+_templates: Dict[str, VerdictTemplate] = {}
+
+
+def template_for(lang_code: str) -> VerdictTemplate:
+    """This process's cached template for `lang_code`."""
+    template = _templates.get(lang_code)
+    if template is None:
+        template = _templates[lang_code] = VerdictTemplate(lang_code)
+    return template
+
+
+def render_verdict(spec: Dict[str, Any], template: Optional[VerdictTemplate] = None) -> Dict[str, Any]:
+    """
+    Worker: build the verdict PDF described by `spec` (plain strings only, so it
+    can cross a process boundary): verdict_text, case_id, pdf_path, lang_code,
+    plaintiff_name, defendant_name and generated_at (ISO timestamp).
+    Uses the cached template for the language unless one is passed.
+    Returns {"pdf_path", "render_seconds"}.
+    """
+    start = time.perf_counter()
+    template = template or template_for(spec.get("lang_code", "en"))
+    pdf_path = spec["pdf_path"]
+    generated_at = datetime.fromisoformat(spec["generated_at"])
+    os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+
+    doc = SimpleDocTemplate(
+        pdf_path,
+        pagesize=letter,
+        topMargin=0.5 * inch,
+        bottomMargin=1 * inch,
+        leftMargin=0.5 * inch,
+        rightMargin=0.5 * inch
+    )
+    footer = template.footer(generated_at.strftime('%B %d, %Y at %I:%M %p'))
+    try:
+        doc.build(template.elements(spec, generated_at), onFirstPage=footer, onLaterPages=footer)
+    except Exception as e:
+        print(f"Error generating elegant PDF: {e}")
+        raise
+    return {"pdf_path": pdf_path, "render_seconds": time.perf_counter() - start}
+
+
+def _warm_worker() -> None:
+    """Pool initializer: fonts and the default template before the first verdict arrives."""
+    register_fonts()
+    template_for("en")
+
+
+class PdfRenderer:
+    """
+    Renders verdict PDFs off the event loop.
+
+    reportlab is pure Python and CPU bound, so by default renders run on a
+    process pool whose workers register the fonts once when they start. At
+    most `max_pending` renders are admitted at a time; later callers wait
+    (the wait is reported as pdf_queue_wait_seconds).
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS, max_pending: int = PDF_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            if self.workers > 0:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=process_pool_context(), initializer=_warm_worker
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+        return self._pool
+
+    def _admission(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _discard(self, pool: Executor) -> None:
+        # Concurrent renders see the same broken pool; only the first one replaces it.
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render(self, spec: Dict[str, Any]) -> str:
+        """Render `spec` (see render_verdict) and return the PDF path."""
+        lang = spec.get("lang_code", "en")
+        queued = time.perf_counter()
+        self.pending += 1
+        PDF_RENDER_PENDING.set(self.pending)
+        try:
+            async with self._admission():
+                loop = asyncio.get_running_loop()
+                pool = self.pool
+                try:
+                    result = await loop.run_in_executor(pool, render_verdict, spec)
+                except BrokenProcessPool:
+                    print("[PDF] worker pool broke; restarting it and retrying the render")
+                    self._discard(pool)
+                    result = await loop.run_in_executor(self.pool, render_verdict, spec)
+        finally:
+            self.pending -= 1
+            PDF_RENDER_PENDING.set(self.pending)
+        total = time.perf_counter() - queued
+        PDF_RENDER_SECONDS.observe(result["render_seconds"], lang=lang)
+        PDF_QUEUE_WAIT_SECONDS.observe(max(total - result["render_seconds"], 0.0))
+        print(f"[PDF] {os.path.basename(result['pdf_path'])} rendered in {result['render_seconds']:.2f}s ({total:.2f}s with queueing)")
+        return result["pdf_path"]
+
+
+def _create_elegant_styles(lang_code: str):
+    """Create elegant styles matching the sophisticated court design"""
+    styles = getSampleStyleSheet()
+
+    font_map = {
+        "en": "Arial",
+        "my": "Arial",
+        "zh": "Arial",
+        "ja": "Arial"
+    }
+    body_font = font_map.get(lang_code, "Helvetica")
+
+    styles.add(ParagraphStyle(
+        name='ElegantCourtTitle',
+        fontName='Helvetica-Bold',
+        fontSize=22,
+        textColor=COLORS['court_navy'],
+        spaceAfter=15,
+        alignment=TA_CENTER,
+        leading=32,
+        spaceBefore=30
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ElegantCourtSubtitle',
+        fontName='Helvetica',
+        fontSize=12,
+        textColor=COLORS['court_navy_light'],
+        spaceBefore=10,
+        spaceAfter=10,
+        alignment=TA_CENTER,
+        leading=20,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ElegantJudgeName',
+        fontName='Helvetica-Bold',
+        fontSize=14,
+        textColor=COLORS['court_navy'],
+        spaceAfter=2,
+        alignment=TA_CENTER,
+        leading=18
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ElegantSectionTitle',
+        fontName='NotoEmoji',
+        fontSize=12,
+        textColor=COLORS['court_navy'],
+        spaceAfter=0,
+        alignment=TA_LEFT,
+        leading=20,
+        spaceBefore=0
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ElegantBodyText',
+        fontName=body_font,
+        fontSize=10.5,
+        textColor=COLORS['document_text'],
+        spaceAfter=12,
+        leading=18,
+        alignment=TA_JUSTIFY,
+        leftIndent=20,
+        bulletIndent=10,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ElegantCaseInfo',
+        fontName='Helvetica',
+        fontSize=11,
+        textColor=COLORS['document_text'],
+        spaceAfter=4,
+        leading=14,
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name="ElegantCourtSeal",
+        fontName="NotoEmoji",
+        fontSize=30,
+        textColor=COLORS['court_gold'],
+        alignment=TA_CENTER,
+        spaceAfter=30,
+    ))
+
+    styles.add(ParagraphStyle(
+        name="ElegantCourtJudge",
+        fontName="Helvetica",
+        fontSize=11,
+        textColor=COLORS['court_navy'],
+        alignment=TA_CENTER,
+        spaceAfter=15,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CaseHeaderPrimary',
+        fontName='Helvetica-Bold',
+        fontSize=13,
+        leading=16,
+        textColor=COLORS['document_text'],
+        alignment=TA_LEFT,
+        spaceAfter=15,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CaseHeaderSecondary',
+        fontName='Helvetica-Bold',
+        fontSize=12,
+        leading=16,
+        textColor=COLORS['document_text'],
+        alignment=TA_LEFT,
+        spaceAfter=15,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CaseHeaderTertiary',
+        fontName='Helvetica',
+        fontSize=11,
+        leading=16,
+        textColor=COLORS['document_text'],
+        alignment=TA_LEFT,
+        spaceAfter=15,
+    ))
+
+    styles.add(ParagraphStyle(
+        name='CaseHeaderSmall',
+        fontName='ArialItalic',
+        fontSize=10,
+        leading=16,
+        textColor=COLORS['document_muted'],
+        alignment=TA_LEFT,
+        spaceAfter=15,
+    ))
+
+    return styles
+
+def _create_elegant_court_header(styles):
+    """Create elegant court header with emoji + text support"""
+    elements = []
+
+    row_heights = [0.8 * inch, 0.8 * inch, 0.4 * inch, 0.4 * inch, 0.4 * inch]
+
+    header_data = [
+        [Paragraph('<font name="NotoEmoji">⚖️</font>', styles['ElegantCourtSeal'])],
+        [Paragraph('<font name="Helvetica-Bold">MAHAWTHADER AI JUSTICE</font>', styles['ElegantCourtTitle'])],
+        [Paragraph("", styles['ElegantCourtSubtitle'])],
+        [Paragraph('<font name="Helvetica">SUPREME COURT OF JUSTICE</font>', styles['ElegantCourtJudge'])],
+        [Paragraph('<font name="Helvetica">PRESIDING</font>', styles['ElegantCourtJudge'])],
+    ]
+
+    table = Table(header_data, rowHeights=row_heights)
+    table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BACKGROUND', (0, 0), (-1, -1), COLORS['document_bg']),
+        ('LINEBELOW', (0, 1), (-1, 1), 2, COLORS['document_muted']),
+        ('LINEBELOW', (0, 4), (-1, 4), 2, COLORS['court_gold']),
+        ('TOPPADDING', (0, 0), (0, 0), 30),
+        ('BOTTOMPADDING', (0, 0), (0, 0), 30),
+        ('TOPPADDING', (0, 1), (0, 1), 30),
+        ('BOTTOMPADDING', (0, 1), (0, 1), 30),
+        ('TOPPADDING', (0, 3), (0, 3), 10),
+        ('BOTTOMPADDING', (0, 3), (0, 3), 15),
+        ('TOPPADDING', (0, 4), (0, 4), 15),
+        ('BOTTOMPADDING', (0, 4), (0, 4), 20),
+    ]))
+
+    elements.append(table)
+    return elements
+
+def _create_elegant_case_header(verdict_text: str, case_id: str, styles, plaintiff_name: str, defendant_name: str, generated_at: datetime):
+    """Create elegant case information header"""
+    elements = []
+
+    case_info_data = [
+        [Paragraph(plaintiff_name, styles['CaseHeaderPrimary']), 
+         Paragraph(f"Case No. {case_id[-8:]}", styles['CaseHeaderSecondary'])],
+        [Paragraph("Plaintiff", styles['CaseHeaderSmall']), 
+         Paragraph(f"Filed: {generated_at.strftime('%B %d, %Y')}", styles['CaseHeaderTertiary'])],
+        [Paragraph("", styles['CaseHeaderTertiary']), 
+         Paragraph("", styles['CaseHeaderTertiary'])],
+        [Paragraph("v.", styles['CaseHeaderPrimary']), 
+         Paragraph("", styles['CaseHeaderTertiary'])],
+        [Paragraph("", styles['CaseHeaderTertiary']), 
+         Paragraph("", styles['CaseHeaderTertiary'])],
+        [Paragraph(defendant_name, styles['CaseHeaderPrimary']), 
+         Paragraph(f"Document #{case_id[-4:]}", styles['CaseHeaderTertiary'])],
+        [Paragraph("Defendant", styles['CaseHeaderSmall']), 
+         Paragraph(f"Verdict Date: {generated_at.strftime('%B %d, %Y')}", styles['CaseHeaderTertiary'])]
+    ]
+
+    table = Table(case_info_data, colWidths=[3.5 * inch, 3.5 * inch], 
+                  rowHeights=[0.4 * inch, 0.4 * inch, 0.25 * inch, 0.25 * inch, 0.25 * inch, 0.4 * inch, 0.4 * inch])
+    table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+        ('TOPPADDING', (0, 0), (-1, -1), 15),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+        ('LEFTPADDING', (0, 0), (-1, -1), 12),
+        ('RIGHTPADDING', (0, 0), (0, -1), 12),
+        ('RIGHTPADDING', (1, 0), (1, -1), 8),
+        ('BOTTOMPADDING', (1, 0), (1, 0), 15),
+        ('TOPPADDING', (1, 1), (1, 1), 15),
+    ]))
+
+    elements.append(table)
+    return elements
+
+def _create_elegant_section(title: str, content: str, styles):
+    """
+    Create a flowing section (header + paragraphs) that avoids LayoutError.
+    - title: section title (e.g. "SCENARIO", "COURT'S REASONING")
+    - content: full text for that section (string)
+    Returns a list of flowables (Paragraphs/Spacers).
+    """
+    elements = []
+
+    # icons per section
+    section_icons = {
+        "CASE TITLE": "📋",
+        "SCENARIO": "📝",
+        "APPLICABLE LAW": "⚖️",
+        "COURT'S REASONING": "🏛️",
+        "DECISION": "✅",
+        "TOTAL IMPRISONMENT": "⏰",
+        "SENTENCE": "⏰"
+    }
+    icon = section_icons.get(title.upper(), "📄")
+
+    # header (emoji + bold title)
+    header_text = (
+        f'<font name="NotoEmoji">{icon}</font> '
+        f'<font name="Helvetica-Bold">{title}</font>'
+    )
+    elements.append(Paragraph(header_text, styles['ElegantSectionTitle']))
+    elements.append(Spacer(1, 0.12 * inch))
+
+    # split content into lines then into bullet-like items
+    content_lines = [ln.strip() for ln in content.split("\n") if ln.strip()]
+    all_items = []
+    for line in content_lines:
+        # split on bullets or hyphens, but if none found keep whole line
+        items = [itm.strip() for itm in re.split(r'\s*[-•]\s+', line) if itm.strip()]
+        if not items:
+            items = [line]
+        all_items.extend(items)
+
+    # create paragraphs for each item (allow natural page breaks)
+    for item in all_items:
+        if title.upper() == "APPLICABLE LAW":
+            # show a bullet symbol — keep it simple and flowing
+            text = f'• {item}'
+            elements.append(Paragraph(text, styles['ElegantBodyText']))
+        else:
+            elements.append(Paragraph(item, styles['ElegantBodyText']))
+        elements.append(Spacer(1, 0.08 * inch))
+
+    # small gap after section
+    elements.append(Spacer(1, 0.20 * inch))
+    return elements
+
+
+def _parse_verdict_sections(verdict_text: str) -> Dict[str, str]:
+    """Parse verdict text into structured sections"""
+    sections = {
+        "CASE TITLE": "",
+        "SCENARIO": "",
+        "APPLICABLE LAW": "",
+        "COURT'S REASONING": "",
+        "DECISION": "",
+        "TOTAL IMPRISONMENT": "",
+        "SENTENCE": ""
+    }
+
+    current_section = None
+    for line in verdict_text.split("\n"):
+        line = line.strip()
+        if line.endswith(":") and line[:-1] in sections:
+            current_section = line[:-1]
+        elif current_section and line:
+            sections[current_section] += line + " "
+
+    return sections
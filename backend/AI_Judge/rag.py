@@ -1,7 +1,10 @@
 # rag_index.py
 from __future__ import annotations
 import os
+import re
 import json
+import threading
+import time
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -13,10 +16,77 @@ except Exception:
 
 from sentence_transformers import SentenceTransformer
 
+from .metrics import RETRIEVAL_ENCODE_SECONDS, RETRIEVAL_VECTOR_SEARCH_SECONDS
+
 def _l2_normalize(x: np.ndarray) -> np.ndarray:
     norms = np.linalg.norm(x, axis=1, keepdims=True) + 1e-12
     return x / norms
 
+def encode_sorted(model: SentenceTransformer, texts: List[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Encode texts in batches of similar length (longest first) to minimise padding,
+    returning rows in the original order.
+    """
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    emb = model.encode(
+        [texts[i] for i in order],
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    out = np.empty_like(emb)
+    out[np.asarray(order)] = emb
+    return out
+
+def aggregate_hits(per_window: List[List[Tuple[int, float]]], aggregate: str = "max") -> Dict[int, float]:
+    """
+    Collapse per-window (idx, score) hit lists into one score per indexed document.
+    "max" keeps the best window score; "sum" rewards documents hit by many windows.
+    """
+    if aggregate not in ("max", "sum"):
+        raise ValueError(f"Unknown aggregate mode: {aggregate}")
+    scores: Dict[int, float] = {}
+    for hits in per_window:
+        for idx, score in hits:
+            if idx not in scores:
+                scores[idx] = score
+            elif aggregate == "max":
+                scores[idx] = max(scores[idx], score)
+            else:
+                scores[idx] += score
+    return scores
+
+class RunningRelevance:
+    """
+    Running per-document score table for one case, folded in window by window as
+    statements and exhibits arrive, so the final ranking is ready without a
+    search over the whole case corpus.
+    """
+    def __init__(self, aggregate: str = "max"):
+        if aggregate not in ("max", "sum"):
+            raise ValueError(f"Unknown aggregate mode: {aggregate}")
+        self.aggregate = aggregate
+        self.scores: Dict[int, float] = {}
+        self.windows = 0
+        # Inputs folded in so far, to check the table covers the whole case.
+        self.statements = 0
+        self.exhibits = 0
+        self.failed = False
+
+    def update(self, per_window: List[List[Tuple[int, float]]], statements: int = 0, exhibits: int = 0) -> None:
+        # The table so far is itself one (idx, score) list: max of maxes and sum of
+        # sums equal aggregate_hits over every window seen, for both modes.
+        new = aggregate_hits(per_window, aggregate=self.aggregate)
+        self.scores = aggregate_hits([list(self.scores.items()), list(new.items())], aggregate=self.aggregate)
+        self.windows += len(per_window)
+        self.statements += statements
+        self.exhibits += exhibits
+
+    def ranked(self, top_k: int) -> List[Tuple[int, float]]:
+        return sorted(self.scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+
 class VectorIndexer:
     """
     Tiny vector store with FAISS (if present) or numpy fallback.
@@ -29,7 +99,9 @@ class VectorIndexer:
         index_name: str = "kb_index",
         use_faiss: Optional[bool] = None,
     ):
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self._model: Optional[SentenceTransformer] = None
+        self._model_lock = threading.Lock()
         self.index_dir = index_dir
         self.index_name = index_name
         self.use_faiss = _FAISS_OK if use_faiss is None else use_faiss
@@ -40,74 +112,211 @@ class VectorIndexer:
         self._metadata: List[Dict[str, Any]] = []
         self._dim: Optional[int] = None
 
-    # ---------- paths
     @property
-    def _meta_path(self) -> str:
-        return os.path.join(self.index_dir, f"{self.index_name}.meta.json")
+    def model(self) -> SentenceTransformer:
+        # Loaded on first encode so a cached index can be loaded (or written by the
+        # offline build tool) without pulling the encoder into memory.
+        return self._model if self._model is not None else self.warm()
 
-    @property
-    def _faiss_path(self) -> str:
-        return os.path.join(self.index_dir, f"{self.index_name}.faiss")
+    def warm(self) -> SentenceTransformer:
+        """Load the encoder now rather than on the first query."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
 
+    # ---------- paths
     @property
-    def _npy_path(self) -> str:
-        return os.path.join(self.index_dir, f"{self.index_name}.npy")
+    def _manifest_path(self) -> str:
+        return os.path.join(self.index_dir, f"{self.index_name}.manifest.json")
+
+    def _paths(self, version: Optional[str] = None) -> Dict[str, str]:
+        # No version: the unversioned files written before the manifest existed.
+        base = os.path.join(self.index_dir, f"{self.index_name}.{version}" if version else self.index_name)
+        return {"meta": f"{base}.meta.json", "faiss": f"{base}.faiss", "npy": f"{base}.npy"}
 
     # ---------- build / save / load
-    def build(self, texts: List[str], metadata: List[Dict[str, Any]]) -> None:
+    def build(self, texts: List[str], metadata: List[Dict[str, Any]], batch_size: int = 64) -> None:
         assert len(texts) == len(metadata), "texts and metadata length mismatch"
-        emb = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
-        emb = _l2_normalize(emb)
+        emb = encode_sorted(self.model, texts, batch_size=batch_size)
+        self.save(emb, metadata)
+
+    def save(self, emb: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """
+        Install normalized embeddings + metadata and persist them. Each save writes
+        a new version of the data and metadata files, then points the manifest at
+        it with a single os.replace, so a concurrent load() sees either the old
+        index or the new one, never a mix.
+        """
+        emb = _l2_normalize(np.asarray(emb, dtype=np.float32))
         self._dim = emb.shape[1]
         self._metadata = metadata
 
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        paths = self._paths(version)
         if self.use_faiss:
             index = faiss.IndexFlatIP(self._dim)  # inner product on normalized vectors == cosine
             index.add(emb.astype(np.float32))
             self._faiss_index = index
-            # persist
-            faiss.write_index(index, self._faiss_path)
+            faiss.write_index(index, paths["faiss"])
         else:
             self._embeddings = emb
-            np.save(self._npy_path, emb)
-
-        with open(self._meta_path, "w", encoding="utf-8") as f:
+            with open(paths["npy"], "wb") as f:
+                np.save(f, emb)
+        with open(paths["meta"], "w", encoding="utf-8") as f:
             json.dump({"metadata": self._metadata, "dim": self._dim}, f, ensure_ascii=False)
 
+        previous = self._read_manifest()
+        tmp_manifest = f"{self._manifest_path}.tmp.{os.getpid()}"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump({"version": version}, f)
+        os.replace(tmp_manifest, self._manifest_path)
+        # Keep the version just replaced for a load() that read the old manifest a
+        # moment ago; anything older is unreachable.
+        self._remove_versions(keep={version, (previous or {}).get("version")})
+
+    def _read_manifest(self) -> Optional[Dict[str, str]]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_versions(self, keep: set) -> None:
+        prefix = f"{self.index_name}.v"
+        for name in os.listdir(self.index_dir):
+            if not name.startswith(prefix) or not name.endswith((".meta.json", ".faiss", ".npy")):
+                continue
+            if name[len(self.index_name) + 1:].split(".", 1)[0] not in keep:
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass
+
     def load(self) -> bool:
-        if not os.path.exists(self._meta_path):
+        manifest = self._read_manifest()
+        paths = self._paths(manifest["version"] if manifest else None)
+        if not os.path.exists(paths["meta"]):
             return False
-        with open(self._meta_path, "r", encoding="utf-8") as f:
+        with open(paths["meta"], "r", encoding="utf-8") as f:
             meta = json.load(f)
         self._metadata = meta["metadata"]
         self._dim = meta["dim"]
 
-        if self.use_faiss and os.path.exists(self._faiss_path):
-            self._faiss_index = faiss.read_index(self._faiss_path)
+        if self.use_faiss and os.path.exists(paths["faiss"]):
+            self._faiss_index = faiss.read_index(paths["faiss"])
             return True
-        if not self.use_faiss and os.path.exists(self._npy_path):
-            self._embeddings = np.load(self._npy_path)
+        if not self.use_faiss and os.path.exists(paths["npy"]):
+            self._embeddings = np.load(paths["npy"])
             return True
         return False
 
     # ---------- search
     def encode_query(self, text: str) -> np.ndarray:
-        q = self.model.encode([text], convert_to_numpy=True, show_progress_bar=False)
+        return self.encode_queries([text])
+
+    def encode_queries(self, texts: List[str]) -> np.ndarray:
+        with RETRIEVAL_ENCODE_SECONDS.time(index=self.index_name):
+            q = self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
         q = _l2_normalize(q).astype(np.float32)
         return q
 
     def search(self, query: str, top_k: int = 12) -> List[Tuple[int, float]]:
         q = self.encode_query(query)
+        return self.search_vectors(q, top_k=top_k)[0]
+
+    def search_vectors(self, q: np.ndarray, top_k: int = 12) -> List[List[Tuple[int, float]]]:
+        """Search a batch of normalized query vectors; returns one hit list per row."""
         if self.use_faiss and self._faiss_index is not None:
-            scores, idxs = self._faiss_index.search(q, top_k)
-            # scores shape (1, k); idxs shape (1, k)
-            return [(int(i), float(s)) for i, s in zip(idxs[0], scores[0]) if i != -1]
+            with RETRIEVAL_VECTOR_SEARCH_SECONDS.time(index=self.index_name, engine="faiss"):
+                scores, idxs = self._faiss_index.search(q, top_k)
+            # scores shape (n, k); idxs shape (n, k)
+            return [
+                [(int(i), float(s)) for i, s in zip(row_idx, row_scores) if i != -1]
+                for row_idx, row_scores in zip(idxs, scores)
+            ]
         elif self._embeddings is not None:
-            sims = (self._embeddings @ q[0].reshape(-1, 1)).ravel()  # cosine on normalized
-            top_idx = np.argsort(-sims)[:top_k]
-            return [(int(i), float(sims[i])) for i in top_idx]
+            with RETRIEVAL_VECTOR_SEARCH_SECONDS.time(index=self.index_name, engine="numpy"):
+                sims = q @ self._embeddings.T  # cosine on normalized, shape (n, docs)
+                results = []
+                for row in sims:
+                    top_idx = np.argsort(-row)[:top_k]
+                    results.append([(int(i), float(row[i])) for i in top_idx])
+            return results
         else:
             raise RuntimeError("Index not built or loaded.")
 
+    def split_windows(self, text: str, window_tokens: Optional[int] = None, overlap: int = 32) -> List[str]:
+        """
+        Split text into windows of at most `window_tokens` model tokens (default: the
+        encoder's max sequence length minus special tokens), overlapping by `overlap`.
+        Falls back to whitespace words when the tokenizer cannot report offsets.
+        """
+        if window_tokens is None:
+            window_tokens = max(16, int(getattr(self.model, "max_seq_length", 256) or 256) - 2)
+        overlap = max(0, min(overlap, window_tokens // 2))
+        step = window_tokens - overlap
+
+        spans: List[Tuple[int, int]] = []
+        tokenizer = getattr(self.model, "tokenizer", None)
+        try:
+            enc = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+            spans = [tuple(o) for o in enc["offset_mapping"]]
+        except Exception:
+            spans = [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]
+        if not spans:
+            return [text] if text.strip() else []
+
+        windows: List[str] = []
+        for start in range(0, len(spans), step):
+            chunk = spans[start:start + window_tokens]
+            piece = text[chunk[0][0]:chunk[-1][1]].strip()
+            if piece:
+                windows.append(piece)
+            if start + window_tokens >= len(spans):
+                break
+        return windows
+
+    def search_texts(
+        self,
+        texts: List[str],
+        top_k: int = 12,
+        window_tokens: Optional[int] = None,
+        overlap: int = 32,
+    ) -> List[List[Tuple[int, float]]]:
+        """Window every text, encode all windows in one batch and return per-window hits."""
+        windows = [w for t in texts for w in self.split_windows(t, window_tokens=window_tokens, overlap=overlap)]
+        if not windows:
+            return []
+        return self.search_vectors(self.encode_queries(windows), top_k=top_k)
+
+    def search_chunked(
+        self,
+        text: str,
+        top_k: int = 12,
+        window_tokens: Optional[int] = None,
+        overlap: int = 32,
+        max_windows: int = 16,
+        aggregate: str = "max",
+    ) -> List[Tuple[int, float]]:
+        """
+        Multi-vector search for long queries: split into token-bounded windows, encode
+        them in one batch, search them together and aggregate scores per document.
+        At most `max_windows` windows are encoded, sampled evenly across the text.
+        """
+        windows = self.split_windows(text, window_tokens=window_tokens, overlap=overlap)
+        if not windows:
+            return []
+        if len(windows) > max_windows:
+            picks = np.linspace(0, len(windows) - 1, num=max_windows).round().astype(int)
+            windows = [windows[i] for i in sorted(set(picks.tolist()))]
+
+        q = self.encode_queries(windows)
+        per_window = self.search_vectors(q, top_k=top_k)
+        scores = aggregate_hits(per_window, aggregate=aggregate)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[:top_k]
+
     def get_metadata(self, idx: int) -> Dict[str, Any]:
         return self._metadata[idx]
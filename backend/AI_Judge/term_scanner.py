@@ -0,0 +1,235 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# category -> label -> language -> terms. A label is one legal concept; its terms
+# in any of the KB languages (en, my, zh, ja) count as the same hit. Domain
+# categories classify the case, "defense" and "evidence" feed the verdict logic.
+# Burmese, Chinese and Japanese terms match without word boundaries, so they
+# must be specific phrases: a bare 同意 ("agree"), 网络 ("network") or 障害
+# ("failure") would hit almost any statement.
+LEGAL_TERMS: Dict[str, Dict[str, Dict[str, List[str]]]] = {
+    "penal": {
+        "murder": {"en": ["murder"], "my": ["လူသတ်မှု"], "zh": ["谋杀"], "ja": ["殺人"]},
+        "homicide": {"en": ["homicide"], "my": ["လူသေမှု"], "zh": ["杀人"], "ja": ["殺害"]},
+        "killed": {"en": ["killed"], "my": ["သတ်ဖြတ်"], "zh": ["杀死", "被杀"], "ja": ["殺された"]},
+        "stabbed": {"en": ["stabbed"], "my": ["ဓားဖြင့်ထိုး"], "zh": ["刺伤"], "ja": ["刺した", "刺された"]},
+        "death": {"en": ["death"], "my": ["သေဆုံး"], "zh": ["死亡"], "ja": ["死亡"]},
+        "robbery": {"en": ["robbery"], "my": ["လုယက်"], "zh": ["抢劫"], "ja": ["強盗"]},
+        "dacoity": {"en": ["dacoity"], "my": ["ဓားပြ"], "zh": ["结伙抢劫"], "ja": ["集団強盗"]},
+        "theft": {"en": ["theft"], "my": ["ခိုးမှု", "ခိုးယူ"], "zh": ["盗窃", "偷窃"], "ja": ["窃盗", "盗難"]},
+        "assault": {"en": ["assault"], "my": ["ရိုက်နှက်"], "zh": ["殴打", "袭击"], "ja": ["暴行"]},
+        "burglary": {"en": ["burglary"], "my": ["ဖောက်ထွင်း"], "zh": ["入室盗窃"], "ja": ["侵入盗", "空き巣"]},
+        "trespass": {"en": ["trespass"], "my": ["ကျူးကျော်"], "zh": ["非法侵入"], "ja": ["不法侵入"]},
+        "food": {"en": ["food"], "my": ["အစားအစာ"], "zh": ["食品", "食物"], "ja": ["食品", "食べ物"]},
+        "drink": {"en": ["drink"], "my": ["အဖျော်ယမကာ"], "zh": ["饮料"], "ja": ["飲料", "飲み物"]},
+        "noxious": {"en": ["noxious"], "my": ["အန္တရာယ်ရှိ"], "zh": ["有害"], "ja": ["有害"]},
+        "poison": {"en": ["poison"], "my": ["အဆိပ်"], "zh": ["毒药", "投毒", "下毒"], "ja": ["毒物", "毒を"]},
+        "contaminated": {"en": ["contaminated"], "my": ["ညစ်ညမ်း"], "zh": ["污染"], "ja": ["汚染"]},
+        "unfit for consumption": {
+            "en": ["unfit for consumption"], "my": ["စားသုံးရန်မသင့်"], "zh": ["不适合食用"], "ja": ["食用に適さない"],
+        },
+        "health": {"en": ["health"], "my": ["ကျန်းမာရေး"], "zh": ["健康", "卫生"], "ja": ["健康", "衛生"]},
+        "inspection": {"en": ["inspection"], "my": ["စစ်ဆေး"], "zh": ["检查", "检验"], "ja": ["検査"]},
+    },
+    "telecom": {
+        "call log": {"en": ["call log"], "my": ["ဖုန်းခေါ်ဆိုမှုမှတ်တမ်း"], "zh": ["通话记录"], "ja": ["通話記録"]},
+        "phone record": {"en": ["phone record"], "my": ["ဖုန်းမှတ်တမ်း"], "zh": ["电话记录"], "ja": ["電話記録"]},
+        "telecom": {"en": ["telecom"], "my": ["ဆက်သွယ်ရေး"], "zh": ["电信"], "ja": ["電気通信"]},
+        "subscriber": {"en": ["subscriber"], "my": ["စာရင်းသွင်းသူ"], "zh": ["订户"], "ja": ["加入者"]},
+    },
+    "cybersecurity": {
+        "hack": {"en": ["hack"], "my": ["ဟက်ကာ"], "zh": ["黑客"], "ja": ["ハッキング", "ハッカー"]},
+        "malware": {"en": ["malware"], "my": ["မဲလ်ဝဲ"], "zh": ["恶意软件"], "ja": ["マルウェア"]},
+        "phishing": {"en": ["phishing"], "my": ["ဖစ်ရှင်း"], "zh": ["网络钓鱼"], "ja": ["フィッシング"]},
+        "unauthorized access": {
+            "en": ["unauthorized access"], "my": ["ခွင့်ပြုချက်မရှိဘဲဝင်ရောက်"], "zh": ["未经授权访问", "非法访问"],
+            "ja": ["不正アクセス"],
+        },
+        "cyber": {"en": ["cyber"], "my": ["ဆိုက်ဘာ"], "zh": ["网络犯罪", "网络攻击"], "ja": ["サイバー"]},
+        "internet": {"en": ["internet"], "my": ["အင်တာနက်"], "zh": ["互联网"], "ja": ["インターネット"]},
+        "digital": {"en": ["digital"], "my": ["ဒစ်ဂျစ်တယ်"], "zh": ["数码", "数字化"], "ja": ["デジタル"]},
+        "photo": {"en": ["photo"], "my": ["ဓာတ်ပုံ"], "zh": ["照片"], "ja": ["写真"]},
+        "image": {"en": ["image"], "my": ["ပုံရိပ်"], "zh": ["图片", "图像"], "ja": ["画像"]},
+        "defame": {"en": ["defame"], "my": ["အသရေဖျက်"], "zh": ["诽谤"], "ja": ["名誉毀損"]},
+        "dishonest": {"en": ["dishonest"], "my": ["မရိုးမဖြောင့်"], "zh": ["不诚实"], "ja": ["不正直"]},
+    },
+    "military": {
+        "soldier": {"en": ["soldier"], "my": ["စစ်သား"], "zh": ["士兵", "军人"], "ja": ["兵士"]},
+        "army": {"en": ["army"], "my": ["တပ်မတော်"], "zh": ["军队"], "ja": ["軍隊", "陸軍"]},
+        "desertion": {"en": ["desertion"], "my": ["တပ်ပြေး"], "zh": ["逃兵"], "ja": ["脱走"]},
+        "mutiny": {"en": ["mutiny"], "my": ["ပုန်ကန်"], "zh": ["兵变", "哗变"], "ja": ["反乱"]},
+        "insubordination": {
+            "en": ["insubordination"], "my": ["အမိန့်မနာခံ"], "zh": ["抗命", "不服从命令"], "ja": ["命令違反", "不服従"],
+        },
+        "military service": {"en": ["military service"], "my": ["စစ်မှုထမ်း"], "zh": ["兵役"], "ja": ["兵役"]},
+        "evade": {"en": ["evade"], "my": ["ရှောင်တိမ်း"], "zh": ["逃避", "规避"], "ja": ["回避"]},
+        "doctor": {"en": ["doctor"], "my": ["ဆရာဝန်"], "zh": ["医生"], "ja": ["医師", "医者"]},
+        "medical note": {"en": ["medical note"], "my": ["ဆေးလက်မှတ်"], "zh": ["病假条", "医疗证明"], "ja": ["診断書"]},
+        "false illness": {"en": ["false illness"], "my": ["ဖျားနာဟန်ဆောင်"], "zh": ["装病", "诈病"], "ja": ["仮病"]},
+        "fake certificate": {
+            "en": ["fake certificate"], "my": ["လက်မှတ်အတု"], "zh": ["假证明", "伪造证明"], "ja": ["偽造証明書", "偽の証明書"],
+        },
+        "alibi": {"en": ["alibi"], "my": ["ဖြစ်ရပ်နေရာတွင်မရှိ"], "zh": ["不在场证明"], "ja": ["アリバイ"]},
+        "disability": {"en": ["disability"], "my": ["မသန်စွမ်း"], "zh": ["残疾"], "ja": ["障害者", "身体障害"]},
+    },
+    "defense": {
+        "self-defence": {
+            "en": ["self-defence", "self-defense", "self defence", "self defense"],
+            "my": ["မိမိကိုယ်ကိုကာကွယ်"], "zh": ["正当防卫", "自卫"], "ja": ["正当防衛"],
+        },
+        "under duress": {"en": ["under duress"], "my": ["ခြိမ်းခြောက်ခံရ"], "zh": ["被迫"], "ja": ["脅迫され"]},
+        "coercion": {"en": ["coercion"], "my": ["အတင်းအကျပ်"], "zh": ["胁迫"], "ja": ["強要"]},
+        "necessity": {"en": ["necessity"], "my": ["မလွဲမရှောင်သာ"], "zh": ["紧急避险"], "ja": ["緊急避難"]},
+        "insanity": {"en": ["insanity"], "my": ["စိတ်မနှံ့"], "zh": ["精神失常", "精神病"], "ja": ["心神喪失"]},
+        "alibi": {"en": ["alibi"], "my": ["ဖြစ်ရပ်နေရာတွင်မရှိ"], "zh": ["不在场证明"], "ja": ["アリバイ"]},
+        "consent": {
+            "en": ["consent", "consented"], "my": ["သဘောတူ"], "zh": ["经同意", "经其同意", "征得同意"],
+            "ja": ["同意を得て", "同意の上"],
+        },
+        "provocation": {"en": ["provocation"], "my": ["ရန်စမှု"], "zh": ["挑衅", "激怒"], "ja": ["挑発"]},
+    },
+    "evidence": {
+        "confession": {"en": ["confession"], "my": ["ဝန်ခံချက်"], "zh": ["供认", "认罪"], "ja": ["自白"]},
+        "fingerprint": {"en": ["fingerprint"], "my": ["လက်ဗွေ"], "zh": ["指纹"], "ja": ["指紋"]},
+        "footprint": {"en": ["footprint"], "my": ["ခြေရာ"], "zh": ["脚印", "足迹"], "ja": ["足跡"]},
+        "fiber": {"en": ["fiber", "fibre"], "my": ["အမျှင်"], "zh": ["纤维"], "ja": ["繊維"]},
+        "recovered": {"en": ["recovered"], "my": ["ပြန်လည်ရရှိ", "သိမ်းဆည်း"], "zh": ["缴获", "追回"], "ja": ["押収", "回収"]},
+        "witness": {"en": ["witness"], "my": ["သက်သေ"], "zh": ["证人", "目击"], "ja": ["証人", "目撃"]},
+        "video": {"en": ["video"], "my": ["ဗီဒီယို"], "zh": ["视频", "录像"], "ja": ["ビデオ", "動画", "映像"]},
+        "surveillance": {"en": ["surveillance", "cctv"], "my": ["စောင့်ကြည့်"], "zh": ["监控"], "ja": ["監視", "防犯カメラ"]},
+    },
+}
+
+DOMAINS = ("penal", "telecom", "cybersecurity", "military")
+
+# (term, category, label, lang, check word boundary before, check after)
+_Entry = Tuple[str, str, str, str, bool, bool]
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _needs_boundary(ch: str) -> bool:
+    # Latin-script terms match whole words only (like r"\bterm\b"); Burmese,
+    # Chinese and Japanese text has no spaces between words, so those match anywhere.
+    return ch.isascii() and _is_word(ch)
+
+
+def _fold(text: str) -> str:
+    """Lower-case `text` without changing its length, so hit offsets stay valid."""
+    low = text.lower()
+    if len(low) == len(text):
+        return low
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class TermScanner:
+    """
+    Finds every legal term in a text in one pass.
+
+    All terms (every category and language) are compiled into one Aho–Corasick
+    automaton, so scanning costs one walk over the text however many terms
+    there are, instead of one regex search per term. Matching is
+    case-insensitive; Latin-script terms only match whole words.
+    """
+
+    def __init__(
+        self,
+        terms: Optional[Dict[str, Dict[str, Dict[str, List[str]]]]] = None,
+        languages: Optional[Iterable[str]] = None,
+    ):
+        terms = LEGAL_TERMS if terms is None else terms
+        wanted = set(languages) if languages is not None else None
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._entries: List[_Entry] = []
+        for category, labels in terms.items():
+            for label, by_lang in labels.items():
+                for lang, words in by_lang.items():
+                    if wanted is not None and lang not in wanted:
+                        continue
+                    for word in words:
+                        self._add(_fold(word.strip()), category, label, lang)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, term: str, category: str, label: str, lang: str) -> None:
+        if not term:
+            return
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append(len(self._entries))
+        self._entries.append((term, category, label, lang, _needs_boundary(term[0]), _needs_boundary(term[-1])))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also reports the terms ending at its fallback."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Every term occurrence in `text` (overlapping ones included), in order of
+        their end offset, as {"start", "end", "term", "category", "label", "lang"}.
+        """
+        low = _fold(text or "")
+        goto, fail, out, entries = self._goto, self._fail, self._out, self._entries
+        size = len(low)
+        hits: List[Dict[str, Any]] = []
+        state = 0
+        for i, ch in enumerate(low):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for e in out[state]:
+                term, category, label, lang, left, right = entries[e]
+                start = i + 1 - len(term)
+                if left and start > 0 and _is_word(low[start - 1]):
+                    continue
+                if right and i + 1 < size and _is_word(low[i + 1]):
+                    continue
+                hits.append({
+                    "start": start, "end": i + 1, "term": text[start:i + 1],
+                    "category": category, "label": label, "lang": lang,
+                })
+        return hits
+
+    @staticmethod
+    def labels(hits: List[Dict[str, Any]], category: str, start: int = 0) -> Set[str]:
+        """Distinct labels of `category` among the hits starting at or after offset `start`."""
+        return {h["label"] for h in hits if h["category"] == category and h["start"] >= start}
+
+    def tags(self, text: str) -> Dict[str, List[str]]:
+        """{category: sorted distinct labels} found in `text`, e.g. for tagging a statement."""
+        found: Dict[str, Set[str]] = {}
+        for hit in self.scan(text):
+            found.setdefault(hit["category"], set()).add(hit["label"])
+        return {category: sorted(labels) for category, labels in found.items()}
+
+
+_default: Optional[TermScanner] = None
+
+
+def default_scanner() -> TermScanner:
+    """Process-wide scanner over LEGAL_TERMS, built on first use."""
+    global _default
+    if _default is None:
+        _default = TermScanner()
+    return _default
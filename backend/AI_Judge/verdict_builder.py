@@ -1,28 +1,24 @@
-import json
+import asyncio
 import os
 import re
-from typing import List, Dict, Tuple, Any
+import time
+from typing import List, Dict, Tuple, Any, Optional, Callable
 from .llm_handler import LLMHandler
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from .rag import VectorIndexer
-
-WORD = r"\b{}\b"
-
-def wre(word: str) -> re.Pattern:
-    """Compile a case-insensitive regex pattern for a word boundary match."""
-    return re.compile(WORD.format(re.escape(word)), flags=re.IGNORECASE)
-
-def count_matches(text: str, patterns: List[re.Pattern]) -> int:
-    """Count how many regex patterns match the text at least once."""
-    return sum(1 for p in patterns if p.search(text))
+from .kb_loader import DEFAULT_MAX_YEARS, DEFAULT_MIN_YEARS, load_kb, flatten_sections_en, load_penalties, parse_penalty, penalty_key
+from .verdict_jobs import record_stage
+from .context_builder import truncate_to_tokens
+from .pdf_renderer import COLORS, PdfRenderer
+from .term_scanner import DOMAINS, default_scanner
+from .verdict_catalog import VerdictCatalog
+
+# Generate the reasoning for each applicable section as its own LLM call, run
+# concurrently (the Ollama pool bounds how many are in flight per host).
+# "0" falls back to one combined call.
+REASONING_FANOUT = os.environ.get("AI_JUDGE_REASONING_FANOUT", "1") == "1"
+# Statute text included per section prompt; the case context carries the rest.
+REASONING_LAW_TOKENS = int(os.environ.get("AI_JUDGE_REASONING_LAW_TOKENS", 400))
 
 def _sanitize_filename(name: str) -> str:
     """Sanitize a string to be safe for use as a filename."""
@@ -33,27 +29,21 @@ def _sanitize_filename(name: str) -> str:
 class VerdictBuilder:
     """AI Tribunal Verdict Builder with Professional Court Design"""
 
-    def __init__(self, kb_file: str = "Project_KB_modified.json"):
+    def __init__(self, kb_file: str = "Project_KB_modified.json", catalog: Optional[VerdictCatalog] = None):
         # Resolve KB relative to this module (backend/AI_Judge)
         base_dir = os.path.dirname(os.path.abspath(__file__))
         kb_path = os.path.join(base_dir, kb_file)
         if not os.path.exists(kb_path):
             raise FileNotFoundError(f"Knowledge Base file not found at {kb_path}")
-        with open(kb_path, "r", encoding="utf-8") as f:
-            self.kb = json.load(f)
+        self.kb = load_kb(kb_path)
 
         self.laws: Dict[str, Dict[str, Any]] = {}
-        texts, metadata = [], []
         for chapter in self.kb:
             for section in chapter.get("sections", []):
-                sec_id = str(section["section"])
-                self.laws[sec_id] = section
-                texts.append(f"{section.get('title_en','')}. {section.get('text_en','')}".strip())
-                metadata.append({
-                    "section": sec_id,
-                    "title_en": section.get("title_en", ""),
-                    "text_en": section.get("text_en", ""),
-                })
+                self.laws[str(section["section"])] = section
+        texts, metadata = flatten_sections_en(self.kb)
+        # Structured penalties per section, precomputed (and persisted) by the KB loader
+        self.penalties = load_penalties(kb_path)
 
         # ✅ Initialize vector indexer
         self.indexer = VectorIndexer(index_name="kb_index")
@@ -62,106 +52,28 @@ class VerdictBuilder:
 
         self.llm = LLMHandler()
 
-        self.colors = {
-            'court_navy': colors.HexColor("#1e293b"),
-            'court_navy_light': colors.HexColor("#334155"),
-            'court_gold': colors.HexColor("#3B5169"),
-            'document_bg': colors.HexColor("#fefefe"),
-            'document_border': colors.HexColor("#e2e8f0"),
-            'document_text': colors.HexColor("#1e293b"),
-            'document_muted': colors.HexColor("#A3B5C7"),
-            'section_bg': colors.HexColor("#f8fafc"),
-        }
-
-        # Domain keywords (still used for classification)
-        self.domain_kw = {
-            "penal": [
-                wre("murder"), wre("homicide"), wre("killed"), wre("stabbed"),
-                wre("death"), wre("robbery"), wre("dacoity"), wre("theft"),
-                wre("assault"), wre("burglary"), wre("trespass"),
-                wre("food"), wre("drink"), wre("noxious"), wre("poison"), 
-                wre("contaminated"), wre("unfit for consumption"), wre("health"), wre("inspection"),
-            ],
-            "telecom": [
-                wre("call log"), wre("phone record"), wre("telecom"), wre("subscriber"),
-            ],
-            "cybersecurity": [
-                wre("hack"), wre("malware"), wre("phishing"), wre("unauthorized access"),
-                wre("cyber"), wre("internet"), wre("digital"),
-                wre("photo"), wre("image"), wre("defame"), wre("dishonest"),
-            ],
-            "military": [
-                wre("soldier"), wre("army"), wre("desertion"), wre("mutiny"),
-                wre("insubordination"), wre("military service"), wre("evade"),
-                wre("doctor"), wre("medical note"), wre("false illness"),
-                wre("fake certificate"), wre("alibi"), wre("disability"),
-            ],
-        }
-
-        # Defense & evidence patterns
-        self.defense_patterns = [
-            wre("self[- ]defen[cs]e"), wre("under duress"), wre("coercion"),
-            wre("necessity"), wre("insanity"), wre("alibi"),
-            wre("consent(ed)?"), wre("provocation"),
-        ]
-        self.evidence_patterns = [
-            wre("confession"), wre("fingerprint"), wre("footprint"),
-            wre("fiber"), wre("recovered"), wre("witness"),
-            wre("video"), wre("surveillance"),
-        ]
-
-        self._register_fonts()
-
-    def _register_fonts(self):
-        """Register available fonts from a package-local `fonts` directory when present.
-        Falls back silently to system defaults if files are missing."""
-        font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
-
-        try:
-            # Arial regular → also map as Helvetica if available for consistency
-            arial_path = os.path.join(font_dir, "Arial.ttf")
-            if os.path.exists(arial_path):
-                pdfmetrics.registerFont(TTFont("Arial", arial_path))
-                pdfmetrics.registerFont(TTFont("Helvetica", arial_path))
-
-            # Arial bold → also map to Helvetica-Bold if present
-            arial_bold_path = os.path.join(font_dir, "Arial-Bold.ttf")
-            if os.path.exists(arial_bold_path):
-                pdfmetrics.registerFont(TTFont("Arial-Bold", arial_bold_path))
-                pdfmetrics.registerFont(TTFont("Helvetica-Bold", arial_bold_path))
+        self.colors = COLORS
 
-            # Emoji / DejaVu fonts – try local, then silently ignore if unavailable
-            noto_emoji_path = os.path.join(font_dir, "NotoEmoji-VariableFont_wght.ttf")
-            if os.path.exists(noto_emoji_path):
-                pdfmetrics.registerFont(TTFont("NotoEmoji", noto_emoji_path))
-            else:
-                try:
-                    pdfmetrics.registerFont(TTFont("NotoEmoji", "NotoEmoji-VariableFont_wght.ttf"))
-                except Exception:
-                    pass
+        # Domain, defense and evidence terms (all KB languages), matched in one pass
+        self.term_scanner = default_scanner()
 
-            dejavu_path = os.path.join(font_dir, "DejaVuSans.ttf")
-            if os.path.exists(dejavu_path):
-                pdfmetrics.registerFont(TTFont("DejaVuSans", dejavu_path))
-            else:
-                try:
-                    pdfmetrics.registerFont(TTFont("DejaVuSans", "DejaVuSans.ttf"))
-                except Exception:
-                    pass
+        self.pdf_renderer = PdfRenderer()
+        # Every rendered PDF is recorded here for /get_case_history.
+        self.catalog = catalog or VerdictCatalog()
 
-            # Optional italic
-            arial_italic_path = os.path.join(font_dir, "Arial-Italic.ttf")
-            if os.path.exists(arial_italic_path):
-                pdfmetrics.registerFont(TTFont("ArialItalic", arial_italic_path))
-
-        except Exception as e:
-            print(f"Error registering custom fonts: {e}")
-            print("Using default system fonts.")
-
-    async def build_verdict(self, case: Dict[str, Any], output_dir: str = "./history", lang_code: str = "en") -> tuple[str, str, str, str]:
+    async def build_verdict(
+        self,
+        case: Dict[str, Any],
+        output_dir: str = "./history",
+        lang_code: str = "en",
+        timings: Optional[Dict[str, float]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> tuple[str, str, str, str]:
         """
         Build verdict and automatically generate a PDF.
         Returns (verdict_text, plaintiff_name, defendant_name, pdf_path).
+        Seconds spent per stage ("analysis", "llm", "pdf") are added to `timings`;
+        `on_token` receives the legal reasoning as the LLM streams it.
         """
         title = case.get("title", "Unknown Case")
         scenario = case.get("scenario", "")
@@ -172,46 +84,124 @@ class VerdictBuilder:
         plaintiff_text = " ".join(r.get("plaintiff", "") for r in rounds.values())
         defendant_text = " ".join(r.get("defendant", "") for r in rounds.values())
         all_text = title + " " + scenario + " " + plaintiff_text + " " + defendant_text
+        # Token-budgeted case record (statements, exhibit excerpts, statutes) from CaseFlow
+        context = (case.get("context") or {}).get("text")
 
-        domain = self._classify_domain(all_text.lower())
-        applicable = self._discover_applicable(domain, scenario)
+        with record_stage(timings, "analysis"):
+            hits = self.term_scanner.scan(all_text)
+            domain = self._classify_domain(hits)
+            applicable = self._discover_applicable(domain, scenario)
         if not applicable:
-            reasoning = await self.llm.analyze_text(scenario, "No applicable laws found.")
+            with record_stage(timings, "llm"):
+                reasoning = await self.llm.analyze_text(scenario, "No applicable laws found.", context=context, on_token=on_token)
             verdict = self._format_verdict(title, scenario, [], reasoning, "Defendant acquitted.", 0, plaintiff_name, defendant_name)
             case_id = _sanitize_filename(title) + "_" + datetime.now().strftime("%Y%m%d_%H%M%S")
-            pdf_path = await self.generate_verdict_pdf(verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name)
+            with record_stage(timings, "pdf"):
+                pdf_path = await self.generate_verdict_pdf(
+                    verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name,
+                    sections=[label for label, _ in applicable], source_case_id=case.get("case_id"),
+                )
             return (verdict, plaintiff_name, defendant_name, pdf_path)
 
-        evidence_score = self._score_evidence(all_text)
-        has_defense = any(p.search(defendant_text) for p in self.defense_patterns)
+        with record_stage(timings, "analysis"):
+            evidence_score = self._score_evidence(hits)
+            # defendant_text is the tail of all_text
+            has_defense = bool(self.term_scanner.labels(hits, "defense", start=len(all_text) - len(defendant_text)))
         if has_defense and evidence_score < 5:
-            reasoning = await self.llm.analyze_text(
-                scenario,
-                "\n".join([label for (label, _) in applicable]) + "\nDefense: raised"
-            )
+            with record_stage(timings, "llm"):
+                reasoning = await self._reason(scenario, applicable, "Defense: raised", context, on_token)
             verdict = self._format_verdict(title, scenario, applicable, reasoning, "Defendant acquitted.", 0, plaintiff_name, defendant_name)
             case_id = _sanitize_filename(title) + "_" + datetime.now().strftime("%Y%m%d_%H%M%S")
-            pdf_path = await self.generate_verdict_pdf(verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name)
+            with record_stage(timings, "pdf"):
+                pdf_path = await self.generate_verdict_pdf(
+                    verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name,
+                    sections=[label for label, _ in applicable], source_case_id=case.get("case_id"),
+                )
             return (verdict, plaintiff_name, defendant_name, pdf_path)
 
-        total_years = 0
-        decisions = []
-        for label, law_info in applicable:
-            sentence = self._choose_sentence(law_info, scenario, evidence_score)
-            years = self._extract_years(sentence)
-            total_years += years
-            decisions.append(f"Guilty under {label}: {sentence}")
-
-        reasoning = await self.llm.analyze_text(
-            scenario,
-            "\n".join([label for (label, _) in applicable]) + f"\nEvidence score: {evidence_score}"
-        )
+        with record_stage(timings, "llm"):
+            # Sentencing is local and cheap: work it out while the reasoning is generated.
+            reasoning_task = asyncio.create_task(
+                self._reason(scenario, applicable, f"Evidence score: {evidence_score}", context, on_token)
+            )
+            total_years = 0
+            decisions = []
+            try:
+                for label, law_info in applicable:
+                    sentence = self._choose_sentence(law_info, scenario, evidence_score)
+                    years = self._extract_years(sentence)
+                    total_years += years
+                    decisions.append(f"Guilty under {label}: {sentence}")
+            except BaseException:
+                reasoning_task.cancel()
+                raise
+            reasoning = await reasoning_task
 
         verdict = self._format_verdict(title, scenario, applicable, reasoning, "\n".join(decisions), total_years, plaintiff_name, defendant_name)
         case_id = _sanitize_filename(title) + "_" + datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_path = await self.generate_verdict_pdf(verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name)
+        with record_stage(timings, "pdf"):
+            pdf_path = await self.generate_verdict_pdf(
+                verdict, case_id, title, output_dir, lang_code, plaintiff_name, defendant_name,
+                sections=[label for label, _ in applicable], source_case_id=case.get("case_id"),
+            )
         return (verdict, plaintiff_name, defendant_name, pdf_path)
 
+    async def _reason(
+        self,
+        scenario: str,
+        applicable: List[Tuple[str, Dict[str, Any]]],
+        note: str,
+        context: Optional[str],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        COURT'S REASONING for the applicable sections. With REASONING_FANOUT each
+        section gets its own analysis, generated concurrently, and the parts are
+        merged in ranking order under the section labels.
+
+        Only the first section streams through `on_token` live; the others are
+        passed on whole, in order, once it is done, so the streamed text matches
+        the merged reasoning.
+        """
+        if not REASONING_FANOUT or len(applicable) < 2:
+            return await self.llm.analyze_text(
+                scenario,
+                "\n".join([label for (label, _) in applicable]) + f"\n{note}",
+                context=context,
+                on_token=on_token,
+            )
+
+        durations: List[float] = [0.0] * len(applicable)
+
+        async def one(i: int, label: str, law_info: Dict[str, Any]) -> str:
+            law_text = truncate_to_tokens(law_info.get("text_en") or "", REASONING_LAW_TOKENS)
+            start = time.perf_counter()
+            try:
+                if i == 0 and on_token is not None:
+                    on_token(f"{label}:\n")
+                    return await self.llm.analyze_text(
+                        scenario, f"{label}\n{law_text}\n{note}", context=context, on_token=on_token
+                    )
+                return await self.llm.analyze_text(scenario, f"{label}\n{law_text}\n{note}", context=context)
+            finally:
+                durations[i] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parts = await asyncio.gather(*(one(i, label, law) for i, (label, law) in enumerate(applicable)))
+        wall = time.perf_counter() - start
+        # Per-call times overlap and include waiting for a free backend, so they
+        # are reported as is rather than summed into a serial estimate.
+        print(
+            f"[VERDICT] reasoning for {len(applicable)} sections in {wall:.2f}s wall "
+            f"(per call: {', '.join(f'{d:.2f}s' for d in durations)})"
+        )
+
+        blocks = [f"{label}:\n{text}" for (label, _), text in zip(applicable, parts)]
+        if on_token is not None:
+            for block in blocks[1:]:
+                on_token("\n\n" + block)
+        return "\n\n".join(blocks)
+
     async def generate_verdict_pdf(
         self,
         verdict_text: str,
@@ -220,351 +210,38 @@ class VerdictBuilder:
         output_dir: str = "./history",
         lang_code: str = "en",
         plaintiff_name: str = "Unknown",
-        defendant_name: str = "Unknown"
+        defendant_name: str = "Unknown",
+        sections: Optional[List[str]] = None,
+        source_case_id: Optional[str] = None,
     ) -> str:
-        """Generate a professionally styled PDF matching the elegant court design"""
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        """
+        Generate a professionally styled PDF matching the elegant court design (rendered by `pdf_renderer`)
+        and record it in the verdict catalog.
+        """
+        now = datetime.now()
         safe_title = _sanitize_filename(case_title)
-        pdf_filename = f"verdict_{safe_title}_{timestamp}.pdf"
-        pdf_path = os.path.join(output_dir, pdf_filename)
-
-        doc = SimpleDocTemplate(
-            pdf_path,
-            pagesize=letter,
-            topMargin=0.5 * inch,
-            bottomMargin=1 * inch,
-            leftMargin=0.5 * inch,
-            rightMargin=0.5 * inch
-        )
-
-        styles = self._create_elegant_styles(lang_code)
-        elements = []
-
-        elements.extend(self._create_elegant_court_header(case_id, styles))
-        elements.append(Spacer(1, 0.5 * inch))
-
-        elements.extend(self._create_elegant_case_header(verdict_text, case_id, styles, plaintiff_name, defendant_name))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        sections = self._parse_verdict_sections(verdict_text)
-        for section_title, content in sections.items():
-            if content.strip():
-                section_elements = self._create_elegant_section(section_title, content, styles)
-                # Do NOT force KeepTogether for long sections (allows automatic page breaks)
-                elements.append(KeepTogether(section_elements)) 
-                #elements.extend(section_elements)
-
-        def add_elegant_footer(canvas, doc):
-            canvas.saveState()
-            canvas.setStrokeColor(self.colors['court_gold'])
-            canvas.setLineWidth(3)
-            canvas.line(0.75 * inch, 0.75 * inch, doc.pagesize[0] - 0.75 * inch, 0.75 * inch)
-            canvas.setFillColor(self.colors['document_muted'])
-            canvas.setFont("Helvetica", 9)
-            date_str = datetime.now().strftime('%B %d, %Y at %I:%M %p')
-            canvas.drawString(0.75 * inch, 0.5 * inch, f"{date_str}")
-            canvas.drawRightString(doc.pagesize[0] - 0.75 * inch, 0.5 * inch, f"Page {canvas.getPageNumber()}")
-            canvas.setFont("DejaVuSans", 8)
-            canvas.drawCentredString(doc.pagesize[0] / 2, 0.3 * inch, "⚖️ OFFICIAL COURT DOCUMENT ⚖️")
-            canvas.restoreState()
-
+        pdf_filename = f"verdict_{safe_title}_{now.strftime('%Y%m%d_%H%M%S')}.pdf"
+        pdf_path = await self.pdf_renderer.render({
+            "verdict_text": verdict_text,
+            "case_id": case_id,
+            "pdf_path": os.path.join(output_dir, pdf_filename),
+            "lang_code": lang_code,
+            "plaintiff_name": plaintiff_name,
+            "defendant_name": defendant_name,
+            "generated_at": now.isoformat(),
+        })
         try:
-            doc.build(elements, onFirstPage=add_elegant_footer, onLaterPages=add_elegant_footer)
+            self.catalog.record(
+                pdf_path, case_title, now.replace(microsecond=0).isoformat(), case_id=source_case_id,
+                plaintiff_name=plaintiff_name, defendant_name=defendant_name, lang=lang_code, sections=sections,
+            )
         except Exception as e:
-            print(f"Error generating elegant PDF: {e}")
-            raise
+            # The PDF is issued either way; `verdict_catalog import` can pick it up later.
+            print(f"[CATALOG] failed to record {pdf_path}: {e}")
         return pdf_path
 
-    def _create_elegant_styles(self, lang_code: str):
-        """Create elegant styles matching the sophisticated court design"""
-        styles = getSampleStyleSheet()
-        
-        font_map = {
-            "en": "Arial",
-            "my": "Arial",
-            "zh": "Arial",
-            "ja": "Arial"
-        }
-        body_font = font_map.get(lang_code, "Helvetica")
-
-        styles.add(ParagraphStyle(
-            name='ElegantCourtTitle',
-            fontName='Helvetica-Bold',
-            fontSize=22,
-            textColor=self.colors['court_navy'],
-            spaceAfter=15,
-            alignment=TA_CENTER,
-            leading=32,
-            spaceBefore=30
-        ))
-
-        styles.add(ParagraphStyle(
-            name='ElegantCourtSubtitle',
-            fontName='Helvetica',
-            fontSize=12,
-            textColor=self.colors['court_navy_light'],
-            spaceBefore=10,
-            spaceAfter=10,
-            alignment=TA_CENTER,
-            leading=20,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='ElegantJudgeName',
-            fontName='Helvetica-Bold',
-            fontSize=14,
-            textColor=self.colors['court_navy'],
-            spaceAfter=2,
-            alignment=TA_CENTER,
-            leading=18
-        ))
-
-        styles.add(ParagraphStyle(
-            name='ElegantSectionTitle',
-            fontName='NotoEmoji',
-            fontSize=12,
-            textColor=self.colors['court_navy'],
-            spaceAfter=0,
-            alignment=TA_LEFT,
-            leading=20,
-            spaceBefore=0
-        ))
-
-        styles.add(ParagraphStyle(
-            name='ElegantBodyText',
-            fontName=body_font,
-            fontSize=10.5,
-            textColor=self.colors['document_text'],
-            spaceAfter=12,
-            leading=18,
-            alignment=TA_JUSTIFY,
-            leftIndent=20,
-            bulletIndent=10,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='ElegantCaseInfo',
-            fontName='Helvetica',
-            fontSize=11,
-            textColor=self.colors['document_text'],
-            spaceAfter=4,
-            leading=14,
-            alignment=TA_LEFT
-        ))
-
-        styles.add(ParagraphStyle(
-            name="ElegantCourtSeal",
-            fontName="NotoEmoji",
-            fontSize=30,
-            textColor=self.colors['court_gold'],
-            alignment=TA_CENTER,
-            spaceAfter=30,
-        ))
-
-        styles.add(ParagraphStyle(
-            name="ElegantCourtJudge",
-            fontName="Helvetica",
-            fontSize=11,
-            textColor=self.colors['court_navy'],
-            alignment=TA_CENTER,
-            spaceAfter=15,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='CaseHeaderPrimary',
-            fontName='Helvetica-Bold',
-            fontSize=13,
-            leading=16,
-            textColor=self.colors['document_text'],
-            alignment=TA_LEFT,
-            spaceAfter=15,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='CaseHeaderSecondary',
-            fontName='Helvetica-Bold',
-            fontSize=12,
-            leading=16,
-            textColor=self.colors['document_text'],
-            alignment=TA_LEFT,
-            spaceAfter=15,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='CaseHeaderTertiary',
-            fontName='Helvetica',
-            fontSize=11,
-            leading=16,
-            textColor=self.colors['document_text'],
-            alignment=TA_LEFT,
-            spaceAfter=15,
-        ))
-
-        styles.add(ParagraphStyle(
-            name='CaseHeaderSmall',
-            fontName='ArialItalic',
-            fontSize=10,
-            leading=16,
-            textColor=self.colors['document_muted'],
-            alignment=TA_LEFT,
-            spaceAfter=15,
-        ))
-
-        return styles
-
-    def _create_elegant_court_header(self, case_id: str, styles):
-        """Create elegant court header with emoji + text support"""
-        elements = []
-        
-        row_heights = [0.8 * inch, 0.8 * inch, 0.4 * inch, 0.4 * inch, 0.4 * inch]
-        
-        header_data = [
-            [Paragraph('<font name="NotoEmoji">⚖️</font>', styles['ElegantCourtSeal'])],
-            [Paragraph('<font name="Helvetica-Bold">MAHAWTHADER AI JUSTICE</font>', styles['ElegantCourtTitle'])],
-            [Paragraph("", styles['ElegantCourtSubtitle'])],
-            [Paragraph('<font name="Helvetica">SUPREME COURT OF JUSTICE</font>', styles['ElegantCourtJudge'])],
-            [Paragraph('<font name="Helvetica">PRESIDING</font>', styles['ElegantCourtJudge'])],
-        ]
-        
-        table = Table(header_data, rowHeights=row_heights)
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 0), (-1, -1), self.colors['document_bg']),
-            ('LINEBELOW', (0, 1), (-1, 1), 2, self.colors['document_muted']),
-            ('LINEBELOW', (0, 4), (-1, 4), 2, self.colors['court_gold']),
-            ('TOPPADDING', (0, 0), (0, 0), 30),
-            ('BOTTOMPADDING', (0, 0), (0, 0), 30),
-            ('TOPPADDING', (0, 1), (0, 1), 30),
-            ('BOTTOMPADDING', (0, 1), (0, 1), 30),
-            ('TOPPADDING', (0, 3), (0, 3), 10),
-            ('BOTTOMPADDING', (0, 3), (0, 3), 15),
-            ('TOPPADDING', (0, 4), (0, 4), 15),
-            ('BOTTOMPADDING', (0, 4), (0, 4), 20),
-        ]))
-        
-        elements.append(table)
-        return elements
-
-    def _create_elegant_case_header(self, verdict_text: str, case_id: str, styles, plaintiff_name: str, defendant_name: str):
-        """Create elegant case information header"""
-        elements = []
-
-        case_info_data = [
-            [Paragraph(plaintiff_name, styles['CaseHeaderPrimary']), 
-             Paragraph(f"Case No. {case_id[-8:]}", styles['CaseHeaderSecondary'])],
-            [Paragraph("Plaintiff", styles['CaseHeaderSmall']), 
-             Paragraph(f"Filed: {datetime.now().strftime('%B %d, %Y')}", styles['CaseHeaderTertiary'])],
-            [Paragraph("", styles['CaseHeaderTertiary']), 
-             Paragraph("", styles['CaseHeaderTertiary'])],
-            [Paragraph("v.", styles['CaseHeaderPrimary']), 
-             Paragraph("", styles['CaseHeaderTertiary'])],
-            [Paragraph("", styles['CaseHeaderTertiary']), 
-             Paragraph("", styles['CaseHeaderTertiary'])],
-            [Paragraph(defendant_name, styles['CaseHeaderPrimary']), 
-             Paragraph(f"Document #{case_id[-4:]}", styles['CaseHeaderTertiary'])],
-            [Paragraph("Defendant", styles['CaseHeaderSmall']), 
-             Paragraph(f"Verdict Date: {datetime.now().strftime('%B %d, %Y')}", styles['CaseHeaderTertiary'])]
-        ]
-
-        table = Table(case_info_data, colWidths=[3.5 * inch, 3.5 * inch], 
-                      rowHeights=[0.4 * inch, 0.4 * inch, 0.25 * inch, 0.25 * inch, 0.25 * inch, 0.4 * inch, 0.4 * inch])
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.white),
-            ('TOPPADDING', (0, 0), (-1, -1), 15),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('RIGHTPADDING', (0, 0), (0, -1), 12),
-            ('RIGHTPADDING', (1, 0), (1, -1), 8),
-            ('BOTTOMPADDING', (1, 0), (1, 0), 15),
-            ('TOPPADDING', (1, 1), (1, 1), 15),
-        ]))
-        
-        elements.append(table)
-        return elements
-
-    def _create_elegant_section(self, title: str, content: str, styles):
-        """
-        Create a flowing section (header + paragraphs) that avoids LayoutError.
-        - title: section title (e.g. "SCENARIO", "COURT'S REASONING")
-        - content: full text for that section (string)
-        Returns a list of flowables (Paragraphs/Spacers).
-        """
-        elements = []
-
-        # icons per section
-        section_icons = {
-            "CASE TITLE": "📋",
-            "SCENARIO": "📝",
-            "APPLICABLE LAW": "⚖️",
-            "COURT'S REASONING": "🏛️",
-            "DECISION": "✅",
-            "TOTAL IMPRISONMENT": "⏰",
-            "SENTENCE": "⏰"
-        }
-        icon = section_icons.get(title.upper(), "📄")
-
-        # header (emoji + bold title)
-        header_text = (
-            f'<font name="NotoEmoji">{icon}</font> '
-            f'<font name="Helvetica-Bold">{title}</font>'
-        )
-        elements.append(Paragraph(header_text, styles['ElegantSectionTitle']))
-        elements.append(Spacer(1, 0.12 * inch))
-
-        # split content into lines then into bullet-like items
-        content_lines = [ln.strip() for ln in content.split("\n") if ln.strip()]
-        all_items = []
-        for line in content_lines:
-            # split on bullets or hyphens, but if none found keep whole line
-            items = [itm.strip() for itm in re.split(r'\s*[-•]\s+', line) if itm.strip()]
-            if not items:
-                items = [line]
-            all_items.extend(items)
-
-        # create paragraphs for each item (allow natural page breaks)
-        for item in all_items:
-            if title.upper() == "APPLICABLE LAW":
-                # show a bullet symbol — keep it simple and flowing
-                text = f'• {item}'
-                elements.append(Paragraph(text, styles['ElegantBodyText']))
-            else:
-                elements.append(Paragraph(item, styles['ElegantBodyText']))
-            elements.append(Spacer(1, 0.08 * inch))
-
-        # small gap after section
-        elements.append(Spacer(1, 0.20 * inch))
-        return elements
-
-
-    def _parse_verdict_sections(self, verdict_text: str) -> Dict[str, str]:
-        """Parse verdict text into structured sections"""
-        sections = {
-            "CASE TITLE": "",
-            "SCENARIO": "",
-            "APPLICABLE LAW": "",
-            "COURT'S REASONING": "",
-            "DECISION": "",
-            "TOTAL IMPRISONMENT": "",
-            "SENTENCE": ""
-        }
-        
-        current_section = None
-        for line in verdict_text.split("\n"):
-            line = line.strip()
-            if line.endswith(":") and line[:-1] in sections:
-                current_section = line[:-1]
-            elif current_section and line:
-                sections[current_section] += line + " "
-        
-        return sections
-
-    def _classify_domain(self, text: str) -> str:
-        scores = {d: count_matches(text, pats) for d, pats in self.domain_kw.items()}
+    def _classify_domain(self, hits: List[Dict[str, Any]]) -> str:
+        scores = {d: len(self.term_scanner.labels(hits, d)) for d in DOMAINS}
         return max(scores.items(), key=lambda kv: kv[1])[0] if any(scores.values()) else "penal"
 
     def _discover_applicable(self, domain: str, scenario: str) -> List[Tuple[str, Dict[str, Any]]]:
@@ -575,22 +252,19 @@ class VerdictBuilder:
             matched.append((self._law_label(meta, meta["section"]), meta))
         return matched
 
-    def _score_evidence(self, text: str) -> int:
-        return sum(count_matches(text, [p]) for p in self.evidence_patterns)
+    def _score_evidence(self, hits: List[Dict[str, Any]]) -> int:
+        return len(self.term_scanner.labels(hits, "evidence"))
 
     def _choose_sentence(self, law_info: Dict[str, Any], scenario: str, evidence_score: int) -> str:
-        statute = (law_info.get("text_en") or "").lower()
-        allows_life = "life imprisonment" in statute
-        allows_death = "death" in statute
-
-        years_match = [int(x) for x in re.findall(r"(\d+)\s*year", statute)]
-        min_year = min(years_match) if years_match else 1
-        max_year = max(years_match) if years_match else 10
+        text_en = law_info.get("text_en") or ""
+        penalty = self.penalties.get(penalty_key(law_info.get("section"), text_en)) or parse_penalty(text_en)
+        min_year = penalty["min_years"] if penalty["min_years"] is not None else DEFAULT_MIN_YEARS
+        max_year = penalty["max_years"] if penalty["max_years"] is not None else DEFAULT_MAX_YEARS
 
         severity = evidence_score
-        if allows_death and severity >= 5:
+        if penalty["death"] and severity >= 5:
             return "life imprisonment."
-        if allows_life:
+        if penalty["life"]:
             return "life imprisonment."
         term = min_year + (max_year - min_year) * min(severity, 5) // 5
         return f"{term} years' imprisonment."
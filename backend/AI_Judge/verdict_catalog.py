@@ -0,0 +1,295 @@
+"""
+Indexed catalog of issued verdict PDFs.
+
+VerdictBuilder records every PDF it renders; /get_case_history pages through
+the catalog instead of listing the history directory. Verdicts rendered before
+the catalog existed are imported from their filenames (once per database,
+automatically when the catalog is first built, or explicitly):
+
+    python -m backend.AI_Judge.verdict_catalog import --history ./history
+    python -m backend.AI_Judge.verdict_catalog prune
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .case_store import DB_PATH
+from .metrics import DB_QUERY_SECONDS
+
+HISTORY_DIR = "./history"
+
+# The table is `verdict_catalog`: `verdicts` in the same database belongs to CaseStore.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdict_catalog (
+    verdict_id TEXT PRIMARY KEY,
+    case_id TEXT,
+    case_title TEXT NOT NULL,
+    plaintiff_name TEXT NOT NULL DEFAULT '',
+    defendant_name TEXT NOT NULL DEFAULT '',
+    verdict_date TEXT NOT NULL,
+    lang TEXT,
+    sections TEXT NOT NULL DEFAULT '[]',
+    pdf_path TEXT NOT NULL,
+    size_bytes INTEGER,
+    imported INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS verdict_catalog_by_date ON verdict_catalog (verdict_date);
+CREATE INDEX IF NOT EXISTS verdict_catalog_by_case ON verdict_catalog (case_id);
+CREATE INDEX IF NOT EXISTS verdict_catalog_by_title ON verdict_catalog (case_title, verdict_date);
+CREATE INDEX IF NOT EXISTS verdict_catalog_by_lang ON verdict_catalog (lang, verdict_date);
+CREATE TABLE IF NOT EXISTS verdict_catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+INSERT_COLUMNS = (
+    "verdict_id, case_id, case_title, plaintiff_name, defendant_name, verdict_date, "
+    "lang, sections, pdf_path, size_bytes, imported"
+)
+HISTORY_IMPORTED_KEY = "history_imported"
+
+# Sort keys accepted by query(); each is served by an index above.
+SORT_COLUMNS = {"verdict_date": "verdict_date", "case_title": "case_title", "size": "size_bytes"}
+MAX_PAGE_SIZE = 500
+
+_FILENAME_RE = re.compile(r"verdict_(.+)_(\d{8}_\d{6})\.pdf$")
+
+
+def parse_verdict_filename(filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Title and date from a rendered PDF name such as
+    verdict_The_State_vs_The_Phoenix_Five_20250910_095446.pdf, or None.
+    """
+    match = _FILENAME_RE.match(filename)
+    if not match:
+        return None
+    return {
+        "verdict_id": filename[: -len(".pdf")],
+        "case_title": match.group(1).replace("_", " "),
+        "verdict_date": datetime.strptime(match.group(2), "%Y%m%d_%H%M%S").isoformat(),
+    }
+
+
+class VerdictCatalog:
+    """
+    One row per verdict PDF, keyed by the PDF's file stem (the id the history
+    page and /download_verdict_pdf have always used). Dates are stored as the
+    naive local ISO timestamp the PDF name carries, so they sort as text.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        with self._db("write") as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self, op: str = "read") -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        start = time.perf_counter()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, db="verdict_catalog", op=op)
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["sections"] = json.loads(record["sections"] or "[]")
+        record["imported"] = bool(record["imported"])
+        return record
+
+    # ---------- writes
+    @staticmethod
+    def _values(
+        pdf_path: str,
+        case_title: str,
+        verdict_date: str,
+        case_id: Optional[str] = None,
+        plaintiff_name: str = "",
+        defendant_name: str = "",
+        lang: Optional[str] = None,
+        sections: Optional[List[str]] = None,
+        imported: bool = False,
+    ) -> Tuple[Any, ...]:
+        verdict_id = os.path.splitext(os.path.basename(pdf_path))[0]
+        size = os.path.getsize(pdf_path) if os.path.exists(pdf_path) else None
+        return (
+            verdict_id, case_id, case_title, plaintiff_name or "", defendant_name or "", verdict_date,
+            lang, json.dumps(sections or [], ensure_ascii=False), pdf_path, size, int(imported),
+        )
+
+    def record(
+        self,
+        pdf_path: str,
+        case_title: str,
+        verdict_date: str,
+        case_id: Optional[str] = None,
+        plaintiff_name: str = "",
+        defendant_name: str = "",
+        lang: Optional[str] = None,
+        sections: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Add (or replace) the entry for a rendered PDF; returns the stored record."""
+        values = self._values(pdf_path, case_title, verdict_date, case_id, plaintiff_name, defendant_name, lang, sections)
+        with self._db("write") as conn:
+            conn.execute(f"INSERT OR REPLACE INTO verdict_catalog ({INSERT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+        return self.get(values[0])
+
+    @classmethod
+    def _history_rows(cls, history_dir: str) -> List[Tuple[Any, ...]]:
+        if not os.path.isdir(history_dir):
+            return []
+        rows = []
+        for filename in sorted(os.listdir(history_dir)):
+            parsed = parse_verdict_filename(filename) if filename.startswith("verdict_") else None
+            if parsed:
+                rows.append(cls._values(
+                    os.path.join(history_dir, filename), parsed["case_title"], parsed["verdict_date"], imported=True
+                ))
+        return rows
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> int:
+        # OR IGNORE: never overwrite the richer entry VerdictBuilder recorded for the same PDF.
+        before = conn.total_changes
+        conn.executemany(f"INSERT OR IGNORE INTO verdict_catalog ({INSERT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return conn.total_changes - before
+
+    def import_history(self, history_dir: str = HISTORY_DIR) -> int:
+        """Catalog PDFs already in `history_dir` (title and date from the filename); returns how many were new."""
+        rows = self._history_rows(history_dir)
+        with self._db("write") as conn:
+            added = self._insert_history(conn, rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO verdict_catalog_meta (key, value) VALUES (?, ?)",
+                (HISTORY_IMPORTED_KEY, datetime.now().isoformat()),
+            )
+        print(f"[CATALOG] imported {added} verdict(s) from {history_dir}")
+        return added
+
+    def ensure_imported(self, history_dir: str = HISTORY_DIR) -> None:
+        """
+        Import the history directory unless this database has already done so.
+        The marker is checked and set in the same write transaction, so only one
+        worker imports even when several start together.
+        """
+        with self._db() as conn:
+            if conn.execute("SELECT 1 FROM verdict_catalog_meta WHERE key = ?", (HISTORY_IMPORTED_KEY,)).fetchone():
+                return
+        rows = self._history_rows(history_dir)
+        with self._db("write") as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM verdict_catalog_meta WHERE key = ?", (HISTORY_IMPORTED_KEY,)).fetchone():
+                return
+            added = self._insert_history(conn, rows)
+            conn.execute(
+                "INSERT INTO verdict_catalog_meta (key, value) VALUES (?, ?)",
+                (HISTORY_IMPORTED_KEY, datetime.now().isoformat()),
+            )
+        print(f"[CATALOG] imported {added} verdict(s) from {history_dir}")
+
+    def prune(self) -> int:
+        """Drop entries whose PDF no longer exists; returns how many were removed."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT verdict_id, pdf_path FROM verdict_catalog").fetchall()
+        missing = [(r["verdict_id"],) for r in rows if not os.path.exists(r["pdf_path"])]
+        if missing:
+            with self._db("write") as conn:
+                conn.executemany("DELETE FROM verdict_catalog WHERE verdict_id = ?", missing)
+        return len(missing)
+
+    # ---------- reads
+    def count(self) -> int:
+        with self._db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM verdict_catalog").fetchone()[0]
+
+    def get(self, verdict_id: str) -> Optional[Dict[str, Any]]:
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM verdict_catalog WHERE verdict_id = ?", (verdict_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def latest_for_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """Newest verdict issued for a courtroom case id."""
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT * FROM verdict_catalog WHERE case_id = ? ORDER BY verdict_date DESC LIMIT 1", (case_id,)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def query(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        search: Optional[str] = None,
+        lang: Optional[str] = None,
+        case_id: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        sort: str = "verdict_date",
+        order: str = "desc",
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of verdicts and the total matching the filters. `search` matches
+        the title or either party; dates are ISO prefixes ("2025-09", "2025-09-10").
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {sorted(SORT_COLUMNS)}")
+        if order.lower() not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        where: List[str] = []
+        params: List[Any] = []
+        if search:
+            where.append("(case_title LIKE ? OR plaintiff_name LIKE ? OR defendant_name LIKE ?)")
+            params += [f"%{search}%"] * 3
+        if lang:
+            where.append("lang = ?")
+            params.append(lang)
+        if case_id:
+            where.append("case_id = ?")
+            params.append(case_id)
+        if date_from:
+            where.append("verdict_date >= ?")
+            params.append(date_from)
+        if date_to:
+            # Inclusive prefix: "2025-09-10" covers the whole day.
+            where.append("verdict_date < ?")
+            params.append(date_to + "\uffff")
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        with self._db() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM verdict_catalog {clause}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM verdict_catalog {clause} ORDER BY {SORT_COLUMNS[sort]} {order.upper()}, verdict_id "
+                "LIMIT ? OFFSET ?",
+                (*params, limit, max(0, int(offset))),
+            ).fetchall()
+        return [self._row(r) for r in rows], total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the verdict catalog.")
+    parser.add_argument("command", choices=["import", "prune", "stats"])
+    parser.add_argument("--history", default=HISTORY_DIR, help="directory holding verdict_*.pdf (the serving CWD's ./history)")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    catalog = VerdictCatalog(args.db)
+    if args.command == "import":
+        catalog.import_history(args.history)
+    elif args.command == "prune":
+        print(f"[CATALOG] removed {catalog.prune()} entr(ies) with missing PDFs")
+    print(f"[CATALOG] {catalog.count()} verdict(s) in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+VERDICT_WORKERS = int(os.environ.get("AI_JUDGE_VERDICT_WORKERS", 2))
+# A running job's claim expires unless its process renews it; then another worker may resume it.
+VERDICT_LEASE_SECONDS = float(os.environ.get("AI_JUDGE_VERDICT_LEASE_SECONDS", 120))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdict_jobs (
+    case_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    error TEXT,
+    timings TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    queued_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL
+);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@contextmanager
+def record_stage(timings: Optional[Dict[str, float]], stage: str) -> Iterator[None]:
+    """Add the wall time of the block to timings[stage] (seconds); no-op without a dict."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + time.perf_counter() - start, 3)
+
+
+class VerdictJobs:
+    """
+    In-process queue that renders verdicts in the background.
+
+    `runner(case_id, timings)` does the actual work and fills `timings` with
+    per-stage seconds. At most `workers` verdicts run at once; one job exists
+    per case. With a `db_path`, job state lives in SQLite, shared by every
+    server process: a worker runs a job only after claiming it atomically
+    (queued -> running, with this process as owner and a renewed lease). A
+    worker that cannot renew its lease stops the run, since another process
+    may already be running the job. start() picks up queued jobs and running
+    ones whose lease has expired, and keeps doing so every lease period, so a
+    crashed peer's jobs are resumed without waiting for a restart.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[str, Dict[str, float]], Awaitable[Any]],
+        workers: int = VERDICT_WORKERS,
+        db_path: Optional[str] = None,
+        lease_seconds: float = VERDICT_LEASE_SECONDS,
+    ):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Jobs this process queued or is running; finished ones stay on disk only.
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        if self.db_path:
+            conn = self._db()
+            try:
+                conn.executescript(SCHEMA)
+                columns = {row["name"] for row in conn.execute("PRAGMA table_info(verdict_jobs)")}
+                for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE verdict_jobs ADD COLUMN {column} {kind}")
+                conn.commit()
+            finally:
+                conn.close()
+
+    # ---------- persistence
+    def _db(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["timings"] = json.loads(job["timings"] or "{}")
+        return job
+
+    def _load(self, case_id: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            return None
+        conn = self._db()
+        try:
+            row = conn.execute("SELECT * FROM verdict_jobs WHERE case_id = ?", (case_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row else None
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        """Write back a job this process has claimed; a no-op once another process owns the row."""
+        if not self.db_path:
+            return
+        running = job["status"] == RUNNING
+        conn = self._db()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE verdict_jobs SET status = ?, error = ?, timings = ?, attempts = ?, queued_at = ?, "
+                    "started_at = ?, finished_at = ?, owner = ?, lease_until = ? WHERE case_id = ? AND owner = ?",
+                    (
+                        job["status"], job["error"], json.dumps(job["timings"]), job["attempts"],
+                        job["queued_at"], job["started_at"], job["finished_at"],
+                        self.owner if running else None, job.get("lease_until") if running else None,
+                        job["case_id"], self.owner,
+                    ),
+                )
+        finally:
+            conn.close()
+
+    def _enqueue(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Insert `job` as queued unless another process already has a live job for
+        the case; returns that existing job instead, or None when ours was stored.
+        """
+        if not self.db_path:
+            return None
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM verdict_jobs WHERE case_id = ?", (job["case_id"],)).fetchone()
+            if row is not None and row["status"] != FAILED:
+                conn.execute("COMMIT")
+                return self._row_to_job(row)
+            conn.execute(
+                "INSERT OR REPLACE INTO verdict_jobs "
+                "(case_id, status, error, timings, attempts, queued_at, started_at, finished_at, owner, lease_until) "
+                "VALUES (?, ?, NULL, '{}', ?, ?, NULL, NULL, NULL, NULL)",
+                (job["case_id"], QUEUED, job["attempts"], job["queued_at"]),
+            )
+            conn.execute("COMMIT")
+            return None
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _claim(self, job: Dict[str, Any]) -> bool:
+        """Atomically take a queued job for this process; False if another worker got it first."""
+        job.update(status=RUNNING, started_at=time.time(), attempts=job["attempts"] + 1)
+        job["lease_until"] = job["started_at"] + self.lease_seconds
+        if not self.db_path:
+            return True
+        conn = self._db()
+        try:
+            with conn:
+                claimed = conn.execute(
+                    "UPDATE verdict_jobs SET status = ?, owner = ?, lease_until = ?, started_at = ?, "
+                    "attempts = attempts + 1 WHERE case_id = ? AND status = ?",
+                    (RUNNING, self.owner, job["lease_until"], job["started_at"], job["case_id"], QUEUED),
+                ).rowcount
+        finally:
+            conn.close()
+        return claimed == 1
+
+    def _renew(self, case_id: str) -> bool:
+        if not self.db_path:
+            return True
+        conn = self._db()
+        try:
+            with conn:
+                return conn.execute(
+                    "UPDATE verdict_jobs SET lease_until = ? WHERE case_id = ? AND owner = ? AND status = ?",
+                    (time.time() + self.lease_seconds, case_id, self.owner, RUNNING),
+                ).rowcount == 1
+        finally:
+            conn.close()
+
+    async def _keep_lease(self, case_id: str, run: asyncio.Task) -> None:
+        """Renew the lease while `run` works; cancel it if the lease is lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self._renew(case_id):
+                print(f"[VERDICT JOBS] lost the lease on {case_id}; stopping this run")
+                run.cancel()
+                return
+
+    def _resumable(self) -> List[Dict[str, Any]]:
+        """Queued jobs, and running ones whose owner stopped renewing the lease (crashed or stopped)."""
+        if not self.db_path:
+            return [job for job in self.jobs.values() if job["status"] in (QUEUED, RUNNING)]
+        conn = self._db()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE verdict_jobs SET status = ?, owner = NULL, lease_until = NULL "
+                    "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                    (QUEUED, RUNNING, time.time()),
+                )
+            rows = conn.execute("SELECT * FROM verdict_jobs WHERE status = ?", (QUEUED,)).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_job(row) for row in rows]
+
+    # ---------- lifecycle
+    def start(self) -> None:
+        """Start the workers on the running loop and re-queue unfinished jobs."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._requeue()
+        if self.db_path:
+            self._tasks.append(asyncio.create_task(self._reclaim()))
+
+    def _requeue(self) -> None:
+        # Other live processes may queue the same rows; whoever claims first runs them.
+        resumed = [
+            job for job in self._resumable()
+            if job["case_id"] not in self.jobs or self.jobs[job["case_id"]]["status"] in (DONE, FAILED)
+        ]
+        for job in sorted(resumed, key=lambda j: j["queued_at"] or 0):
+            job["status"] = QUEUED
+            self.jobs[job["case_id"]] = job
+            self._queue.put_nowait(job["case_id"])
+        if resumed:
+            print(f"[VERDICT JOBS] re-queued {len(resumed)} unfinished job(s)")
+
+    async def _reclaim(self) -> None:
+        """Periodically pick up jobs whose owner stopped renewing its lease."""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                self._requeue()
+            except Exception as e:
+                print(f"[VERDICT JOBS] reclaim failed: {e}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queue = [], None
+
+    # ---------- API
+    def submit(self, case_id: str) -> Dict[str, Any]:
+        """Queue a verdict for `case_id`; an existing queued/running/done job is returned as is."""
+        self.start()
+        job = self.jobs.get(case_id) or self._load(case_id)
+        if job is not None and job["status"] != FAILED:
+            return job
+        job = {
+            "case_id": case_id,
+            "status": QUEUED,
+            "error": None,
+            "timings": {},
+            "attempts": job["attempts"] if job else 0,
+            "queued_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        existing = self._enqueue(job)
+        if existing is not None:  # another process queued it meanwhile
+            return existing
+        self.jobs[case_id] = job
+        self._queue.put_nowait(case_id)
+        return job
+
+    def forget(self, case_id: str) -> None:
+        """Drop a finished job from memory; its persisted record remains readable."""
+        job = self.jobs.get(case_id)
+        if job is not None and job["status"] in (DONE, FAILED) and self.db_path:
+            del self.jobs[case_id]
+
+    def status(self, case_id: str) -> Optional[Dict[str, Any]]:
+        # The database is authoritative: the job may be running in another process.
+        job = self._load(case_id) or self.jobs.get(case_id)
+        if job is None:
+            return None
+        status = dict(job)
+        status.pop("owner", None)
+        status.pop("lease_until", None)
+        if job["status"] == QUEUED:
+            status["waited_s"] = round(time.time() - job["queued_at"], 3)
+        elif job["status"] == RUNNING and job["started_at"]:
+            status["running_s"] = round(time.time() - job["started_at"], 3)
+        return status
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            case_id = await self._queue.get()
+            job = self.jobs.get(case_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            if not self._claim(job):
+                # A sibling process claimed it first; it reports the outcome.
+                self.jobs.pop(case_id, None)
+                continue
+            job["timings"]["queue_wait"] = round(job["started_at"] - job["queued_at"], 3)
+            self._persist(job)
+            run = asyncio.create_task(self.runner(case_id, job["timings"]))
+            lease = asyncio.create_task(self._keep_lease(case_id, run))
+            try:
+                await run
+                job["status"] = DONE
+            except asyncio.CancelledError:
+                if lease.done() and not lease.cancelled():
+                    # Lease lost: the job now belongs to whichever process reclaimed it.
+                    self.jobs.pop(case_id, None)
+                    continue
+                job["status"] = QUEUED  # picked up again on the next start()
+                self._persist(job)
+                raise
+            except Exception as e:
+                job.update(status=FAILED, error=str(e))
+                print(f"[VERDICT JOBS] {case_id} failed: {e}")
+            finally:
+                lease.cancel()
+            job["finished_at"] = time.time()
+            job["timings"]["total"] = round(job["finished_at"] - job["started_at"], 3)
+            self._persist(job)
+            print(f"[VERDICT JOBS] {case_id} {job['status']} in {job['timings']['total']}s {job['timings']}")
@@ -0,0 +1,61 @@
+"""
+Named leases shared by the uvicorn workers through the case database.
+
+A chore that only one worker should run (e.g. the Ollama keep-warm pinger)
+holds a lease under its name and renews it on every round. If the holder
+stops renewing, another worker takes the lease once it expires.
+"""
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from .case_store import DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS worker_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    lease_until REAL NOT NULL
+);
+"""
+
+
+class WorkerLease:
+    def __init__(self, name: str, ttl: float, db_path: str = DB_PATH):
+        self.name = name
+        self.ttl = ttl
+        self.db_path = db_path
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; True while this process holds it."""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO worker_leases (name, owner, lease_until) VALUES (?, ?, ?)",
+                    (self.name, self.owner, now + self.ttl),
+                )
+                return conn.execute(
+                    "UPDATE worker_leases SET owner = ?, lease_until = ? "
+                    "WHERE name = ? AND (owner = ? OR lease_until < ?)",
+                    (self.owner, now + self.ttl, self.name, self.owner, now),
+                ).rowcount == 1
+        finally:
+            conn.close()
+
+    def release(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("DELETE FROM worker_leases WHERE name = ? AND owner = ?", (self.name, self.owner))
+        finally:
+            conn.close()
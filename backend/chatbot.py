@@ -1,11 +1,11 @@
 import json
 import os
 import re
+import time
 import numpy as np
 import bcrypt
 import faiss
 import psycopg2
-import ollama
 from datetime import datetime
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException
@@ -14,17 +14,34 @@ from fastapi.middleware.cors import CORSMiddleware
 from sentence_transformers import SentenceTransformer
 from sklearn.preprocessing import minmax_scale
 from lingua import LanguageDetectorBuilder, Language
-from google import genai
-from google.genai import types,Client
+from google.genai import types
 
 # Import AI_Judge FastAPI app and merge its routes
 try:
     # When running as a package from project root
     from .AI_Judge.main import app as ai_judge_app
     from .AI_Judge.case_flow import LegalKnowledgeBase
+    from .AI_Judge.lifecycle import lifecycle
+    from .AI_Judge.llm_handler import LLMHandler
+    from .AI_Judge.llm_backends import GeminiBackend
+    from .AI_Judge.metrics import (
+        DB_QUERY_SECONDS,
+        RETRIEVAL_ENCODE_SECONDS,
+        RETRIEVAL_KEYWORD_SEARCH_SECONDS,
+        RETRIEVAL_VECTOR_SEARCH_SECONDS,
+    )
 except ImportError:  # Running from inside backend directory
     from AI_Judge.main import app as ai_judge_app
     from AI_Judge.case_flow import LegalKnowledgeBase
+    from AI_Judge.lifecycle import lifecycle
+    from AI_Judge.llm_handler import LLMHandler
+    from AI_Judge.llm_backends import GeminiBackend
+    from AI_Judge.metrics import (
+        DB_QUERY_SECONDS,
+        RETRIEVAL_ENCODE_SECONDS,
+        RETRIEVAL_KEYWORD_SEARCH_SECONDS,
+        RETRIEVAL_VECTOR_SEARCH_SECONDS,
+    )
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -84,6 +101,18 @@ DB_HOST = "localhost"
 DB_PORT = "5432"
 
 
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor reporting each statement's time to the db_query_seconds metric."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            op = query.split(None, 1)[0].lower() if isinstance(query, str) and query.strip() else "other"
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, db="chat", op=op)
+
+
 def get_db_connection():
     try:
         return psycopg2.connect(
@@ -92,6 +121,7 @@ def get_db_connection():
             password=DB_PASS,
             host=DB_HOST,
             port=DB_PORT,
+            cursor_factory=TimedCursor,
         )
     except psycopg2.OperationalError as e:
         print(f"DB connect error: {e}")
@@ -99,13 +129,41 @@ def get_db_connection():
 
 
 # --- Retrieval (embedded_kb.json) & Embeddings ---
-model = SentenceTransformer("sentence-transformers/LaBSE")
+# Models and clients are registered lazily so importing the app stays cheap;
+# /warmup (or the startup hook) preloads them in parallel.
+lifecycle.register("labse", lambda: SentenceTransformer("sentence-transformers/LaBSE"))
+# Online answers: one Gemini backend (VERTEX_PROJECT) with the shared request settings.
+lifecycle.register(
+    "online_llm",
+    lambda: GeminiBackend(
+        config={
+            "safety_settings": [
+                types.SafetySetting(category=c, threshold="OFF")
+                for c in [
+                    "HARM_CATEGORY_HATE_SPEECH",
+                    "HARM_CATEGORY_DANGEROUS_CONTENT",
+                    "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                    "HARM_CATEGORY_HARASSMENT",
+                ]
+            ],
+            "thinking_config": types.ThinkingConfig(thinking_budget=-1),
+        }
+    ),
+)
+# Offline answers share the AI Judge's Ollama host pool (OLLAMA_HOSTS).
+lifecycle.register("offline_llm", LLMHandler)
+lifecycle.register(
+    "chat_language_detector",
+    lambda: LanguageDetectorBuilder.from_languages(
+        Language.ENGLISH, Language.JAPANESE, Language.CHINESE
+    )
+    .with_preloaded_language_models()
+    .build(),
+)
 
 EMBEDDED_KB_PATH = os.path.join(os.path.dirname(__file__), "embedded_kb_1 copy.json")
 
-llm_client = Client(vertexai=True, project="tiny-equations-ai-teacher", location="global")
-
-def build_prompt_and_get_response(query, retrieved_chunks, chat_history):
+async def build_prompt_and_get_response(query, retrieved_chunks, chat_history):
     """
     Builds a prompt with context and history, then calls the LLM.
     """
@@ -136,27 +194,15 @@ Follow these instructions carefully:
 
     system_instruction = " You are a multilingual legal assistant. Your primary role is to provide legal information and answer legal questions to the best of your ability. Maintain a friendly, clear, and professional tone in all responses. "
 
-    contents = [types.Content(role="user", parts=[types.Part.from_text(text=user_prompt)])]
-    config = types.GenerateContentConfig(
-        temperature=1,
-        top_p=1,
-        seed=0,
-        max_output_tokens=65000,
-        safety_settings=[
-            types.SafetySetting(category=c, threshold="OFF")
-            for c in ["HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_DANGEROUS_CONTENT", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_HARASSMENT"]
-        ],
-        system_instruction=[types.Part.from_text(text=system_instruction)],
-        thinking_config=types.ThinkingConfig(thinking_budget=-1),
-    )
-
-    response = ""
     try:
-        for chunk in llm_client.models.generate_content_stream(
-            model="gemini-2.5-flash",
-            contents=contents,
-            config=config,
-        ):response += chunk.text
+        response = await lifecycle.get("online_llm").chat(
+            [
+                {"role": "system", "content": system_instruction},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=65000,
+            options={"temperature": 1, "top_p": 1, "seed": 0},
+        )
         print(response)
         return response
     except Exception as e:
@@ -189,18 +235,21 @@ def build_faiss_index(chunks):
     return index, vectors
 
 def vector_search_faiss(query, model_inst, chunks, index, top_k=8):
-    q_emb = model_inst.encode([query])[0].astype("float32")
-    D, I = index.search(np.array([q_emb]), top_k)
+    with RETRIEVAL_ENCODE_SECONDS.time(index="chat_kb"):
+        q_emb = model_inst.encode([query])[0].astype("float32")
+    with RETRIEVAL_VECTOR_SEARCH_SECONDS.time(index="chat_kb", engine="faiss"):
+        D, I = index.search(np.array([q_emb]), top_k)
     return [{"chunk": chunks[i], "score": 1 - D[0][j]} for j, i in enumerate(I[0])]
 
 def keyword_search(query, chunks, top_k=10):
     words = re.findall(r"\b\w+\b", query.lower())
     scored = []
-    for c in chunks:
-        count = sum(c["text"].lower().count(word) for word in words)
-        if count:
-            scored.append((c, count))
-    scored.sort(key=lambda x: x[1], reverse=True)
+    with RETRIEVAL_KEYWORD_SEARCH_SECONDS.time(index="chat_kb"):
+        for c in chunks:
+            count = sum(c["text"].lower().count(word) for word in words)
+            if count:
+                scored.append((c, count))
+        scored.sort(key=lambda x: x[1], reverse=True)
     return [{"chunk": ch[0], "score": ch[1]} for ch in scored[:top_k]]
 
 def merge_results(vec_hits, kw_hits, query=""):
@@ -228,7 +277,7 @@ def merge_results(vec_hits, kw_hits, query=""):
         val["combined_score"] = combined_score
     return sorted(merged.values(), key=lambda x: x["combined_score"], reverse=True)
 
-def chat_online(query: str, retrieved_texts: list[str]) -> str:
+async def chat_online(query: str, retrieved_texts: list[str]) -> str:
     print(f"[CHAT][ONLINE] Retrieved texts: {len(retrieved_texts)}")
     context = "\n".join([f"{i+1}. {t}" for i, t in enumerate(retrieved_texts)])
     user_prompt = f"""
@@ -245,35 +294,18 @@ Instructions:
 6. Provide reasonable, contextual answers.
 """
     system_instruction = "You are a multilingual legal assistant. Use only the legal texts provided."
-    contents = [types.Content(role="user", parts=[types.Part.from_text(text=user_prompt)])]
-    config = types.GenerateContentConfig(
-        temperature=1,
-        top_p=1,
-        seed=0,
-        max_output_tokens=4096,
-        safety_settings=[
-            types.SafetySetting(category=c, threshold="OFF")
-            for c in [
-                "HARM_CATEGORY_HATE_SPEECH",
-                "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "HARM_CATEGORY_HARASSMENT",
-            ]
+    response_text = await lifecycle.get("online_llm").chat(
+        [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": user_prompt},
         ],
-        system_instruction=[types.Part.from_text(text=system_instruction)],
-        thinking_config=types.ThinkingConfig(thinking_budget=-1),
+        max_tokens=4096,
+        options={"temperature": 1, "top_p": 1, "seed": 0},
     )
-    response_text = ""
-    for chunk in genai.Client(vertexai=True, project="uplifted-light-460412-c3", location="global").models.generate_content_stream(
-        model="gemini-2.5-flash",
-        contents=contents,
-        config=config,
-    ):
-        response_text += chunk.text
     print(f"[CHAT][ONLINE] Response length: {len(response_text)}")
     return response_text
 
-def chat_offline(query: str, retrieved_texts: list[str], language: str) -> str:
+async def chat_offline(query: str, retrieved_texts: list[str], language: str) -> str:
     print(f"[CHAT][OFFLINE] Retrieved texts: {len(retrieved_texts)} | language: {language}")
     context = "\n".join([f"{i+1}. {t}" for i, t in enumerate(retrieved_texts)])
     # Map language to native display for stronger instruction
@@ -303,13 +335,9 @@ RESPONSE REQUIREMENTS:
 5) If the Legal Texts do not contain enough information to answer, explicitly say so in {lang_native}.
 """
     try:
-        response = ollama.chat(
-            model="gemma3:4b",
-            messages=[{"role": "user", "content": prompt}],
-            stream=False,
-        )
+        answer = await lifecycle.get("offline_llm").chat([{"role": "user", "content": prompt}])
         print("[CHAT][OFFLINE] Ollama responded OK")
-        return response["message"]["content"]
+        return answer
     except Exception:
         print("[CHAT][OFFLINE] Ollama error; returning fallback message")
         return (
@@ -367,13 +395,7 @@ async def chat(legal_query: LegalQuery):
     if not query:
         raise HTTPException(status_code=400, detail="Query cannot be empty.")
 
-    detector = (
-        LanguageDetectorBuilder.from_languages(
-            Language.ENGLISH, Language.JAPANESE, Language.CHINESE
-        )
-        .with_preloaded_language_models()
-        .build()
-    )
+    detector = lifecycle.get("chat_language_detector")
 
     conn = None
     try:
@@ -407,7 +429,7 @@ async def chat(legal_query: LegalQuery):
         filtered_chunks = [c for c in kb_chunks if c["lang"] == lang]
         filtered_index, _ = build_faiss_index(filtered_chunks)
         print("This is working ")
-        vec_hits = vector_search_faiss(query, model, filtered_chunks, filtered_index)
+        vec_hits = vector_search_faiss(query, lifecycle.get("labse"), filtered_chunks, filtered_index)
         kw_hits = keyword_search(query, filtered_chunks)
         final_hits = merge_results(vec_hits, kw_hits, query)
         print(f"[RAG] vec_hits={len(vec_hits)} kw_hits={len(kw_hits)} merged={len(final_hits)}")
@@ -436,14 +458,14 @@ async def chat(legal_query: LegalQuery):
                     user_msg = message_text
             chat_history_pairs = list(reversed(chat_history_pairs))
             print("This is working")
-            answer = build_prompt_and_get_response(query, retrieved_texts, chat_history=chat_history_pairs)
+            answer = await build_prompt_and_get_response(query, retrieved_texts, chat_history=chat_history_pairs)
             print(type(answer))
         elif mode == "offline":
             retrieved_texts = [hit["chunk"]["text"] for hit in final_hits[:3] if hit.get("chunk", {}).get("text")]
             print("[RAG] Top retrieved texts:",retrieved_texts)
             if not retrieved_texts:
                 return JSONResponse(content={"answer": "Sorry, I don't have information in that language.", "conversation_id": conversation_id}, status_code=200)
-            answer = chat_offline(query, retrieved_texts, language)
+            answer = await chat_offline(query, retrieved_texts, language)
         else:
             raise HTTPException(status_code=400, detail="Invalid mode specified. Use 'online' or 'offline'.")
 
@@ -0,0 +1 @@
+# Marks 'backend.tests' as a Python package
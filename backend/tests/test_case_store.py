@@ -0,0 +1,96 @@
+from backend.AI_Judge.case_store import CaseStore
+
+
+def _new_case(store, case_id="case-1"):
+    store.create(case_id, {
+        "case_title": "Ko Aung v. Daw Hla",
+        "scenario": "A motorcycle was taken.",
+        "plaintiff_name": "Ko Aung",
+        "defendant_name": "Daw Hla",
+        "current_round": 1,
+        "current_speaker": "plaintiff",
+        "status": "in_progress",
+        "detected_lang": "en",
+        "initial_plaintiff_files": {"receipt.txt": "abc"},
+        "initial_defendant_files": {},
+        "plaintiff_round_files": {},
+        "defendant_round_files": {},
+        "round_statements": {},
+        "chat_history": [],
+        "final_verdict": None,
+    }, extracted={"plaintiff": {"receipt.txt": {"sha256": "abc", "text": "Paid 300,000 kyats", "ms": 1.0}}})
+
+
+def test_round_trip_through_a_fresh_store(tmp_path):
+    db = str(tmp_path / "cases.db")
+    store = CaseStore(db)
+    _new_case(store)
+    case = store.get("case-1")
+    assert store.take_turn("case-1", case, "plaintiff", "He took my motorcycle.", "defendant", 1, "in_progress")
+    store.add_statement("case-1", "judge", "Defendant, your turn.")
+    store.add_files("case-1", "plaintiff", "round_1", {"photo.txt": {"sha256": "def", "text": "CCTV still"}})
+    store.save_verdict("case-1", "Guilty.", "/tmp/v.pdf", "2025-09-10T09:54:46")
+
+    loaded = CaseStore(db).get("case-1")
+    assert loaded["current_speaker"] == "defendant"
+    assert loaded["current_round"] == 1
+    assert loaded["chat_history"] == [
+        {"sender": "plaintiff", "text": "He took my motorcycle."},
+        {"sender": "judge", "text": "Defendant, your turn."},
+    ]
+    assert loaded["round_statements"][1]["plaintiff"] == "He took my motorcycle."
+    assert loaded["initial_plaintiff_files"] == {"receipt.txt": "abc"}
+    assert loaded["plaintiff_round_files"] == {"round_1": {"photo.txt": "def"}}
+    assert loaded["final_verdict"] == "Guilty."
+    assert store.get_exhibit_text("abc") == "Paid 300,000 kyats"
+
+
+def test_turn_is_taken_once(tmp_path):
+    db = str(tmp_path / "cases.db")
+    store = CaseStore(db)
+    _new_case(store)
+    case = store.get("case-1")
+    assert store.take_turn("case-1", case, "plaintiff", "first", "defendant", 1, "in_progress")
+    assert not store.take_turn("case-1", case, "plaintiff", "again", "defendant", 1, "in_progress")
+    assert [m["text"] for m in CaseStore(db).get("case-1")["chat_history"]] == ["first"]
+
+
+def test_stale_worker_cannot_take_a_turn_another_worker_took(tmp_path):
+    db = str(tmp_path / "cases.db")
+    worker_a, worker_b = CaseStore(db), CaseStore(db)
+    _new_case(worker_a)
+    # Both workers read the case while it is the plaintiff's turn.
+    seen_a, seen_b = worker_a.get("case-1"), worker_b.get("case-1")
+    assert seen_a["current_speaker"] == seen_b["current_speaker"] == "plaintiff"
+
+    assert worker_a.take_turn("case-1", seen_a, "plaintiff", "from A", "defendant", 1, "in_progress")
+    assert not worker_b.take_turn("case-1", seen_b, "plaintiff", "from B", "defendant", 1, "in_progress")
+    assert seen_b["current_speaker"] == "plaintiff"  # a rejected claim leaves the caller's dict alone
+
+    fresh = worker_b.get("case-1")
+    assert fresh["current_speaker"] == "defendant"
+    assert [m["text"] for m in fresh["chat_history"]] == ["from A"]
+
+
+def test_cached_case_is_reloaded_after_another_worker_writes(tmp_path):
+    db = str(tmp_path / "cases.db")
+    worker_a, worker_b = CaseStore(db), CaseStore(db)
+    _new_case(worker_a)
+    worker_b.get("case-1")
+    worker_a.add_statement("case-1", "judge", "Order in court.")
+    assert worker_b.get("case-1")["chat_history"][-1]["text"] == "Order in court."
+
+
+def test_save_state_with_expected_status_is_a_compare_and_swap(tmp_path):
+    db = str(tmp_path / "cases.db")
+    store = CaseStore(db)
+    _new_case(store)
+    case = store.get("case-1")
+    case["status"] = "awaiting_verdict"
+    assert store.save_state("case-1", case, expect_status="in_progress")
+
+    case = store.get("case-1")
+    case["status"], case["current_speaker"] = "in_progress", "plaintiff"
+    assert not store.save_state("case-1", case, expect_status="in_progress")
+    assert store.get("case-1")["status"] == "awaiting_verdict"
+    assert CaseStore(db).get("case-1")["status"] == "awaiting_verdict"
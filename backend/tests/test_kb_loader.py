@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from backend.AI_Judge import kb_loader
+from backend.AI_Judge.kb_loader import build_penalty_table, load_penalties, parse_penalty, penalty_key, validate_penalties
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "Shall be punished with imprisonment for a term which may extend to 3 years, or with fine, or with both.",
+        {"min_years": 3, "max_years": 3, "fine": True, "life": False, "death": False},
+    ),
+    (
+        "Imprisonment for not less than 7 years which may extend to 10 years.",
+        {"min_years": 7, "max_years": 10, "fine": False, "life": False, "death": False},
+    ),
+    (
+        "Shall be punished with death, or life imprisonment, and shall also be liable to fine.",
+        {"min_years": None, "max_years": None, "fine": True, "life": True, "death": True},
+    ),
+    (
+        "Whoever sells refined sugar as medicine.",  # "refined" is not a fine
+        {"min_years": None, "max_years": None, "fine": False, "life": False, "death": False},
+    ),
+    ("", {"min_years": None, "max_years": None, "fine": False, "life": False, "death": False}),
+])
+def test_parse_penalty(text, expected):
+    assert parse_penalty(text) == expected
+
+
+def _kb(theft_text="Imprisonment which may extend to 3 years, or fine."):
+    return [
+        {"sections": [
+            {"section": "379", "title_en": "Punishment for theft", "text_en": theft_text},
+            {"section": "302", "title_en": "Punishment for murder", "text_en": "Death or life imprisonment."},
+        ]},
+        # Another law in the KB reuses section numbers.
+        {"sections": [{"section": 379, "title_en": "Telecom offence", "text_en": "Imprisonment up to 1 year."}]},
+    ]
+
+
+def test_penalty_table_keys_repeated_section_numbers_apart():
+    table = build_penalty_table(_kb())
+    assert len(table) == 3
+    theft = table[penalty_key("379", "Imprisonment which may extend to 3 years, or fine.")]
+    telecom = table[penalty_key("379", "Imprisonment up to 1 year.")]
+    assert (theft["title_en"], theft["max_years"], theft["fine"]) == ("Punishment for theft", 3, True)
+    assert (telecom["section"], telecom["max_years"], telecom["fine"]) == ("379", 1, False)
+
+
+@pytest.fixture
+def fresh_caches(monkeypatch):
+    # load_kb and load_penalties memoise per process; each test starts cold.
+    monkeypatch.setattr(kb_loader, "_KB_CACHE", {})
+    monkeypatch.setattr(kb_loader, "_PENALTY_CACHE", {})
+
+
+def test_persisted_table_is_rebuilt_when_the_kb_changes(tmp_path, monkeypatch, fresh_caches):
+    kb_path, cache_path = tmp_path / "kb.json", str(tmp_path / "penalties.json")
+    kb_path.write_text(json.dumps(_kb()), encoding="utf-8")
+
+    table = load_penalties(str(kb_path), cache_path)
+    assert json.loads(open(cache_path, encoding="utf-8").read())["penalties"] == table
+    assert validate_penalties(str(kb_path), cache_path) == []
+
+    kb_path.write_text(json.dumps(_kb("Imprisonment which may extend to 5 years.")), encoding="utf-8")
+    monkeypatch.setattr(kb_loader, "_KB_CACHE", {})
+    monkeypatch.setattr(kb_loader, "_PENALTY_CACHE", {})
+    assert "signature does not match the KB (stale table)" in validate_penalties(str(kb_path), cache_path)
+
+    rebuilt = load_penalties(str(kb_path), cache_path)
+    assert rebuilt[penalty_key("379", "Imprisonment which may extend to 5 years.")]["max_years"] == 5
+    assert validate_penalties(str(kb_path), cache_path) == []
@@ -0,0 +1,36 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.AI_Judge.pdf_renderer import PdfRenderer
+
+
+class _BrokenPool(ThreadPoolExecutor):
+    """Stands in for a process pool whose worker was killed."""
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("a worker died")
+
+
+def _spec(tmp_path):
+    return {
+        "verdict_text": "DECISION:\nThe defendant is guilty.\n",
+        "case_id": "case-00000001",
+        "pdf_path": str(tmp_path / "verdict.pdf"),
+        "lang_code": "en",
+        "plaintiff_name": "Ko Aung",
+        "defendant_name": "Daw Hla",
+        "generated_at": "2025-09-10T09:54:46",
+    }
+
+
+def test_broken_pool_is_replaced_and_the_render_retried(tmp_path):
+    renderer = PdfRenderer(workers=0)
+    broken = renderer._pool = _BrokenPool(max_workers=1)
+
+    path = asyncio.run(renderer.render(_spec(tmp_path)))
+
+    assert os.path.getsize(path) > 0
+    assert renderer._pool is not None and renderer._pool is not broken
+    renderer.shutdown()
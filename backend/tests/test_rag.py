@@ -0,0 +1,33 @@
+import sys
+import types
+
+import pytest
+
+# The encoder is never loaded here; only the score folding is under test.
+sys.modules.setdefault("sentence_transformers", types.SimpleNamespace(SentenceTransformer=object))
+
+from backend.AI_Judge.rag import RunningRelevance, aggregate_hits  # noqa: E402
+
+WINDOWS = [
+    [(0, 0.5), (1, 0.25)],
+    [(1, 0.75), (2, 0.5)],
+    [(0, 0.25), (3, 1.0)],
+    [(2, 0.5)],
+]
+
+
+@pytest.mark.parametrize("aggregate", ["max", "sum"])
+def test_running_relevance_matches_aggregate_over_all_windows(aggregate):
+    tracker = RunningRelevance(aggregate=aggregate)
+    tracker.update(WINDOWS[:1], statements=1)
+    tracker.update(WINDOWS[1:3], exhibits=2)
+    tracker.update(WINDOWS[3:])
+
+    assert tracker.scores == aggregate_hits(WINDOWS, aggregate=aggregate)
+    assert tracker.windows == 4
+    assert (tracker.statements, tracker.exhibits) == (1, 2)
+
+
+def test_unknown_aggregate_is_rejected():
+    with pytest.raises(ValueError):
+        RunningRelevance(aggregate="mean")
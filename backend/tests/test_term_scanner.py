@@ -0,0 +1,77 @@
+import pytest
+
+from backend.AI_Judge.term_scanner import DOMAINS, TermScanner, default_scanner
+
+
+def _verdict_inputs(scenario: str, plaintiff: str, defendant: str):
+    """Domain, evidence score and defense flag as VerdictBuilder.build_verdict derives them."""
+    scanner = default_scanner()
+    all_text = "Case " + scenario + " " + plaintiff + " " + defendant
+    hits = scanner.scan(all_text)
+    scores = {d: len(scanner.labels(hits, d)) for d in DOMAINS}
+    domain = max(scores.items(), key=lambda kv: kv[1])[0] if any(scores.values()) else "penal"
+    evidence = sorted(scanner.labels(hits, "evidence"))
+    defense = sorted(scanner.labels(hits, "defense", start=len(all_text) - len(defendant)))
+    return domain, evidence, defense
+
+
+CASES = {
+    "en": (
+        ("The defendant stabbed the victim outside a tea shop; the death followed that night.",
+         "A witness saw it and the CCTV shows the knife. A fibre from his shirt was recovered.",
+         "I acted in self defense; he attacked me first."),
+        ("penal", ["fiber", "recovered", "surveillance", "witness"], ["self-defence"]),
+    ),
+    "my": (
+        ("တရားခံသည် ဆိုင်ရှေ့တွင် ခိုးမှု ကျူးလွန်ခဲ့သည်။",
+         "သက်သေ တစ်ဦးက မြင်ခဲ့ပြီး လက်ဗွေ ကိုလည်း တွေ့ရှိသည်။",
+         "ကျွန်ုပ်သည် ခြိမ်းခြောက်ခံရ၍ ပြုလုပ်ခဲ့ခြင်းဖြစ်သည်။"),
+        ("penal", ["fingerprint", "witness"], ["under duress"]),
+    ),
+    "zh": (
+        ("被告通过网络攻击和恶意软件窃取了公司数据。",
+         "我同意法院的安排。监控视频显示了他的电脑。",
+         "我同意原告的说法，但我当时不在现场。"),
+        ("cybersecurity", ["surveillance", "video"], []),
+    ),
+    "ja": (
+        ("被告人は兵士であり、仮病で兵役を回避した。",
+         "証人の話に同意します。システム障害はありませんでした。",
+         "私は同意を得て診断書を受け取った。"),
+        ("military", ["witness"], ["consent"]),
+    ),
+}
+
+
+@pytest.mark.parametrize("lang", sorted(CASES))
+def test_verdict_inputs_per_language(lang):
+    texts, expected = CASES[lang]
+    assert _verdict_inputs(*texts) == expected
+
+
+def test_ambiguous_cjk_words_are_not_terms():
+    tags = default_scanner().tags("我同意。网络很慢。同意します。通信障害が起きた。")
+    assert tags == {}
+
+
+def test_offsets_point_at_the_original_text():
+    text = "Ｘ The THEFT and a Robbery; 盗窃 too."
+    hits = TermScanner(languages=["en", "zh"]).scan(text)
+    assert [(h["term"], h["label"], h["lang"]) for h in hits] == [
+        ("THEFT", "theft", "en"), ("Robbery", "robbery", "en"), ("盗窃", "theft", "zh"),
+    ]
+    for h in hits:
+        assert text[h["start"]:h["end"]] == h["term"]
+
+
+def test_latin_terms_match_whole_words_only():
+    scanner = TermScanner(languages=["en"])
+    assert scanner.scan("theftproof locks, antitheft and re_theft") == []
+    assert [h["term"] for h in scanner.scan("theft, (theft) theft.")] == ["theft"] * 3
+    # Multi-word terms and hyphenated spellings keep their boundaries at both ends.
+    assert [h["label"] for h in scanner.scan("self-defense vs. myself defense")] == ["self-defence"]
+
+
+def test_cjk_terms_match_inside_running_text():
+    hits = TermScanner(languages=["zh"]).scan("他入室盗窃了")
+    assert {(h["term"], h["label"]) for h in hits} == {("入室盗窃", "burglary"), ("盗窃", "theft")}
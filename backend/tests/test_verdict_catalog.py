@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from backend.AI_Judge.case_store import CaseStore
+from backend.AI_Judge.verdict_catalog import VerdictCatalog, parse_verdict_filename
+
+
+def _case():
+    return {
+        "case_title": "Ko Aung v. Daw Hla",
+        "scenario": "A motorcycle was taken.",
+        "plaintiff_name": "Ko Aung",
+        "defendant_name": "Daw Hla",
+        "current_round": 0,
+        "current_speaker": "judge",
+        "status": "initial_analysis",
+        "detected_lang": "en",
+    }
+
+
+@pytest.mark.parametrize("catalog_first", [True, False])
+def test_catalog_and_case_store_share_one_database(tmp_path, catalog_first):
+    db = str(tmp_path / "judge.db")
+    if catalog_first:
+        catalog, cases = VerdictCatalog(db), CaseStore(db)
+    else:
+        cases, catalog = CaseStore(db), VerdictCatalog(db)
+
+    pdf = tmp_path / "verdict_Ko_Aung_v_Daw_Hla_20250910_095446.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    cases.create("case-1", _case())
+    cases.save_verdict("case-1", "The defendant is guilty.", str(pdf), "2025-09-10T09:54:46")
+    entry = catalog.record(str(pdf), "Ko Aung v. Daw Hla", "2025-09-10T09:54:46", case_id="case-1")
+
+    assert CaseStore(db).get("case-1")["final_verdict"] == "The defendant is guilty."
+    assert entry["verdict_id"] == "verdict_Ko_Aung_v_Daw_Hla_20250910_095446"
+    assert catalog.latest_for_case("case-1")["pdf_path"] == str(pdf)
+
+
+def test_history_import_runs_once_even_after_a_new_verdict(tmp_path):
+    history = tmp_path / "history"
+    history.mkdir()
+    (history / "verdict_A_vs_B_20250910_095446.pdf").write_bytes(b"%PDF")
+    catalog = VerdictCatalog(str(tmp_path / "judge.db"))
+    new_pdf = tmp_path / "verdict_C_vs_D_20250911_101010.pdf"
+    new_pdf.write_bytes(b"%PDF")
+    catalog.record(str(new_pdf), "C vs D", "2025-09-11T10:10:10")
+
+    catalog.ensure_imported(str(history))
+    catalog.ensure_imported(str(history))
+    rows, total = catalog.query(sort="verdict_date", order="asc")
+    assert total == 2
+    assert [r["case_title"] for r in rows] == ["A vs B", "C vs D"]
+    assert rows[0]["imported"] and not rows[1]["imported"]
+
+
+def test_parse_verdict_filename():
+    parsed = parse_verdict_filename("verdict_The_State_vs_The_Phoenix_Five_20250910_095446.pdf")
+    assert parsed == {
+        "verdict_id": "verdict_The_State_vs_The_Phoenix_Five_20250910_095446",
+        "case_title": "The State vs The Phoenix Five",
+        "verdict_date": "2025-09-10T09:54:46",
+    }
+    assert parse_verdict_filename(os.path.join("x", "notes.pdf")) is None
@@ -0,0 +1,100 @@
+import asyncio
+import sqlite3
+import time
+
+from backend.AI_Judge.verdict_jobs import DONE, RUNNING, VerdictJobs
+
+
+def _runner(calls, seconds=0.05):
+    async def run(case_id, timings):
+        calls.append(case_id)
+        await asyncio.sleep(seconds)
+    return run
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def _row(db, case_id):
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    try:
+        return dict(conn.execute("SELECT * FROM verdict_jobs WHERE case_id = ?", (case_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def test_job_submitted_to_two_processes_runs_once(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    calls = []
+
+    async def main():
+        a = VerdictJobs(_runner(calls), db_path=db)
+        b = VerdictJobs(_runner(calls), db_path=db)
+        a.submit("case-1")
+        b.submit("case-1")
+        await _wait_for(lambda: _row(db, "case-1")["status"] == DONE)
+        await asyncio.sleep(0.1)
+        await a.stop()
+        await b.stop()
+
+    asyncio.run(main())
+    assert calls == ["case-1"]
+    assert _row(db, "case-1")["attempts"] == 1
+
+
+def test_expired_lease_is_reclaimed_without_a_restart(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    calls = []
+
+    async def main():
+        jobs = VerdictJobs(_runner(calls), db_path=db, lease_seconds=0.2)
+        jobs.start()
+        # A peer claimed the job and then died: its lease runs out after start().
+        conn = sqlite3.connect(db)
+        with conn:
+            conn.execute(
+                "INSERT INTO verdict_jobs (case_id, status, timings, attempts, queued_at, owner, lease_until) "
+                "VALUES (?, ?, '{}', 1, ?, 'dead-peer', ?)",
+                ("case-2", RUNNING, time.time(), time.time() + 0.1),
+            )
+        conn.close()
+        await _wait_for(lambda: _row(db, "case-2")["status"] == DONE)
+        await jobs.stop()
+
+    asyncio.run(main())
+    assert calls == ["case-2"]
+
+
+def test_lost_lease_stops_the_run(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    calls, finished = [], []
+
+    async def slow(case_id, timings):
+        calls.append(case_id)
+        await asyncio.sleep(5)
+        finished.append(case_id)
+
+    async def main():
+        jobs = VerdictJobs(slow, db_path=db, lease_seconds=0.3)
+        jobs.submit("case-3")
+        await _wait_for(lambda: calls == ["case-3"])
+        # Another process reclaimed the job after our lease looked expired.
+        conn = sqlite3.connect(db)
+        with conn:
+            conn.execute(
+                "UPDATE verdict_jobs SET owner = 'peer', lease_until = ? WHERE case_id = ?", (time.time() + 60, "case-3")
+            )
+        conn.close()
+        await _wait_for(lambda: "case-3" not in jobs.jobs)
+        row = _row(db, "case-3")
+        await jobs.stop()
+        return row
+
+    row = asyncio.run(main())
+    assert finished == []
+    assert row["owner"] == "peer"